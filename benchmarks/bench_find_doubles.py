@@ -0,0 +1,94 @@
+import os, sys, time
+import numpy as np
+from argparse import ArgumentParser
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+from editor import find_doubles
+
+SEED = 0
+THRESHOLD = 1e-05
+
+
+def garment_like_positions(vertices: int, seam_ratio: float, rng: np.random.Generator) -> np.ndarray:
+    # cloth panels in meters with seam vertices duplicated within the merge threshold
+    base = rng.random((vertices, 3)).astype(np.float32) * np.float32(1.6)
+    seams = rng.choice(vertices, int(vertices * seam_ratio), replace=False)
+    dup = base[seams] + rng.uniform(-THRESHOLD / 4, THRESHOLD / 4, (len(seams), 3)).astype(np.float32)
+    positions = np.concatenate([base, dup])
+    return positions[rng.permutation(len(positions))]
+
+
+def brute_force_doubles(positions: np.ndarray, threshold: float) -> np.ndarray:
+    positions = positions.astype(np.float64)
+    targets = np.full(len(positions), -1)
+    for i in range(len(positions)):
+        if targets[i] not in (-1, i):
+            continue
+        d = ((positions - positions[i]) ** 2).sum(axis=1)
+        hits = np.flatnonzero((d <= threshold * threshold) & (targets == -1))
+        targets[hits] = i
+        targets[i] = i
+    return targets
+
+
+def check(rng: np.random.Generator) -> None:
+    for _ in range(20):
+        positions = garment_like_positions(2000, 0.2, rng)
+        # clusters of three and more, and pairs across grid cells
+        positions[:50] = positions[50:100] + np.float32(THRESHOLD * 0.6)
+        assert (find_doubles(positions, THRESHOLD) == brute_force_doubles(positions, THRESHOLD)).all()
+    print('check: find_doubles matches brute force')
+    return
+
+
+def bench_kdtree(positions: np.ndarray, threshold: float) -> float:
+    # reference inside blender. python loop over mathutils.kdtree, what a naive port would do.
+    from mathutils.kdtree import KDTree
+    start = time.perf_counter()
+    tree = KDTree(len(positions))
+    for i, co in enumerate(positions.tolist()):
+        tree.insert(co, i)
+    tree.balance()
+    merged = set()
+    for i, co in enumerate(positions.tolist()):
+        if i in merged:
+            continue
+        for _, j, _ in tree.find_range(co, threshold):
+            if j > i:
+                merged.add(j)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = ArgumentParser()
+    parser.add_argument('--vertices', type=int, nargs='*', default=[10000, 100000, 1000000])
+    parser.add_argument('--seam_ratio', type=float, default=0.1)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(SEED)
+    check(rng)
+
+    try:
+        import mathutils
+        has_mathutils = True
+    except ImportError:
+        has_mathutils = False
+
+    print(f'{"vertices":>10} {"merged":>10} {"grid hash[s]":>14} {"kdtree loop[s]":>15}')
+    for vertices in args.vertices:
+        positions = garment_like_positions(vertices, args.seam_ratio, rng)
+        times = list()
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            targets = find_doubles(positions, THRESHOLD)
+            times.append(time.perf_counter() - start)
+        merged = int((targets != np.arange(len(targets))).sum())
+        kdtree = f'{bench_kdtree(positions, THRESHOLD):15.3f}' if has_mathutils else f'{"-":>15}'
+        print(f'{len(positions):>10} {merged:>10} {min(times):14.3f} {kdtree}')
+
+    return
+
+
+if __name__ == '__main__':
+    main()
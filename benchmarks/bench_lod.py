@@ -0,0 +1,81 @@
+import os, sys, time
+import numpy as np
+from argparse import ArgumentParser
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+from garments import make_garment, clothes_ids
+from importer import ObjData
+from clothes import parse_clothes_id, optimize_obj_data, get_mesh_charts, decimate_mesh
+
+SEED = 0
+MATERIALS = 12
+
+
+def garment_obj_data(garment: dict) -> ObjData:
+    obj_data = ObjData()
+    obj_data.positions = garment["positions"].astype(np.float32)
+    obj_data.uvs = garment["uvs"].astype(np.float32)
+    obj_data.loop_vertices = garment["faces"].ravel().astype(np.int32)
+    obj_data.loop_uvs = obj_data.loop_vertices
+    obj_data.face_sizes = np.full(len(garment["faces"]), 4, dtype=np.int32)
+    obj_data.face_materials = garment["face_materials"].astype(np.int16)
+    obj_data.material_names = [f'mat{m}' for m in range(MATERIALS)]
+    return obj_data
+
+
+def corner_set(mesh, positions: set) -> set:
+    # (position, uv, color) of the corners on the given positions
+    rows = np.column_stack((
+        mesh.positions[mesh.triangles.ravel()].round(4),
+        mesh.uvs[mesh.uv_indices].round(5),
+        mesh.colors[mesh.color_indices],
+    )).tolist()
+    return {tuple(row) for row in rows if tuple(row[:3]) in positions}
+
+
+def check(rng: np.random.Generator, clothes_id, ratios: list) -> None:
+    mesh = optimize_obj_data(garment_obj_data(make_garment(20000, MATERIALS, 'atlas', rng)), clothes_id)
+    charts = get_mesh_charts(mesh)
+    locked = set(map(tuple, mesh.positions[charts[0]].round(4).tolist()))
+    original = corner_set(mesh, locked)
+    for ratio in ratios:
+        lod = decimate_mesh(mesh, ratio, charts= charts)
+        assert len(lod.triangles) <= np.ceil(len(mesh.triangles) * ratio), 'over the triangle budget'
+        # locked vertices stay, with the uv and the material color of each side of the seam
+        assert corner_set(lod, locked) == original, 'seam or color boundary changed'
+        assert lod.triangles.max() < len(lod.positions) and lod.uv_indices.max() < len(lod.uvs)
+    print('check: LODs keep the uv seams and material color boundaries within the triangle budget')
+    return
+
+
+def main() -> None:
+    parser = ArgumentParser(description='Check clothes.decimate_mesh and time the LODs of a garment.')
+    parser.add_argument('--vertices', type=int, nargs='*', default=[20000, 100000, 500000])
+    parser.add_argument('--ratios', type=float, nargs='*', default=[0.5, 0.25, 0.1])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(SEED)
+    clothes_id = parse_clothes_id(clothes_ids(1)[0] + '.obj')
+    check(rng, clothes_id, args.ratios)
+
+    print(f'{"vertices":>10} {"triangles":>10} {"locked":>8} {"charts[s]":>10}' + ''.join(f' {f"lod {r}[s]":>11} {"ratio":>6}' for r in args.ratios))
+    for vertices in args.vertices:
+        mesh = optimize_obj_data(garment_obj_data(make_garment(vertices, MATERIALS, 'atlas', rng)), clothes_id)
+
+        start = time.perf_counter()
+        charts = get_mesh_charts(mesh)
+        chart_seconds = time.perf_counter() - start
+
+        line = ''
+        for ratio in args.ratios:
+            start = time.perf_counter()
+            lod = decimate_mesh(mesh, ratio, charts= charts)
+            line += f' {time.perf_counter() - start:>11.3f} {len(lod.triangles) / len(mesh.triangles):>6.3f}'
+        print(f'{len(mesh.positions):>10} {len(mesh.triangles):>10} {int(charts[0].sum()):>8} {chart_seconds:>10.3f}{line}')
+
+    return
+
+
+if __name__ == '__main__':
+    main()
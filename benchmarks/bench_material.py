@@ -0,0 +1,75 @@
+import os, sys, time, tempfile
+from argparse import ArgumentParser
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+import bpy
+from editor import Material, image_cache
+
+
+def write_textures(directory: str, count: int, size: int) -> list:
+    paths = list()
+    for i in range(count):
+        image = bpy.data.images.new(f'fabric{i}', size, size)
+        image.generated_color = (i / count, 0.5, 0.5, 1.0)
+        image.filepath_raw = os.path.join(directory, f'fabric{i}.png')
+        image.file_format = 'PNG'
+        image.save()
+        paths.append(image.filepath_raw)
+        bpy.data.images.remove(image)
+    return paths
+
+
+def create_uncached(textures: list, materials: int) -> None:
+    # every slot loads and decodes its texture, as before the image cache
+    for i in range(materials):
+        mat = bpy.data.materials.new(f'uncached{i}')
+        mat.use_nodes = True
+        for path in (textures[i % len(textures)], textures[(i + 1) % len(textures)]):
+            node = mat.node_tree.nodes.new(type='ShaderNodeTexImage')
+            node.image = bpy.data.images.load(filepath= path)
+            _ = node.image.size[0]
+    return
+
+
+def create_cached(texture_dir: str, textures: list, materials: int) -> None:
+    for i in range(materials):
+        material = Material(bpy.data.materials.new(f'cached{i}'))
+        material.texture_dir = texture_dir
+        material.setting({
+            "shader": 'STANDARD',
+            "basecolor_tex": os.path.basename(textures[i % len(textures)]),
+            "normal_tex": os.path.basename(textures[(i + 1) % len(textures)]),
+        })
+        material.create()
+    return
+
+
+def main() -> None:
+    argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else list()
+    parser = ArgumentParser(description='Time editor.material with the image cache against a load per texture slot. Run from blender.')
+    parser.add_argument('--textures', type=int, default=8)
+    parser.add_argument('--size', type=int, default=2048)
+    parser.add_argument('--materials', type=int, default=100)
+    args = parser.parse_args(argv)
+
+    bpy.ops.wm.read_factory_settings(use_empty=True)
+    with tempfile.TemporaryDirectory() as tmp:
+        textures = write_textures(tmp, args.textures, args.size)
+
+        start = time.perf_counter()
+        create_uncached(textures, args.materials)
+        uncached = time.perf_counter() - start
+        decoded = len(bpy.data.images)
+
+        bpy.ops.wm.read_factory_settings(use_empty=True)
+        start = time.perf_counter()
+        create_cached(tmp, textures, args.materials)
+        cached = time.perf_counter() - start
+
+    print(f'{"materials":>10} {"textures":>9} {"uncached[s]":>12} {"decoded":>8} {"cached[s]":>10} {"decoded":>8} {"hits":>6}')
+    print(f'{args.materials:>10} {args.textures:>9} {uncached:>12.2f} {decoded:>8} {cached:>10.2f} {image_cache.loads:>8} {image_cache.hits:>6}')
+    return
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+import os, re, sys, time
+import numpy as np
+from argparse import ArgumentParser
+from typing import List
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+from clothes.naming import PATTERN_CLOHTES_ID, parse_clothes_id, parse_many
+from utils import get_filename_without_ext
+
+SEED = 0
+EXTENSIONS = ('obj', 'mtl', 'fbx', 'png', 'zpac')
+
+
+class LegacyClothesId:
+    # ClothesId before the compiled pattern and cache, as the reference
+    def __init__(self, string: str) -> None:
+        self.match = re.fullmatch(PATTERN_CLOHTES_ID, get_filename_without_ext(string))
+        if self.match:
+            self.id = get_filename_without_ext(string)
+            self.type = legacy_clothes_type(self.id)
+            self.gender = legacy_gender(self.id)
+        return
+
+
+def legacy_gender(clothes_id: str) -> str:
+    gender_code = clothes_id[-2]
+    if gender_code == 'm' or gender_code == 'M':
+        return 'male'
+    elif gender_code == 'f' or gender_code == 'F':
+        return 'female'
+    return ''
+
+
+def legacy_clothes_type(clothes_id: str) -> str:
+    type_code = clothes_id[-1]
+    if type_code == 't' or type_code == 'T' or type_code == 'i' or type_code == 'I':
+        return 'top'
+    elif type_code == 'b' or type_code == 'B':
+        return 'bottom'
+    elif type_code == 'd' or type_code == 'D':
+        return 'dress'
+    elif type_code == 'o' or type_code == 'O':
+        return 'outer'
+    return ''
+
+
+def make_listing(count: int, match_ratio: float, rng: np.random.Generator) -> List[str]:
+    # every id has several files, a part of the names do not follow the naming convention
+    names = list()
+    for i in rng.integers(0, 10000, count).tolist():
+        ext = EXTENSIONS[i % len(EXTENSIONS)]
+        if rng.random() < match_ratio:
+            names.append(f'{i:04d}{"mfMF"[i % 4]}{"tbodiTBODI"[i % 10]}.{ext}')
+        else:
+            names.append(f'{i:04d}_{"mf"[i % 2]}_texture.{ext}')
+    return names
+
+
+def timed(func: any, repeat: int) -> float:
+    times = list()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def check(names: List[str]) -> None:
+    parsed = parse_many(names)
+    for name in names:
+        legacy = LegacyClothesId(name)
+        record = parse_clothes_id(name)
+        assert bool(legacy.match) == record.match == (name in parsed)
+        if record.match:
+            assert (legacy.id, legacy.type, legacy.gender) == (record.id, record.type, record.gender) == tuple(parsed[name][1:])
+    print('check: parse_clothes_id and parse_many match the legacy ClothesId')
+    return
+
+
+def main() -> None:
+    parser = ArgumentParser()
+    parser.add_argument('--names', type=int, nargs='*', default=[10000, 100000, 500000])
+    parser.add_argument('--match_ratio', type=float, default=0.5)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(SEED)
+    check(make_listing(10000, args.match_ratio, rng))
+
+    print(f'{"names":>8} {"legacy[s]":>10} {"cold[s]":>10} {"cached[s]":>10} {"parse_many[s]":>14}')
+    for count in args.names:
+        names = make_listing(count, args.match_ratio, rng)
+        legacy = timed(lambda: [LegacyClothesId(name) for name in names], args.repeat)
+
+        def cold() -> None:
+            parse_clothes_id.cache_clear()
+            [parse_clothes_id(name) for name in names]
+        cold_time = timed(cold, args.repeat)
+        cached = timed(lambda: [parse_clothes_id(name) for name in names], args.repeat)
+        many = timed(lambda: parse_many(names), args.repeat)
+        print(f'{count:>8} {legacy:>10.3f} {cold_time:>10.3f} {cached:>10.3f} {many:>14.3f}')
+
+    return
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+import os, sys, time
+import numpy as np
+from argparse import ArgumentParser
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+from garments import make_garment
+from utils import BPY_AVAILABLE
+from editor import vertex_normals
+from importer import ObjData
+
+SEED = 0
+MATERIALS = 12
+
+
+def reference_normals(positions: np.ndarray, triangles: np.ndarray) -> np.ndarray:
+    # per triangle loop, as the straightforward port would do
+    positions = positions.astype(np.float64)
+    normals = np.zeros_like(positions)
+    for a, b, c in triangles.tolist():
+        n = np.cross(positions[b] - positions[a], positions[c] - positions[a])
+        normals[a] += n
+        normals[b] += n
+        normals[c] += n
+    return normals / np.maximum(np.linalg.norm(normals, axis=1, keepdims=True), 1e-30)
+
+
+def check(rng: np.random.Generator) -> None:
+    garment = make_garment(2000, 4, 'none', rng, triangles=True)
+    positions, triangles = garment["positions"], garment["faces"]
+    assert np.allclose(vertex_normals(positions, triangles), reference_normals(positions, triangles))
+    # an unused vertex keeps a zero normal
+    normals = vertex_normals(np.concatenate([positions, [[0, 0, 0]]]), triangles)
+    assert not normals[-1].any()
+    print('check: vertex_normals matches the per triangle reference')
+    return
+
+
+def garment_obj_data(garment: dict) -> ObjData:
+    obj_data = ObjData()
+    obj_data.positions = garment["positions"].astype(np.float32)
+    obj_data.loop_vertices = garment["faces"].ravel().astype(np.int32)
+    obj_data.face_sizes = np.full(len(garment["faces"]), 3, dtype=np.int32)
+    obj_data.face_materials = garment["face_materials"].astype(np.int16)
+    obj_data.material_names = [f'mat{m}' for m in range(MATERIALS)]
+    return obj_data
+
+
+def bench_blender(garment: dict) -> tuple:
+    # operator chain of recalculate_normals before the numpy kernel, and the kernel through editor.recalculate_normals
+    import bpy
+    from importer.objmesh import build_mesh
+    from editor import recalculate_normals, select_mesh_object, deselect_all
+
+    bpy.ops.wm.read_factory_settings(use_empty=True)
+    ob = bpy.data.objects.new('garment', build_mesh('garment', garment_obj_data(garment), dict()))
+    bpy.context.scene.collection.objects.link(ob)
+
+    start = time.perf_counter()
+    select_mesh_object(bpy.context, ob)
+    bpy.ops.object.shade_smooth()
+    bpy.ops.mesh.customdata_custom_splitnormals_clear()
+    ob.data.use_auto_smooth = True
+    ob.data.auto_smooth_angle = 3.14159
+    bpy.ops.mesh.customdata_custom_splitnormals_add()
+    deselect_all(bpy.context)
+    operators = time.perf_counter() - start
+
+    start = time.perf_counter()
+    recalculate_normals(bpy.context, ob)
+    kernel = time.perf_counter() - start
+    return operators, kernel
+
+
+def main() -> None:
+    argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else sys.argv[1:]
+    parser = ArgumentParser(description='Check editor.meshdata.vertex_normals and time it against the operator chain.')
+    parser.add_argument('--vertices', type=int, nargs='*', default=[10000, 100000, 500000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(SEED)
+    check(rng)
+
+    print(f'{"vertices":>10} {"triangles":>10} {"numpy[s]":>10} {"operators[s]":>13} {"recalculate_normals[s]":>23}')
+    for vertices in args.vertices:
+        garment = make_garment(vertices, MATERIALS, 'none', rng, triangles=True)
+        positions, triangles = garment["positions"], garment["faces"]
+        times = list()
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            vertex_normals(positions, triangles)
+            times.append(time.perf_counter() - start)
+
+        operators, kernel = bench_blender(garment) if BPY_AVAILABLE else (None, None)
+        blender = f'{operators:>13.3f} {kernel:>23.3f}' if BPY_AVAILABLE else f'{"-":>13} {"-":>23}'
+        print(f'{len(positions):>10} {len(triangles):>10} {min(times):>10.3f} {blender}')
+
+    return
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+import os, sys, json, time, tempfile, subprocess
+import numpy as np
+from argparse import ArgumentParser, SUPPRESS
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+from garments import make_garment, write_obj
+from utils import peak_rss_mb
+from importer import parse_obj, parse_obj_mmap
+
+SEED = 0
+MATERIALS = 12
+READERS = {
+    'numpy': parse_obj,
+    'mmap': parse_obj_mmap,
+}
+
+
+def result_bytes(obj_data: any) -> int:
+    arrays = (obj_data.positions, obj_data.uvs, obj_data.normals, obj_data.loop_vertices, obj_data.loop_uvs, obj_data.loop_normals, obj_data.face_sizes, obj_data.face_materials)
+    return sum(array.nbytes for array in arrays if array is not None)
+
+
+def run_child(reader: str, path: str) -> None:
+    # peak rss is per process and carried over to a child, so every reader runs in a fresh one started by a
+    # parent which never held the garments. 'import' only imports the readers, the floor of the others.
+    start = time.perf_counter()
+    obj_data = READERS[reader](path) if reader in READERS else None
+    seconds = time.perf_counter() - start
+    print(json.dumps({
+        "seconds": seconds,
+        "peak_rss_mb": peak_rss_mb(),
+        "result_mb": result_bytes(obj_data) / 1024 / 1024 if obj_data else 0.0,
+    }))
+    return
+
+
+def write_child(path: str, vertices: int) -> None:
+    rng = np.random.default_rng(SEED + vertices)
+    write_obj(path, make_garment(vertices, MATERIALS, 'atlas', rng), [f'material{m}' for m in range(MATERIALS)], 'garment.mtl')
+    return
+
+
+def check_child(path: str) -> None:
+    # results of both readers are checked once on the smallest file
+    first, second = (reader(path) for reader in READERS.values())
+    for name in ('positions', 'uvs', 'normals', 'loop_vertices', 'loop_uvs', 'loop_normals', 'face_sizes', 'face_materials', 'material_names', 'mtllibs'):
+        a, b = getattr(first, name), getattr(second, name)
+        if isinstance(a, list):
+            assert a == b, name
+            continue
+        assert (a is None and b is None) or (a.shape == b.shape and (a == b).all()), name
+    print('check: parse_obj_mmap matches parse_obj')
+    return
+
+
+def child(*args: str) -> str:
+    return subprocess.run([sys.executable, os.path.abspath(__file__), *args], capture_output=True, check=True, text=True).stdout
+
+
+def measure(reader: str, path: str) -> dict:
+    return json.loads(child('--child', reader, path).splitlines()[-1])
+
+
+def main() -> None:
+    parser = ArgumentParser(description='Time importer.objparser readers and their peak memory on large OBJ files.')
+    parser.add_argument('--vertices', type=int, nargs='*', default=[100000, 1000000])
+    parser.add_argument('--obj', nargs='*', default=[], help='existing obj files instead of generated ones')
+    parser.add_argument('--child', nargs=2, help=SUPPRESS)
+    parser.add_argument('--write', nargs=2, help=SUPPRESS)
+    parser.add_argument('--check', help=SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(*args.child)
+        return
+    if args.write:
+        write_child(args.write[0], int(args.write[1]))
+        return
+    if args.check:
+        check_child(args.check)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # the garments are written by children. this process stays small for the children it starts.
+        paths = list(args.obj)
+        for vertices in args.vertices:
+            path = os.path.join(tmp, f'garment{vertices}.obj')
+            child('--write', path, str(vertices))
+            paths.append(path)
+
+        print(child('--check', min(paths, key=os.path.getsize)).strip())
+        print(f'{"obj[MB]":>8} {"reader":>8} {"seconds":>8} {"peak rss[MB]":>13} {"result[MB]":>11}')
+        for path in paths:
+            size = os.path.getsize(path) / 1024 / 1024
+            for reader in ('import', *READERS):
+                record = measure(reader, path)
+                print(f'{size:>8.1f} {reader:>8} {record["seconds"]:>8.2f} {record["peak_rss_mb"]:>13.1f} {record["result_mb"]:>11.1f}')
+
+    return
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+import os, sys, time, shutil, tempfile
+from argparse import ArgumentParser
+from logging import basicConfig, WARNING
+from typing import List
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+from garments import make_dataset, UV_LAYOUTS, MAX_MATERIALS
+from utils import BPY_AVAILABLE, get_profiler, peak_rss_mb, StageReport
+from clothes import parse_clothes_id, parse_many, get_model_dirs, get_work_items
+from importer import parse_obj, parse_mtl
+from editor import loop_colors_by_materials, find_doubles
+
+REPORT_FILE_NAME = 'bench-stages.jsonl'
+# clo3d centimeters to meters, same as the rescale before remove_doubles
+SCALE = 0.01
+THRESHOLD = 1e-05
+
+
+def get_args(argv: List[str]) -> any:
+    parser = ArgumentParser(description='Time the convertion stages on synthetic garments.')
+    parser.add_argument('--parent', help='existing parent directory. synthetic garments are generated when omitted.')
+    parser.add_argument('--garments', type=int, default=5)
+    parser.add_argument('--vertices', type=int, default=100000)
+    parser.add_argument('--materials', type=int, default=MAX_MATERIALS, choices=range(1, MAX_MATERIALS + 1), metavar=f'1-{MAX_MATERIALS}')
+    parser.add_argument('--uv_layout', default='atlas', choices=UV_LAYOUTS)
+    parser.add_argument('--naming_repeat', type=int, default=1000)
+    parser.add_argument('--obj_reader', default='legacy')
+    parser.add_argument('--optimize_mode', default='operator')
+    parser.add_argument('--batch_size', type=int, default=1)
+    parser.add_argument('--keep', action='store_true', help='keep the generated garments and fbx files.')
+    return parser.parse_args(argv)
+
+
+def bench_pure(report: StageReport, parent: str, naming_repeat: int) -> None:
+    # stages without bpy. runs under plain python.
+    profiler = get_profiler()
+    profiler.counter = None
+
+    profiler.begin_item('dataset')
+    with profiler.stage('discovery'):
+        work_items = get_work_items(get_model_dirs(parent))
+    with profiler.stage('naming'):
+        names = [obj_file for _, obj_file in work_items]
+        for _ in range(naming_repeat):
+            parse_many(names)
+    report.write(profiler.end_item())
+
+    for model_dir, obj_file in work_items:
+        clothes_id = parse_clothes_id(obj_file).id
+        profiler.begin_item(clothes_id)
+        with profiler.stage('parse_obj'):
+            obj_data = parse_obj(os.path.join(model_dir, obj_file))
+        with profiler.stage('parse_mtl'):
+            parse_mtl(os.path.join(model_dir, f'{clothes_id}.mtl'))
+        with profiler.stage('color_map'):
+            loop_colors_by_materials(obj_data.face_materials, obj_data.face_sizes)
+        with profiler.stage('find_doubles'):
+            find_doubles(obj_data.positions * SCALE, THRESHOLD)
+        report.write(profiler.end_item())
+
+    return
+
+
+def bench_blender(report: StageReport, parent: str, obj_reader: str, optimize_mode: str, batch_size: int) -> None:
+    # full convertion. every editor stage is recorded by the profiler in convert_item.
+    from converter import BatchScene, STATUS_FAILED
+
+    settings = {
+        "overwrite_fbx": True,
+        "delete_obj_mtl": False,
+        "use_manifest": False,
+        "obj_reader": obj_reader,
+        "optimize_mode": optimize_mode,
+        "batch_size": batch_size,
+    }
+    scene = BatchScene(settings)
+    for model_dir, obj_file in get_work_items(get_model_dirs(parent)):
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        result = scene.convert(model_dir, obj_file, settings)
+        if result["status"] == STATUS_FAILED:
+            print(f'Convert failed. | clothesId: {result["clothes_id"]}')
+        stages = result.get("stages", list())
+        report.write(stages + [{
+            "item": result["clothes_id"],
+            "stage": 'pipeline',
+            "wall": time.perf_counter() - wall,
+            "cpu": time.process_time() - cpu,
+            "peak_rss_mb": peak_rss_mb(),
+            "before": stages[0]["before"] if stages else dict(),
+            "after": stages[-1]["after"] if stages else dict(),
+        }])
+
+    return
+
+
+def main() -> None:
+    # blender passes the script arguments after "--"
+    argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else sys.argv[1:]
+    args = get_args(argv)
+    basicConfig(level=WARNING)
+
+    parent = args.parent
+    generated = parent is None
+    if generated:
+        parent = tempfile.mkdtemp(prefix='vtryon-bench-')
+        start = time.perf_counter()
+        make_dataset(parent, args.garments, args.vertices, args.materials, args.uv_layout)
+        print(f'Garments generated. | parent: {parent}, garments: {args.garments}, vertices: {args.vertices}, seconds: {time.perf_counter() - start:.1f}')
+
+    report = StageReport(os.path.join(parent, REPORT_FILE_NAME))
+    bench_pure(report, parent, args.naming_repeat)
+    if BPY_AVAILABLE:
+        bench_blender(report, parent, args.obj_reader, args.optimize_mode, args.batch_size)
+    else:
+        print('bpy is not available. Blender stages are skipped.')
+    report.close()
+
+    for line in report.summary():
+        print(line)
+
+    if generated and not args.keep:
+        shutil.rmtree(parent)
+    else:
+        print(f'Stage report. | path: {os.path.abspath(report.path)}')
+    return
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+import os, sys, time, tempfile
+import numpy as np
+from argparse import ArgumentParser
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+from utils import PIL_AVAILABLE
+from exporter import TextureOptimizer, fit_size, JPEG_QUALITY
+
+SEED = 0
+
+
+def write_textures(directory: str, count: int, size: int, rng: np.random.Generator) -> list:
+    from PIL import Image
+    paths = list()
+    for i in range(count):
+        # fabric like noise over a gradient. pure noise would not compress at all.
+        gradient = np.linspace(0, 255, size, dtype=np.float32)[None, :, None]
+        pixels = np.clip(gradient + rng.normal(0, 12, (size, size, 3)), 0, 255).astype(np.uint8)
+        paths.append(os.path.join(directory, f'fabric{i}.png'))
+        Image.fromarray(pixels).save(paths[-1])
+    return paths
+
+
+def optimize_serial(references: list, out_dir: str, max_size: int, image_format: str) -> int:
+    # every texture slot of every garment on the calling thread, without dedup
+    from PIL import Image
+    total = 0
+    for i, path in enumerate(references):
+        with Image.open(path) as image:
+            image = image.resize(fit_size(image.size, max_size), Image.LANCZOS, reducing_gap=3.0)
+            out_path = os.path.join(out_dir, f'{i}.{image_format.lower()}')
+            image.save(out_path, format=image_format, quality=JPEG_QUALITY)
+        total += os.path.getsize(out_path)
+    return total
+
+
+def main() -> None:
+    parser = ArgumentParser(description='Time exporter.texture.TextureOptimizer against optimizing every texture slot in turn.')
+    parser.add_argument('--textures', type=int, default=4, help='unique fabric textures')
+    parser.add_argument('--garments', type=int, default=12, help='garments sharing them, 2 slots each')
+    parser.add_argument('--size', type=int, default=4096)
+    parser.add_argument('--max_size', type=int, default=1024)
+    parser.add_argument('--format', default='JPEG')
+    args = parser.parse_args()
+
+    if not PIL_AVAILABLE:
+        print('Pillow is not installed.')
+        return
+
+    rng = np.random.default_rng(SEED)
+    with tempfile.TemporaryDirectory() as tmp:
+        textures = write_textures(tmp, args.textures, args.size, rng)
+        references = [textures[(g + slot) % len(textures)] for g in range(args.garments) for slot in range(2)]
+        source_bytes = sum(os.path.getsize(path) for path in references)
+
+        out_dir = os.path.join(tmp, 'serial')
+        os.makedirs(out_dir)
+        start = time.perf_counter()
+        serial_bytes = optimize_serial(references, out_dir, args.max_size, args.format)
+        serial = time.perf_counter() - start
+
+        optimizer = TextureOptimizer(args.max_size, args.format)
+        start = time.perf_counter()
+        optimizer.submit(references)
+        optimized = {path: optimizer.result(path) for path in references}
+        pooled = time.perf_counter() - start
+        pooled_bytes = sum(os.path.getsize(optimized[path]) for path in references)
+        optimizer.close()
+
+    print(f'{"slots":>6} {"unique":>7} {"source[MB]":>11} {"serial[s]":>10} {"serial[MB]":>11} {"optimizer[s]":>13} {"optimizer[MB]":>14}')
+    print(f'{len(references):>6} {args.textures:>7} {source_bytes / 1024 / 1024:>11.1f} {serial:>10.2f} {serial_bytes / 1024 / 1024:>11.1f} {pooled:>13.2f} {pooled_bytes / 1024 / 1024:>14.1f}')
+    return
+
+
+if __name__ == '__main__':
+    main()
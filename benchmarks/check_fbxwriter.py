@@ -0,0 +1,192 @@
+import os, sys, time, zlib, tempfile
+import numpy as np
+from argparse import ArgumentParser
+from struct import unpack, calcsize
+from typing import List, Tuple
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+from garments import make_garment
+from utils import BPY_AVAILABLE
+from editor import COLORS
+from exporter import FbxMesh, write_fbx, FBX_VERSION
+
+SEED = 0
+# (name, properties, children)
+Node = Tuple[str, List[any], List[any]]
+
+_ARRAY_TYPES = {'d': np.float64, 'f': np.float32, 'i': np.int32, 'l': np.int64, 'b': np.bool_}
+_SCALAR_FORMATS = {'Y': '<h', 'C': '<?', 'I': '<i', 'F': '<f', 'D': '<d', 'L': '<q'}
+
+
+def read_fbx(path: str) -> Tuple[int, List[Node]]:
+    # minimal binary fbx reader (version < 7500, 32 bit offsets) to check the writer without blender
+    with open(path, mode='rb') as f:
+        data = f.read()
+    assert data[:23] == b'Kaydara FBX Binary\x20\x20\x00\x1a\x00', 'not a binary fbx'
+    version = unpack('<I', data[23:27])[0]
+
+    nodes = list()
+    pos = 27
+    while True:
+        node, pos = _read_node(data, pos)
+        if node is None:
+            break
+        nodes.append(node)
+
+    # footer: id, 4 zero bytes, padding to 16, version, 120 zero bytes, magic
+    footer_version = unpack('<I', data[-140:-136])[0]
+    assert footer_version == version, 'footer version does not match'
+    assert data[-16:] == b'\xf8\x5a\x8c\x6a\xde\xf5\xd9\x7e\xec\xe9\x0c\xe3\x75\x8f\x29\x0b', 'footer magic does not match'
+    return version, nodes
+
+
+def _read_node(data: bytes, pos: int) -> Tuple[Node, int]:
+    end, count, _, name_length = unpack('<3IB', data[pos:pos + 13])
+    if end == 0:
+        return None, pos + 13
+    pos += 13
+    name = data[pos:pos + name_length].decode('ascii')
+    pos += name_length
+
+    props = list()
+    for _ in range(count):
+        prop, pos = _read_property(data, pos)
+        props.append(prop)
+
+    children = list()
+    while pos < end:
+        child, pos = _read_node(data, pos)
+        if child is None:
+            break
+        children.append(child)
+    assert pos == end, f'node size does not match | node: {name}'
+    return (name, props, children), pos
+
+
+def _read_property(data: bytes, pos: int) -> Tuple[any, int]:
+    code = chr(data[pos])
+    pos += 1
+    if code in _SCALAR_FORMATS:
+        fmt = _SCALAR_FORMATS[code]
+        return unpack(fmt, data[pos:pos + calcsize(fmt)])[0], pos + calcsize(fmt)
+    if code in _ARRAY_TYPES:
+        length, encoding, size = unpack('<3I', data[pos:pos + 12])
+        raw = data[pos + 12:pos + 12 + size]
+        if encoding == 1:
+            raw = zlib.decompress(raw)
+        values = np.frombuffer(raw, dtype=_ARRAY_TYPES[code])
+        assert len(values) == length, 'array length does not match'
+        return values, pos + 12 + size
+    if code in 'SR':
+        size = unpack('<I', data[pos:pos + 4])[0]
+        value = data[pos + 4:pos + 4 + size]
+        return (value.decode('utf-8') if code == 'S' else value), pos + 4 + size
+    raise ValueError(f'unknown property type | type: {code}')
+
+
+def find(nodes: List[Node], *names: str) -> Node:
+    # first node of the path
+    node = None
+    for name in names:
+        node = next(child for child in nodes if child[0] == name)
+        nodes = node[2]
+    return node
+
+
+def value(nodes: List[Node], *names: str) -> any:
+    return find(nodes, *names)[1][0]
+
+
+def garment_mesh(vertices: int, materials: int, rng: np.random.Generator) -> FbxMesh:
+    garment = make_garment(vertices, materials, 'atlas', rng, triangles=True)
+    mesh = FbxMesh('0001ft')
+    mesh.positions = garment["positions"]
+    mesh.triangles = garment["faces"]
+    mesh.normals = garment["normals"]
+    corners = mesh.triangles.ravel()
+    mesh.uvs = garment["uvs"]
+    mesh.uv_indices = corners
+    # palette per material, as the vertex color stage paints it
+    mesh.colors = np.array([(*COLORS[m % len(COLORS)], 1.0) for m in range(materials)])
+    mesh.color_indices = np.repeat(garment["face_materials"], 3)
+    mesh.material_name = 'M_top'
+    return mesh
+
+
+def check(path: str, mesh: FbxMesh) -> None:
+    write_fbx(path, mesh)
+    version, nodes = read_fbx(path)
+    assert version == FBX_VERSION
+
+    geometry = find(nodes, 'Objects', 'Geometry')[2]
+    assert np.allclose(value(geometry, 'Vertices').reshape(-1, 3), mesh.positions)
+    polygon_vertex_index = value(geometry, 'PolygonVertexIndex').reshape(-1, 3).copy()
+    assert (polygon_vertex_index[:, 2] < 0).all() and (polygon_vertex_index[:, :2] >= 0).all()
+    polygon_vertex_index[:, 2] = -polygon_vertex_index[:, 2] - 1
+    assert (polygon_vertex_index == mesh.triangles).all()
+    assert np.allclose(value(geometry, 'LayerElementNormal', 'Normals').reshape(-1, 3), mesh.normals)
+    assert value(geometry, 'LayerElementNormal', 'MappingInformationType') == mesh.normal_mapping
+    assert np.allclose(value(geometry, 'LayerElementUV', 'UV').reshape(-1, 2), mesh.uvs)
+    assert (value(geometry, 'LayerElementUV', 'UVIndex') == mesh.uv_indices).all()
+    assert np.allclose(value(geometry, 'LayerElementColor', 'Colors').reshape(-1, 4), mesh.colors)
+    assert (value(geometry, 'LayerElementColor', 'ColorIndex') == mesh.color_indices).all()
+
+    model = find(nodes, 'Objects', 'Model')
+    material = find(nodes, 'Objects', 'Material')
+    assert model[1][1] == f'{mesh.name}\x00\x01Model'
+    assert material[1][1] == f'{mesh.material_name}\x00\x01Material'
+    connections = [tuple(c[1]) for c in find(nodes, 'Connections')[2]]
+    assert ('OO', model[1][0], 0) in connections
+    assert ('OO', find(nodes, 'Objects', 'Geometry')[1][0], model[1][0]) in connections
+    assert ('OO', material[1][0], model[1][0]) in connections
+    print('check: written fbx reads back with the same arrays, names and connections')
+    return
+
+
+def check_blender(path: str, mesh: FbxMesh) -> None:
+    # blender's own fbx importer reads the file
+    import bpy
+    bpy.ops.wm.read_factory_settings(use_empty=True)
+    bpy.ops.import_scene.fbx(filepath=path)
+    ob = next(ob for ob in bpy.context.scene.objects if ob.type == 'MESH')
+    me = ob.data
+    assert len(me.vertices) == len(mesh.positions)
+    assert len(me.polygons) == len(mesh.triangles)
+    assert me.materials[0].name == mesh.material_name
+    assert len(me.uv_layers) == 1 and len(me.vertex_colors) == 1
+    print('check: blender imports the written fbx')
+    return
+
+
+def main() -> None:
+    argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else sys.argv[1:]
+    parser = ArgumentParser(description='Check exporter.fbxwriter and time it.')
+    parser.add_argument('--vertices', type=int, nargs='*', default=[10000, 100000, 500000])
+    parser.add_argument('--materials', type=int, default=12)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(SEED)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'check.fbx')
+        mesh = garment_mesh(5000, args.materials, rng)
+        check(path, mesh)
+        if BPY_AVAILABLE:
+            check_blender(path, mesh)
+
+        print(f'{"vertices":>10} {"triangles":>10} {"write[s]":>10} {"size[MB]":>10}')
+        for vertices in args.vertices:
+            mesh = garment_mesh(vertices, args.materials, rng)
+            times = list()
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                write_fbx(path, mesh)
+                times.append(time.perf_counter() - start)
+            print(f'{len(mesh.positions):>10} {len(mesh.triangles):>10} {min(times):>10.3f} {os.path.getsize(path) / 1024 / 1024:>10.2f}')
+
+    return
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+import os, sys, math
+import numpy as np
+from argparse import ArgumentParser
+from typing import Dict, List, Tuple
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+from clothes.naming import FBX_DIR, CLOTHES_DIR_NAME
+
+SEED = 0
+# clo3d exports in centimeters, y up
+HEIGHT = 70.0
+RADIUS = 18.0
+WAIST = 100.0
+# seam vertices of adjacent panels are written twice, moved within the merge threshold after the 0.01 rescale
+SEAM_JITTER = 1e-04
+MAX_MATERIALS = 23
+UV_LAYOUTS = (
+    'atlas',
+    'overlap',
+    'none',
+)
+TYPE_CODES = 'tbdo'
+GENDER_CODES = 'mf'
+
+
+def clothes_ids(count: int, start: int = 1) -> List[str]:
+    return [f'{i:04d}{GENDER_CODES[i % 2]}{TYPE_CODES[i % len(TYPE_CODES)]}' for i in range(start, start + count)]
+
+
+def panel_shape(vertices: int, materials: int) -> Tuple[int, int]:
+    # (rows, columns) of every panel, so that the whole garment has about `vertices` vertices
+    per_panel = max(4, vertices // materials)
+    columns = max(2, int(math.sqrt(per_panel * 2 * math.pi * RADIUS / materials / HEIGHT)))
+    rows = max(2, per_panel // columns)
+    return rows, columns
+
+
+def make_garment(vertices: int, materials: int, uv_layout: str, rng: np.random.Generator, seam_jitter: float = SEAM_JITTER, triangles: bool = False) -> Dict[str, np.ndarray]:
+    # a tube split into one pattern panel per material, like a clo3d export without welding
+    rows, columns = panel_shape(vertices, materials)
+    tiles = math.ceil(math.sqrt(materials))
+
+    positions, uvs, normals, faces, face_materials = list(), list(), list(), list(), list()
+    offset = 0
+    for m in range(materials):
+        angles = np.linspace(2 * math.pi * m / materials, 2 * math.pi * (m + 1) / materials, columns)
+        heights = np.linspace(WAIST - HEIGHT, WAIST, rows)
+        a, h = np.meshgrid(angles, heights)
+        radius = RADIUS * (1 + 0.05 * np.sin(h / 7.0)) + rng.uniform(0, 0.5, a.shape)
+        # panel borders sit on the seam exactly, then get jittered like the pattern sewing result
+        radius[:, 0] = RADIUS * (1 + 0.05 * np.sin(h[:, 0] / 7.0))
+        radius[:, -1] = RADIUS * (1 + 0.05 * np.sin(h[:, -1] / 7.0))
+        co = np.stack([radius * np.sin(a), h, radius * np.cos(a)], axis=-1).reshape(-1, 3)
+        border = np.zeros(a.shape, dtype=bool)
+        border[:, [0, -1]] = True
+        border = border.ravel()
+        co[border] += rng.uniform(-seam_jitter, seam_jitter, (int(border.sum()), 3))
+        positions.append(co)
+        normals.append(np.stack([np.sin(a), np.zeros_like(a), np.cos(a)], axis=-1).reshape(-1, 3))
+
+        u, v = np.meshgrid(np.linspace(0, 1, columns), np.linspace(0, 1, rows))
+        uv = np.stack([u, v], axis=-1).reshape(-1, 2)
+        if uv_layout == 'atlas':
+            uv = (uv * 0.95 + [m % tiles, m // tiles]) / tiles
+        uvs.append(uv)
+
+        grid = np.arange(rows * columns).reshape(rows, columns) + offset
+        quads = np.stack([grid[:-1, :-1], grid[:-1, 1:], grid[1:, 1:], grid[1:, :-1]], axis=-1).reshape(-1, 4)
+        if triangles:
+            quads = np.concatenate([quads[:, [0, 1, 2]], quads[:, [0, 2, 3]]])
+        faces.append(quads)
+        face_materials.append(np.full(len(quads), m))
+        offset += rows * columns
+
+    return {
+        "positions": np.concatenate(positions),
+        "uvs": np.concatenate(uvs) if uv_layout != 'none' else None,
+        "normals": np.concatenate(normals),
+        "faces": np.concatenate(faces),
+        "face_materials": np.concatenate(face_materials),
+    }
+
+
+def write_obj(path: str, garment: Dict[str, np.ndarray], material_names: List[str], mtl_file: str) -> None:
+    faces = garment["faces"] + 1
+    width = faces.shape[1]
+    if garment["uvs"] is not None:
+        corner = '{0}/{0}/{0}'
+    else:
+        corner = '{0}//{0}'
+    face_format = 'f ' + ' '.join(corner.replace('0', str(i)) for i in range(width)) + '\n'
+
+    with open(path, mode='w', newline='\n') as f:
+        f.write('# CLO3D-like synthetic garment\n')
+        f.write(f'mtllib {mtl_file}\n')
+        f.writelines(f'v {x:.6f} {y:.6f} {z:.6f}\n' for x, y, z in garment["positions"].tolist())
+        if garment["uvs"] is not None:
+            f.writelines(f'vt {u:.6f} {v:.6f}\n' for u, v in garment["uvs"].tolist())
+        f.writelines(f'vn {x:.6f} {y:.6f} {z:.6f}\n' for x, y, z in garment["normals"].tolist())
+
+        # faces are grouped by panel, one usemtl per panel
+        changes = np.flatnonzero(np.diff(garment["face_materials"])) + 1
+        for group in np.split(np.arange(len(faces)), changes):
+            material = material_names[garment["face_materials"][group[0]]]
+            f.write(f'g {material}\nusemtl {material}\n')
+            f.writelines(face_format.format(*face) for face in faces[group].tolist())
+    return
+
+
+def write_mtl(path: str, material_names: List[str], rng: np.random.Generator) -> None:
+    with open(path, mode='w', newline='\n') as f:
+        for name in material_names:
+            r, g, b = rng.random(3).tolist()
+            f.write(f'newmtl {name}\nKa 0 0 0\nKd {r:.6f} {g:.6f} {b:.6f}\nKs 0 0 0\nNs 0\nd 1\nillum 2\n\n')
+    return
+
+
+def make_dataset(parent: str, garments: int, vertices: int, materials: int, uv_layout: str = 'atlas', seed: int = SEED, triangles: bool = False) -> List[str]:
+    # <parent>/Clothes/<clothesId>/1.result/fbx/<clothesId>.obj, the layout read by get_model_dirs
+    rng = np.random.default_rng(seed)
+    model_dirs = list()
+    for i, clothes_id in enumerate(clothes_ids(garments)):
+        model_dir = os.path.join(parent, CLOTHES_DIR_NAME.capitalize(), clothes_id, FBX_DIR)
+        os.makedirs(model_dir, exist_ok=True)
+
+        # 1 to `materials` groups, the first garment always has the maximum
+        count = materials if i == 0 else int(rng.integers(1, materials + 1))
+        material_names = [f'FABRIC_{m + 1}_FRONT_{clothes_id}' for m in range(count)]
+        garment = make_garment(vertices, count, uv_layout, rng, triangles= triangles)
+        write_obj(os.path.join(model_dir, f'{clothes_id}.obj'), garment, material_names, f'{clothes_id}.mtl')
+        write_mtl(os.path.join(model_dir, f'{clothes_id}.mtl'), material_names, rng)
+        model_dirs.append(model_dir)
+
+    return model_dirs
+
+
+def main() -> None:
+    parser = ArgumentParser(description='Generate synthetic CLO3D-like OBJ/MTL garments.')
+    parser.add_argument('parent')
+    parser.add_argument('--garments', type=int, default=10)
+    parser.add_argument('--vertices', type=int, default=50000)
+    parser.add_argument('--materials', type=int, default=8, choices=range(1, MAX_MATERIALS + 1), metavar=f'1-{MAX_MATERIALS}')
+    parser.add_argument('--uv_layout', default='atlas', choices=UV_LAYOUTS)
+    parser.add_argument('--triangles', action='store_true')
+    parser.add_argument('--seed', type=int, default=SEED)
+    args = parser.parse_args()
+
+    model_dirs = make_dataset(args.parent, args.garments, args.vertices, args.materials, args.uv_layout, args.seed, args.triangles)
+    print(f'{len(model_dirs)} garments written. | parent: {os.path.abspath(args.parent)}')
+    return
+
+
+if __name__ == '__main__':
+    main()
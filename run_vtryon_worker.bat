@@ -0,0 +1,11 @@
+@echo off
+cd /D %~dp0
+
+echo Please enter the spool directory to watch.
+SET /P SPOOL_DIR=
+
+cd scripts
+..\resources\blender-3.3.2-windows-x64\blender --background --python clo3dobj_to_vtryon.py -- --serve %SPOOL_DIR%
+
+pause
+exit
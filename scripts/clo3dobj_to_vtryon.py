@@ -1,99 +1,239 @@
-import bpy
-import json, os, sys
+import os, sys, time
+from typing import Iterator, Tuple
 from logging import DEBUG, INFO
 
-# load external module
+# load external module. plain python (--engine numpy) has the script directory in the path already.
 from sys import path
-path.append(os.path.basename(bpy.data.filepath))
-from utils import get_root_logger, get_ext
-from editor import initialize
-from importer import import_model
-from exporter import export_model
-from clothes import get_model_dirs, ClothesId, Clo3dItemObj
+try:
+    import bpy
+    path.append(os.path.basename(bpy.data.filepath))
+except ImportError:
+    pass
+from utils import (
+    get_root_logger,
+    get_log_path,
+    load_settings,
+    get_cmd_workers,
+    get_cmd_worker_jobs,
+    get_cmd_serve,
+    get_cmd_coordinator,
+    get_cmd_cluster_worker,
+    get_cmd_dry_run,
+    get_cmd_engine,
+    get_cmd_resume,
+    get_cmd_export_exts,
+    StageReport,
+    get_report_path,
+    BPY_AVAILABLE,
+)
+from clothes import iter_model_dirs, iter_work_items
+from converter import (
+    get_plan,
+    get_export_formats,
+    new_result,
+    log_result,
+    log_summary,
+    run_numpy,
+    coordinate,
+    run_cluster_worker,
+    LEASE_SECONDS,
+    ConvertPipeline,
+    DEFAULT_PIPELINE_DEPTH,
+    Manifest,
+    Journal,
+    ENGINES,
+    ENGINE_BLENDER,
+    ENGINE_NUMPY,
+    STATUS_CONVERTED,
+    STATUS_SKIPPED,
+    PLAN_SKIP,
+)
+if BPY_AVAILABLE:
+    from converter import BatchScene, run_parallel, run_worker, serve
 
 
 def main() -> None:
-    logger = get_root_logger(__file__, INFO)
-    logger.info("Process start.")
-
-    context = bpy.context
-    data = bpy.data
+    worker_jobs = get_cmd_worker_jobs()
+    logger = get_root_logger(__file__, INFO, log_file= worker_jobs is None)
 
     # read settings file
-    with open('../settings/settings.json', mode='r') as f :
-        settings = json.load(f)
-    overwrite_fbx = settings["overwrite_fbx"]
-    delete_obj_mtl = settings["delete_obj_mtl"]
+    settings = load_settings()
+    # command line options override settings.json. the resident worker applies them to every job.
+    overrides = dict()
+    export_exts = get_cmd_export_exts()
+    if export_exts:
+        overrides["export_formats"] = export_exts
+    settings.update(overrides)
+
+    # worker process started by the parallel driver
+    if worker_jobs:
+        run_worker(worker_jobs, settings)
+        return
+
+    # resident worker reading jobs from a spool directory
+    spool_dir = get_cmd_serve()
+    if spool_dir:
+        serve(spool_dir, overrides)
+        return
+
+    logger.info("Process start.")
+    start = time.perf_counter()
+
+    engine = get_cmd_engine() or ENGINE_BLENDER
+    if engine not in ENGINES:
+        logger.error(f'Engine not supported. engine must be {[x for x in ENGINES]} | engine: {engine}')
+        return
+    if engine == ENGINE_BLENDER and not BPY_AVAILABLE:
+        logger.error(f'Blender engine needs to run inside blender. Use "{ENGINE_NUMPY}" engine from python.')
+        return
+    if engine == ENGINE_NUMPY and get_export_formats(settings) != ['fbx']:
+        logger.warning(f'Engine "{ENGINE_NUMPY}" writes FBX only. | export_formats: {get_export_formats(settings)}')
+
+    # worker of a coordinator on another host, claiming tickets from a shared queue directory
+    queue_dir = get_cmd_cluster_worker()
+    if queue_dir:
+        run_cluster_worker(queue_dir, engine, logger)
+        logger.info("Process completed.")
+        return
 
-    # get clothes and coord parent directory from command line args
-    if len(sys.argv) != 5:
+    # get clothes and coord parent directory from command line args.
+    # blender --background --python <script> <parent>, or python <script> <parent>
+    parent_index = 4 if BPY_AVAILABLE else 1
+    if len(sys.argv) <= parent_index:
         logger.error(f'Need to input parent directory.')
         return
-    
-    parent = sys.argv[4]
+
+    parent = sys.argv[parent_index]
 
     if not os.path.exists(parent):
         logger.error(f'Parent dir does not exist. | dir: {os.path.abspath(parent)}')
         return
 
-    clothes_model_dirs = get_model_dirs(parent)
+    # work items are listed lazily. the first convertion starts before the whole tree is scanned.
+    work_items = iter_work_items(iter_model_dirs(parent))
+    results = list()
+
+    # skip items whose obj, mtl, settings and fbx are unchanged since the last convertion
+    manifest = None
+    if settings.get("use_manifest"):
+        manifest = Manifest(parent, settings, engine)
+
+    # list what would be done, without touching the blender scene
+    if get_cmd_dry_run():
+        counts = dict()
+        for clothes_model_dir, clothes_id, obj_path, fbx_state in work_items:
+            stale = manifest.is_stale(clothes_model_dir, os.path.basename(obj_path)) if manifest else None
+            plan = get_plan(fbx_state, settings, stale)
+            counts[plan] = counts.get(plan, 0) + 1
+            logger.info(f'Plan. | clothesId: {clothes_id.id}, plan: {plan}, obj: {obj_path}, obj size: {os.path.getsize(obj_path)}')
+        if not counts:
+            logger.error(f'Cannot find clothes model directory. Check parent directory and file naminig convention, etc.')
+        logger.info(f'Dry run summary. | {", ".join(f"{plan}: {count}" for plan, count in counts.items())}')
+        return
 
-    if not clothes_model_dirs:
-        logger.error(f'Cannot find clothes model directory. Check parent directory and file naminig convention, etc.')
+    # per stage time, memory and mesh size of every convertion, next to the log file
+    report = StageReport(get_report_path(get_log_path(logger)))
+
+    # with --resume, completed items are journaled and a batch which did not finish continues without redoing them.
+    # without it no journal is written into the parent directory.
+    journal = Journal(parent) if get_cmd_resume() else None
+    resume = journal is not None and journal.load()
+    if resume:
+        logger.info(f'Resume the batch. | done: {len(journal.done)}, listed: {len(journal.items)}, listing completed: {journal.listed}')
+    elif journal:
+        logger.info(f'No unfinished batch to resume. The batch starts from the beginning. | journal: {os.path.abspath(journal.path)}')
+    if journal:
+        journal.open(resume)
+
+    def on_result(result: dict) -> None:
+        if manifest and result["status"] == STATUS_CONVERTED:
+            manifest.record(result["model_dir"], result["clothes_id"])
+        if journal:
+            journal.record(result)
+        report.write(result.get("stages", list()))
         return
 
+    def listed_items() -> Iterator[Tuple[str, str]]:
+        listed = ((clothes_model_dir, os.path.basename(obj_path)) for clothes_model_dir, _, obj_path, _ in work_items)
+        if journal is None:
+            yield from listed
+            return
+        # the tree is not scanned again when the stopped batch had listed it
+        if resume and journal.listed:
+            yield from journal.remaining()
+            return
+        yield from journal.add_items(listed)
+        return
 
-    # get clothes obj file list
-    for clothes_model_dir in clothes_model_dirs:
-        clothes_obj_files = [file for file in os.listdir(clothes_model_dir) if get_ext(file) == 'obj']
-        for clothes_obj_file in clothes_obj_files:
-            clothes_id = ClothesId(clothes_obj_file)
-            # skip if not match clothesId
-            if not clothes_id.match:
-                logger.info(f'Skip convertion. Naming convention does not match. | file: {clothes_obj_file}')
+    def stale_items() -> Iterator[Tuple[str, str]]:
+        for clothes_model_dir, clothes_obj_file in listed_items():
+            if manifest and not manifest.is_stale(clothes_model_dir, clothes_obj_file):
+                result = new_result(clothes_model_dir, clothes_obj_file, STATUS_SKIPPED, 'FBX is up to date.')
+                if journal:
+                    journal.record(result)
+                results.append(result)
                 continue
-            
-            # check fbx exists
-            fbx_exists = False
-            if os.path.isfile(os.path.join(clothes_model_dir, clothes_id.id + '.fbx')):
-                fbx_exists = True
-                if not overwrite_fbx:
-                    logger.info(f'Skip convertion. FBX already exists. | clothesId: {clothes_id.id}')
-                    continue
-            
-
-            # convertion
-            logger.info(f'Convert start. | clothesId: {clothes_id.id}')
-            initialize(data)
-            import_model(clothes_model_dir, clothes_id.id, 'obj')
-
-            clo3d_obj = Clo3dItemObj()
-            clo3d_obj.optimize_for_virtualtryon(clothes_id)
-
-            export_model(clothes_model_dir, clothes_id.id, 'fbx')
-            export_msgs = {'Convert completed.'}
-            if fbx_exists:
-                export_msgs.add('FBX was overwritten.')
-
-            logger.info(f'{" ".join(export_msgs)} | clothesId: {clothes_id.id}')
-
-
-            # delete obj
-            if delete_obj_mtl:
-                obj = os.path.join(clothes_model_dir, clothes_id.id + '.obj')
-                mtl = os.path.join(clothes_model_dir, clothes_id.id + '.mtl')
-                deleted_files = set()
-                if os.path.isfile(obj):
-                    os.remove(obj)
-                    deleted_files.add("OBJ")
-                if os.path.isfile(mtl):
-                    os.remove(mtl)
-                    deleted_files.add("MTL")
-
-                if deleted_files:
-                    logger.info(f'{", ".join(deleted_files)} file deleted. | clothesId: {clothes_id.id}')
+            yield clothes_model_dir, clothes_obj_file
+
+    workers = get_cmd_workers()
+    coordinator_dir = get_cmd_coordinator()
+    if coordinator_dir:
+        # cluster workers on any host convert. this process only lists the items and collects the results.
+        results += coordinate(coordinator_dir, stale_items(), settings, float(settings.get("lease_seconds", LEASE_SECONDS)), on_result, logger)
+    elif engine == ENGINE_NUMPY:
+        # plain python processes. no blender scene, no worker job files.
+        results += run_numpy(stale_items(), settings, workers, on_result, logger)
+    else:
+        if workers and workers > 1:
+            # the workers are balanced by obj size, so the whole list is needed first
+            items = list(stale_items())
+            if len(items) > 1:
+                results += run_parallel(os.path.abspath(__file__), parent, items, workers, on_result, settings)
+                items = list()
+        else:
+            items = stale_items()
+
+        scene = BatchScene(settings)
+        # obj reads and fbx moves overlap the convertion of other items
+        pipeline = None
+        pipeline_depth = int(settings.get("pipeline_depth", DEFAULT_PIPELINE_DEPTH))
+        if pipeline_depth > 0:
+            pipeline = ConvertPipeline(settings, pipeline_depth)
+            items = pipeline.items(items)
+
+        try:
+            for clothes_model_dir, clothes_obj_file in items:
+                if pipeline:
+                    export_dir = pipeline.item_export_dir()
+                    result = scene.convert(clothes_model_dir, clothes_obj_file, settings, export_dir= export_dir)
+                    result["export_dir"] = export_dir
+                    finished = pipeline.submit(result)
+                else:
+                    finished = [scene.convert(clothes_model_dir, clothes_obj_file, settings)]
+                for result in finished:
+                    log_result(logger, result)
+                    on_result(result)
+                    results.append(result)
+        finally:
+            # fbx already exported are moved into place even when a convertion exits
+            for result in pipeline.close() if pipeline else list():
+                log_result(logger, result)
+                on_result(result)
+                results.append(result)
+
+    if not results:
+        logger.error(f'Cannot find clothes model directory. Check parent directory and file naminig convention, etc.')
 
+    if manifest:
+        manifest.save()
 
+    if journal:
+        journal.close(finished= True)
+    log_summary(logger, results, time.perf_counter() - start)
+    report.close()
+    for line in report.summary():
+        logger.info(line)
+    logger.info(f'Stage report. | path: {os.path.abspath(report.path)}')
     logger.info("Process completed.")
     return
 
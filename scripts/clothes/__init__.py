@@ -1,2 +1,5 @@
 from clothes.naming import *
-from clothes.clo3dobj import *
\ No newline at end of file
+from clothes.clo3dmesh import *
+from utils import BPY_AVAILABLE
+if BPY_AVAILABLE:
+    from clothes.clo3dobj import *
@@ -0,0 +1,120 @@
+import os, math
+import numpy as np
+from typing import Optional, Tuple
+from inspect import stack
+from logging import getLogger
+
+root_logger_name = os.path.splitext(os.path.basename(stack()[-2].filename))[0]
+module_logger_name = f'{root_logger_name}.clothes.clo3dmesh'
+module_logger = getLogger(module_logger_name)
+
+from utils import get_profiler
+from clothes.naming import ClothesId
+from editor.meshdata import fan_triangles, find_doubles, material_color_table, vertex_normals, value_ids, vertex_charts, decimate, UV_EPSILON, COLOR_EPSILON
+from importer.objparser import ObjData
+from exporter.fbxwriter import FbxMesh, FBX_UNIT_SCALE
+
+CAPTURE_HEIGHT = 160
+MALE_STD_HEIGHT = 170
+FEMALE_STD_HEIGHT = 160
+BASE_SCALE_FACTOR = 0.01
+# same as editor.remove_doubles, in blender units after the rescale
+WELD_THRESHOLD = 1e-05
+
+
+def get_scale_factor(gender: str) -> float:
+    if gender == 'male':
+        return BASE_SCALE_FACTOR * int(FEMALE_STD_HEIGHT / MALE_STD_HEIGHT * 100) / 100
+    return BASE_SCALE_FACTOR * int(FEMALE_STD_HEIGHT / FEMALE_STD_HEIGHT * 100) / 100
+
+
+def optimize_obj_data(obj_data: ObjData, clothes_id: ClothesId, threshold: float = WELD_THRESHOLD) -> FbxMesh:
+    # Clo3dItemObj.optimize_for_virtualtryon on the parsed obj, without blender. the result is in fbx space.
+    # obj space is y up like fbx, so the import and export axis conversions cancel out.
+    profiler = get_profiler()
+    mesh = FbxMesh(clothes_id.id)
+
+    with profiler.stage('join'):
+        # the obj is read as one mesh. faces are split into triangles as the fbx export does.
+        tri_loops, tri_faces = fan_triangles(obj_data.face_sizes)
+        triangles = obj_data.loop_vertices[tri_loops]
+
+    with profiler.stage('vertex_color'):
+        face_materials = obj_data.face_materials.astype(np.int32)
+        mesh.colors = material_color_table(face_materials)
+        color_indices = np.repeat(face_materials[tri_faces], 3).reshape(-1, 3)
+
+    with profiler.stage('bake_transform'):
+        positions = obj_data.positions.astype(np.float64) * get_scale_factor(clothes_id.gender)
+
+    with profiler.stage('weld_and_smooth'):
+        triangles = find_doubles(positions, threshold)[triangles]
+        # triangles collapsed by the weld are removed, as bmesh weld_verts does
+        keep = (triangles[:, 0] != triangles[:, 1]) & (triangles[:, 1] != triangles[:, 2]) & (triangles[:, 2] != triangles[:, 0])
+        triangles, tri_loops, color_indices = triangles[keep], tri_loops[keep], color_indices[keep]
+        used, triangles = np.unique(triangles, return_inverse=True)
+        triangles = triangles.reshape(-1, 3)
+        positions = positions[used]
+        # the custom normals from the obj are replaced by smooth vertex normals
+        mesh.normals = vertex_normals(positions, triangles)
+        mesh.normal_mapping = 'ByVertice'
+
+    with profiler.stage('material'):
+        mesh.material_name = 'M_' + clothes_id.type
+
+    mesh.positions = positions * FBX_UNIT_SCALE
+    mesh.triangles = triangles
+    mesh.color_indices = color_indices.ravel()
+    if obj_data.loop_uvs is not None and len(obj_data.uvs):
+        mesh.uvs = obj_data.uvs
+        mesh.uv_indices = obj_data.loop_uvs[tri_loops].ravel()
+
+    module_logger.debug(f'Garment optimized. | clothesId: {clothes_id.id}, vertices: {len(mesh.positions)}, triangles: {len(mesh.triangles)}')
+    return mesh
+
+
+def get_mesh_charts(mesh: FbxMesh) -> Tuple[np.ndarray, np.ndarray]:
+    # locked vertices and charts of editor.meshdata.vertex_charts. the same for every LOD of the mesh.
+    corner_keys = list()
+    if mesh.uvs is not None:
+        corner_keys.append(value_ids(mesh.uvs, UV_EPSILON)[mesh.uv_indices])
+    if mesh.colors is not None:
+        corner_keys.append(value_ids(mesh.colors, COLOR_EPSILON)[mesh.color_indices])
+    return vertex_charts(len(mesh.positions), mesh.triangles, corner_keys)
+
+
+def decimate_mesh(mesh: FbxMesh, ratio: float, name: str = '', charts: Optional[Tuple[np.ndarray, np.ndarray]] = None) -> FbxMesh:
+    # LOD of the optimized garment with about ratio of its triangles. uv seams, the material color boundaries and
+    # open borders are kept where they are, the vertices inside a chart are clustered.
+    # charts: get_mesh_charts(mesh), computed here when None
+    triangles = mesh.triangles
+    locked, charts = charts or get_mesh_charts(mesh)
+    targets, kept = decimate(mesh.positions, triangles, locked, charts, math.ceil(len(triangles) * ratio))
+
+    # corners of a merged vertex take the uv, color and normal of a corner of the vertex it was merged into
+    referenced, first_corners = np.unique(triangles.ravel(), return_index=True)
+    vertex_corners = np.full(len(mesh.positions), -1, dtype=np.int64)
+    vertex_corners[referenced] = first_corners
+    corners = (kept[:, None] * 3 + np.arange(3)).ravel()
+    original = triangles[kept].ravel()
+    vertices = targets[original]
+    sources = np.where(vertices != original, vertex_corners[vertices], corners)
+
+    lod = FbxMesh(name or mesh.name)
+    used, lod_triangles = np.unique(vertices, return_inverse=True)
+    lod.positions = mesh.positions[used]
+    lod.triangles = lod_triangles.reshape(-1, 3).astype(np.int32)
+    if mesh.normals is not None:
+        lod.normals = mesh.normals[used] if mesh.normal_mapping == 'ByVertice' else mesh.normals[sources]
+    lod.normal_mapping = mesh.normal_mapping
+    if mesh.uvs is not None:
+        used_uvs, lod.uv_indices = np.unique(mesh.uv_indices[sources], return_inverse=True)
+        lod.uvs = mesh.uvs[used_uvs]
+    if mesh.colors is not None:
+        used_colors, lod.color_indices = np.unique(mesh.color_indices[sources], return_inverse=True)
+        lod.colors = mesh.colors[used_colors]
+    lod.material_name = mesh.material_name
+    lod.unit_scale_factor = mesh.unit_scale_factor
+
+    module_logger.debug(f'Garment decimated. | name: {lod.name}, ratio: {ratio}, triangles: {len(triangles)} -> {len(lod.triangles)}')
+    return lod
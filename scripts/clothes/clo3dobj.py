@@ -4,8 +4,11 @@ from typing import List, Optional
 from inspect import stack
 from logging import getLogger
 
+from utils import get_profiler
 from clothes.naming import ClothesId
+from clothes.clo3dmesh import get_scale_factor
 from editor import (
+    get_objects,
     reset_transform_all,
     remove_doubles,
     join_all_meshes,
@@ -13,17 +16,19 @@ from editor import (
     recalculate_normals,
     reset_material,
     rescale,
-
+    bake_transform,
+    weld_and_smooth,
+    replace_materials,
 )
 
 root_logger_name = os.path.splitext(os.path.basename(stack()[-2].filename))[0]
 # module_logger_name = f'{root_logger_name}.clothes.clo3dobj'
 # module_logger = getLogger(module_logger_name)
 
-CAPTURE_HEIGHT = 160
-MALE_STD_HEIGHT = 170
-FEMALE_STD_HEIGHT = 160
-BASE_SCALE_FACTOR = 0.01
+OPTIMIZE_MODES = (
+    'operator',
+    'data',
+)
 
 class Clo3dItemObj:
     def __init__(self) -> None:
@@ -32,7 +37,8 @@ class Clo3dItemObj:
 
         return
 
-    def optimize_for_virtualtryon(self, clothes_id: ClothesId) -> None:
+    def optimize_for_virtualtryon(self, clothes_id: ClothesId, mode: str = 'operator', collection: Optional[bpy.types.Collection] = None) -> None:
+        # collection: only the objects in it are optimized. whole scene when None.
         context = bpy.context
         data = bpy.data
 
@@ -42,19 +48,67 @@ class Clo3dItemObj:
 
         material_name = 'M_' + type
 
-        joined_mesh = join_all_meshes(context, data, id)
-        set_vertexcol_by_materials(context, joined_mesh)
-        joined_mesh = join_all_meshes(context, data, id)
+        scale_factor = get_scale_factor(gender)
+
+        # an obj without faces imports no mesh. the item fails like a bad path does.
+        if not any(ob.type == 'MESH' for ob in get_objects(context, collection)):
+            self._logger.error(f'No mesh to optimize. | clothesId: {id}')
+            sys.exit()
+
+        if mode not in OPTIMIZE_MODES:
+            self._logger.warning(f'Unexpected optimize mode. mode must be {[x for x in OPTIMIZE_MODES]} | mode: {mode}')
+            mode = 'operator'
+
+        if mode == 'data':
+            self._optimize_mesh_data(context, data, id, material_name, scale_factor, collection)
+            return
 
-        if gender == 'male':
-            scale_factor = BASE_SCALE_FACTOR * int(FEMALE_STD_HEIGHT / MALE_STD_HEIGHT * 100) / 100
-        elif gender == 'female':
-            scale_factor = BASE_SCALE_FACTOR * int(FEMALE_STD_HEIGHT / FEMALE_STD_HEIGHT * 100) / 100
-        rescale(context, joined_mesh, scale_factor)
+        profiler = get_profiler()
+        with profiler.stage('join'):
+            joined_mesh = join_all_meshes(context, data, id, collection)
+        with profiler.stage('vertex_color'):
+            set_vertexcol_by_materials(context, joined_mesh)
+        with profiler.stage('rescale'):
+            rescale(context, joined_mesh, scale_factor)
 
-        reset_transform_all(context)
-        remove_doubles(context, joined_mesh)
-        recalculate_normals(context, joined_mesh)
-        reset_material(context, data, joined_mesh, material_name)
+        with profiler.stage('reset_transform'):
+            reset_transform_all(context, objects= collection)
+        with profiler.stage('remove_doubles'):
+            remove_doubles(context, joined_mesh)
+        with profiler.stage('normals'):
+            recalculate_normals(context, joined_mesh)
+        with profiler.stage('material'):
+            reset_material(context, data, joined_mesh, material_name)
 
-        return
\ No newline at end of file
+        return
+
+    def _optimize_mesh_data(
+        self,
+        context: bpy.types.Context,
+        data: bpy.types.BlendData,
+        id: str,
+        material_name: str,
+        scale_factor: float,
+        collection: Optional[bpy.types.Collection] = None,
+    ) -> None:
+        # same steps on the mesh datablock. no selection, no mode switch, no scene wide operator.
+        profiler = get_profiler()
+        with profiler.stage('join'):
+            meshes = [ob for ob in get_objects(context, collection) if ob.type == 'MESH']
+            if len(meshes) > 1:
+                joined_mesh = join_all_meshes(context, data, id, meshes if collection else None)
+            else:
+                joined_mesh = meshes[0]
+                joined_mesh.name = id
+                joined_mesh.data.name = id
+
+        with profiler.stage('vertex_color'):
+            set_vertexcol_by_materials(context, joined_mesh)
+        with profiler.stage('bake_transform'):
+            bake_transform(joined_mesh, scale_factor)
+        with profiler.stage('weld_and_smooth'):
+            weld_and_smooth(joined_mesh)
+        with profiler.stage('material'):
+            replace_materials(data, joined_mesh, material_name)
+
+        return
@@ -1,9 +1,10 @@
 import os, re
-from typing import Dict, List
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
 from inspect import stack
 from logging import getLogger
 
-from utils import get_filename_without_ext
+from utils import get_filename_without_ext, get_ext
 
 root_logger_name = os.path.splitext(os.path.basename(stack()[-2].filename))[0]
 module_logger_name = f'{root_logger_name}.clothes.naming'
@@ -11,68 +12,119 @@ module_logger = getLogger(module_logger_name)
 
 PATTERN_CLOHTES_ID = '[0-9]{4}[mfMF][tbodiTBODI]$'
 PATTERN_COORD_ID = 'c[0-9]{4}$'
-FBX_DIR = '1.result\\fbx'
+FBX_DIR = os.path.join('1.result', 'fbx')
 CLOTHES_DIR_NAME = 'clothes'
 COORD_DIR_NAME = 'coord'
 
-class ClothesId:
-    def __init__(self, string: str) -> None:
-        self.match = is_clothes_id(string)
-        if self.match:
-            self.id = get_filename_without_ext(string)
-            self.type  = get_clothes_type(self.id)
-            self.gender = get_gender(self.id)
+CLOTHES_ID_REGEX = re.compile(PATTERN_CLOHTES_ID)
+COORD_ID_REGEX = re.compile(PATTERN_COORD_ID)
+# one file name per line, with or without extension
+LISTING_REGEX = re.compile('^(([0-9]{4}[mfMF][tbodiTBODI])(?:\\.[^.\n]*)?)$', re.MULTILINE)
+GENDERS = {'m': 'male', 'f': 'female'}
+CLOTHES_TYPES = {'t': 'top', 'i': 'top', 'b': 'bottom', 'd': 'dress', 'o': 'outer'}
+PARSE_CACHE_SIZE = 65536
+
+
+class ClothesId(NamedTuple):
+    match: bool
+    id: str
+    type: str
+    gender: str
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_clothes_id(string: str) -> ClothesId:
+    id = get_filename_without_ext(string)
+    if not CLOTHES_ID_REGEX.fullmatch(id):
+        return ClothesId(False, id, '', '')
+    return _new_clothes_id(id)
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _new_clothes_id(id: str) -> ClothesId:
+    return ClothesId(True, id, get_clothes_type(id), get_gender(id))
+
+
+def parse_many(names: Iterable[str]) -> Dict[str, ClothesId]:
+    # classifies a whole directory listing with one regex scan. only matching names are returned.
+    listing = '\n'.join(names)
+    return {name: _new_clothes_id(id) for name, id in LISTING_REGEX.findall(listing)}
 
-        return
-       
 
 def get_model_dirs(parent: str) -> List[str]:
-    model_dirs = list()
+    return list(iter_model_dirs(parent))
+
+
+def iter_model_dirs(parent: str) -> Iterator[str]:
+    # DirEntry.is_dir uses the type from the directory listing, no stat per child
+    with os.scandir(parent) as children:
+        for child in children:
+            if child.name.lower() == CLOTHES_DIR_NAME:
+                is_id = is_clothes_id
+            elif child.name.lower() == COORD_DIR_NAME:
+                is_id = is_coord_id
+            else:
+                continue
+            if not child.is_dir():
+                continue
+
+            with os.scandir(child.path) as ids:
+                for d in ids:
+                    if is_id(d.name) and d.is_dir():
+                        yield os.path.join(d.path, FBX_DIR)
+    return
+
+
+def get_work_items(model_dirs: Iterable[str]) -> List[Tuple[str, str]]:
+    # (model_dir, obj_file) of every obj which matches the clothesId naming convention
+    return [(model_dir, os.path.basename(obj_path)) for model_dir, _, obj_path, _ in iter_work_items(model_dirs)]
+
+
+def iter_work_items(model_dirs: Iterable[str]) -> Iterator[Tuple[str, ClothesId, str, Optional[os.stat_result]]]:
+    # (model_dir, clothesId, obj_path, fbx stat or None) per obj, as soon as its model directory is listed
+    for model_dir in model_dirs:
+        obj_entries = list()
+        fbx_entries = dict()
+        try:
+            with os.scandir(model_dir) as files:
+                for file in files:
+                    ext = get_ext(file.name)
+                    if ext == 'obj':
+                        obj_entries.append(file)
+                    elif ext == 'fbx':
+                        fbx_entries[get_filename_without_ext(file.name)] = file
+        except OSError as e:
+            module_logger.warning(f'Cannot read model directory. | dir: {model_dir}, error: {e}')
+            continue
 
-    for child in os.listdir(parent):
-        if child.lower() == CLOTHES_DIR_NAME:
-            clothes_dir = os.path.join(parent, child)
-            model_dirs += [
-                os.path.join(clothes_dir, d, FBX_DIR) for d in os.listdir(clothes_dir) if os.path.isdir(os.path.join(clothes_dir, d)) and is_clothes_id(d)
-            ]
-        elif child.lower() == COORD_DIR_NAME:
-            coord_dir = os.path.join(parent, child)
-            model_dirs += [
-                os.path.join(coord_dir, d, FBX_DIR) for d in os.listdir(coord_dir) if os.path.isdir(os.path.join(coord_dir, d)) and is_coord_id(d)
-            ]
+        clothes_ids = parse_many(entry.name for entry in obj_entries)
+        for obj_entry in obj_entries:
+            clothes_id = clothes_ids.get(obj_entry.name)
+            if not clothes_id:
+                module_logger.info(f'Skip convertion. Naming convention does not match. | file: {obj_entry.name}')
+                continue
+            # cached by the listing on windows
+            fbx_entry = fbx_entries.get(clothes_id.id)
+            yield model_dir, clothes_id, obj_entry.path, fbx_entry.stat() if fbx_entry else None
 
-    return model_dirs
+    return
 
 
 def is_clothes_id(string: str) -> bool:
-    return re.fullmatch(PATTERN_CLOHTES_ID, get_filename_without_ext(string))
+    return CLOTHES_ID_REGEX.fullmatch(get_filename_without_ext(string))
 
 def is_coord_id(string: str) -> bool:
-    return re.fullmatch(PATTERN_COORD_ID, get_filename_without_ext(string))
+    return COORD_ID_REGEX.fullmatch(get_filename_without_ext(string))
 
 
 def get_gender(clothes_id: str) -> str:
-    gender_code = clothes_id[-2]
-    if gender_code == 'm' or gender_code == 'M':
-        gender = 'male'
-    elif gender_code == 'f' or gender_code == 'F':
-        gender = 'female'
-    else:
-        gender = ''
+    gender = GENDERS.get(clothes_id[-2].lower(), '')
+    if not gender:
         module_logger.error(f'Gender code does not match. | clothesId: {clothes_id}')
     return gender
 
 def get_clothes_type(clothes_id: str) -> str:
-    type_code = clothes_id[-1]
-    if type_code == 't' or type_code == 'T' or type_code == 'i' or type_code == 'I':
-        clothes_type = 'top'
-    elif type_code == 'b' or type_code == 'B':
-        clothes_type = 'bottom'
-    elif type_code == 'd' or type_code == 'D':
-        clothes_type = 'dress'
-    elif type_code == 'o' or type_code == 'O':
-        clothes_type = 'outer'
-    else:
-        clothes_type = ''
+    clothes_type = CLOTHES_TYPES.get(clothes_id[-1].lower(), '')
+    if not clothes_type:
         module_logger.error(f'Clothes type code does not match. | clothesId: {clothes_id}')
-    return clothes_type
\ No newline at end of file
+    return clothes_type
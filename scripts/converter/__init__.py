@@ -0,0 +1,13 @@
+from converter.result import *
+from converter.manifest import *
+from converter.journal import *
+from converter.lod import *
+from converter.engine import *
+from converter.pipeline import *
+from converter.cluster import *
+from utils import BPY_AVAILABLE
+if BPY_AVAILABLE:
+    from converter.item import *
+    from converter.batch import *
+    from converter.parallel import *
+    from converter.server import *
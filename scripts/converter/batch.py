@@ -0,0 +1,53 @@
+import bpy
+import os
+from typing import Dict, Optional
+from inspect import stack
+from logging import getLogger
+
+root_logger_name = os.path.splitext(os.path.basename(stack()[-2].filename))[0]
+module_logger_name = f'{root_logger_name}.converter.batch'
+module_logger = getLogger(module_logger_name)
+
+from clothes import parse_clothes_id
+from converter.item import convert_item
+from converter.result import STATUS_CONVERTED
+
+DEFAULT_BATCH_SIZE = 1
+
+
+class BatchScene:
+    def __init__(self, settings: Dict[str, any]) -> None:
+        self._logger_name = f'{root_logger_name}.{self.__module__}'
+        self._logger = getLogger(self._logger_name)
+
+        # garments converted in one scene between resets. 1 resets the scene for every garment as before.
+        self.batch_size: int = max(1, int(settings.get("batch_size", DEFAULT_BATCH_SIZE)))
+        self._converted: int = 0
+        # clothesId whose convertion did not return. its collection may be left in the scene.
+        self._interrupted: Optional[str] = None
+
+    def convert(self, model_dir: str, obj_file: str, settings: Dict[str, any], export_dir: Optional[str] = None) -> Dict[str, any]:
+        if self.batch_size == 1:
+            return convert_item(model_dir, obj_file, settings, export_dir= export_dir)
+
+        reset_scene = self._interrupted is not None or self._converted % self.batch_size == 0
+        if self._interrupted is not None:
+            self._remove_leftover(self._interrupted)
+            self._converted = 0
+
+        self._interrupted = parse_clothes_id(obj_file).id
+        result = convert_item(model_dir, obj_file, settings, reset_scene= reset_scene, use_collection= True, export_dir= export_dir)
+        self._interrupted = None
+
+        if result["status"] == STATUS_CONVERTED:
+            self._converted += 1
+        return result
+
+    def _remove_leftover(self, name: str) -> None:
+        # objects are removed by the scene reset of the next convertion
+        bpy.context.view_layer.active_layer_collection = bpy.context.view_layer.layer_collection
+        collection = bpy.data.collections.get(name)
+        if collection:
+            bpy.data.collections.remove(collection)
+        self._logger.warning(f'Scene is reset after a failed convertion. | clothesId: {name}')
+        return
@@ -0,0 +1,261 @@
+import os, json, time, socket, threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from inspect import stack
+from logging import getLogger, Logger
+
+root_logger_name = os.path.splitext(os.path.basename(stack()[-2].filename))[0]
+module_logger_name = f'{root_logger_name}.converter.cluster'
+module_logger = getLogger(module_logger_name)
+
+from utils import get_ext, get_temp_path, replace_file, remove_file, TEMP_INFIX
+from clothes import parse_clothes_id
+from converter.result import new_result, log_result, STATUS_FAILED
+from converter.engine import ENGINE_BLENDER, ENGINE_NUMPY, convert_or_fail
+
+# queue_dir on a file system shared by every host
+#   tickets  … one ticket per ClothesId, written by the coordinator
+#   leased   … tickets claimed by a worker, <ticket>@<worker>.json. the worker touches it while converting.
+#   done     … results written by the workers, collected and removed by the coordinator
+TICKETS_DIR = 'tickets'
+LEASED_DIR = 'leased'
+DONE_DIR = 'done'
+STOP_FILE = 'stop'
+CLOCK_FILE = 'clock'
+TICKET_EXTENSION = 'json'
+LEASE_SEPARATOR = '@'
+REQUEUE_EXTENSION = 'requeue'
+
+LEASE_SECONDS = 300.0
+MAX_ATTEMPTS = 3
+POLL_INTERVAL = 0.5
+PROGRESS_INTERVAL = 60.0
+
+
+def _prepare(queue_dir: str) -> None:
+    for d in (TICKETS_DIR, LEASED_DIR, DONE_DIR):
+        os.makedirs(os.path.join(queue_dir, d), exist_ok=True)
+    return
+
+
+def _list_tickets(directory: str) -> List[str]:
+    # temp files of a write in progress are not listed
+    return sorted(
+        file for file in os.listdir(directory)
+        if get_ext(file) == TICKET_EXTENSION and not os.path.splitext(file)[0].endswith(TEMP_INFIX)
+    )
+
+
+def _write_json(path: str, record: Dict[str, any]) -> None:
+    # readers on other hosts see the whole file or nothing
+    temp_path = get_temp_path(path)
+    with open(temp_path, mode='w') as f:
+        json.dump(record, f)
+    replace_file(temp_path, path)
+    return
+
+
+def _read_json(path: str) -> Optional[Dict[str, any]]:
+    try:
+        with open(path, mode='r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _server_now(queue_dir: str) -> float:
+    # lease times are mtimes set by the file server. the clock of this host is not compared with them.
+    path = os.path.join(queue_dir, CLOCK_FILE)
+    with open(path, mode='a'):
+        pass
+    os.utime(path)
+    return os.stat(path).st_mtime
+
+
+def coordinate(
+    queue_dir: str,
+    work_items: Iterable[Tuple[str, str]],
+    settings: Dict[str, any],
+    lease_seconds: float = LEASE_SECONDS,
+    on_result: Optional[Callable[[Dict[str, any]], None]] = None,
+    logger: Optional[Logger] = None,
+) -> List[Dict[str, any]]:
+    # writes a ticket per work item and waits until every ticket has a result. workers on any host convert them.
+    logger = logger or module_logger
+    _prepare(queue_dir)
+    # a queue left by a stopped coordinator is not resumed. its results could be of other settings.
+    remove_file(os.path.join(queue_dir, STOP_FILE))
+    for d in (TICKETS_DIR, LEASED_DIR, DONE_DIR):
+        for file in os.listdir(os.path.join(queue_dir, d)):
+            remove_file(os.path.join(queue_dir, d, file))
+
+    tickets: Dict[str, Tuple[str, str]] = dict()
+    results = list()
+    last_poll = last_progress = time.perf_counter()
+
+    def collect() -> None:
+        for ticket_file in _list_tickets(os.path.join(queue_dir, DONE_DIR)):
+            path = os.path.join(queue_dir, DONE_DIR, ticket_file)
+            result = _read_json(path)
+            remove_file(path)
+            name = os.path.splitext(ticket_file)[0]
+            # a worker whose lease expired can finish after the requeued ticket. the first result is kept.
+            if result is None or name not in tickets:
+                logger.warning(f'Result of unknown ticket is ignored. | ticket: {ticket_file}')
+                continue
+            tickets.pop(name)
+            add_result(result)
+        return
+
+    def requeue() -> None:
+        now = _server_now(queue_dir)
+        leased_dir = os.path.join(queue_dir, LEASED_DIR)
+        for lease_file in _list_tickets(leased_dir):
+            lease_path = os.path.join(leased_dir, lease_file)
+            try:
+                if now - os.stat(lease_path).st_mtime <= lease_seconds:
+                    continue
+                # taken back from the worker. a worker finishing at the same time keeps its lease instead.
+                requeue_path = f'{os.path.splitext(lease_path)[0]}.{REQUEUE_EXTENSION}'
+                os.rename(lease_path, requeue_path)
+            except FileNotFoundError:
+                continue
+
+            name, _, worker = os.path.splitext(lease_file)[0].rpartition(LEASE_SEPARATOR)
+            ticket = _read_json(requeue_path)
+            remove_file(requeue_path)
+            if ticket is None or name not in tickets:
+                continue
+            ticket["attempts"] = ticket.get("attempts", 0) + 1
+            if ticket["attempts"] >= MAX_ATTEMPTS:
+                logger.error(f'Lease expired too many times. | ticket: {name}, worker: {worker}, attempts: {ticket["attempts"]}')
+                tickets.pop(name)
+                add_result(new_result(ticket["model_dir"], ticket["obj_file"], STATUS_FAILED, f'Lease expired {ticket["attempts"]} times. The last worker was {worker}.'))
+                continue
+            logger.warning(f'Lease expired. Requeue the ticket. | ticket: {name}, worker: {worker}, attempts: {ticket["attempts"]}')
+            _write_json(os.path.join(queue_dir, TICKETS_DIR, f'{name}.{TICKET_EXTENSION}'), ticket)
+        return
+
+    def add_result(result: Dict[str, any]) -> None:
+        log_result(logger, result)
+        if on_result:
+            on_result(result)
+        results.append(result)
+        return
+
+    def poll() -> None:
+        nonlocal last_poll, last_progress
+        collect()
+        requeue()
+        last_poll = time.perf_counter()
+        if last_poll - last_progress > PROGRESS_INTERVAL:
+            last_progress = last_poll
+            leased = len(_list_tickets(os.path.join(queue_dir, LEASED_DIR)))
+            logger.info(f'Waiting for workers. | remaining: {len(tickets)}, leased: {leased}, done: {len(results)}')
+        return
+
+    logger.info(f'Coordinator start. | queue: {os.path.abspath(queue_dir)}, lease seconds: {lease_seconds}')
+    # tickets are written while the tree is listed. workers start on the first ones.
+    for i, (model_dir, obj_file) in enumerate(work_items):
+        name = f'{i:06d}_{parse_clothes_id(obj_file).id}'
+        tickets[name] = (model_dir, obj_file)
+        _write_json(os.path.join(queue_dir, TICKETS_DIR, f'{name}.{TICKET_EXTENSION}'), {
+            "model_dir": os.path.abspath(model_dir),
+            "obj_file": obj_file,
+            "settings": settings,
+            "lease_seconds": lease_seconds,
+            "attempts": 0,
+        })
+        if time.perf_counter() - last_poll > POLL_INTERVAL:
+            poll()
+
+    logger.info(f'All tickets queued. | tickets: {len(tickets) + len(results)}')
+    while tickets:
+        poll()
+        if tickets:
+            time.sleep(POLL_INTERVAL)
+
+    # workers exit when the queue is empty
+    with open(os.path.join(queue_dir, STOP_FILE), mode='w'):
+        pass
+    return results
+
+
+def _claim(queue_dir: str, worker_id: str) -> Optional[Tuple[str, str]]:
+    # the rename is atomic on the file server. one worker wins, the others find the ticket gone.
+    for ticket_file in _list_tickets(os.path.join(queue_dir, TICKETS_DIR)):
+        name = os.path.splitext(ticket_file)[0]
+        lease_path = os.path.join(queue_dir, LEASED_DIR, f'{name}{LEASE_SEPARATOR}{worker_id}.{TICKET_EXTENSION}')
+        try:
+            os.rename(os.path.join(queue_dir, TICKETS_DIR, ticket_file), lease_path)
+            # the rename keeps the mtime of the ticket, which may have waited longer than the lease
+            os.utime(lease_path)
+        except FileNotFoundError:
+            continue
+        return name, lease_path
+    return None
+
+
+def _heartbeat(lease_path: str, interval: float, stop: threading.Event) -> None:
+    while not stop.wait(interval):
+        try:
+            os.utime(lease_path)
+        except FileNotFoundError:
+            # taken back by the coordinator. the convertion goes on, its result may be ignored.
+            module_logger.warning(f'Lease lost. | lease: {os.path.basename(lease_path)}')
+            return
+    return
+
+
+def run_cluster_worker(queue_dir: str, engine: str = ENGINE_BLENDER, logger: Optional[Logger] = None) -> List[Dict[str, any]]:
+    # claims tickets until the coordinator writes the stop file and the queue is empty
+    logger = logger or module_logger
+    _prepare(queue_dir)
+    worker_id = f'{socket.gethostname()}-{os.getpid()}'
+    scene = None
+    results = list()
+
+    logger.info(f'Cluster worker start. | queue: {os.path.abspath(queue_dir)}, worker: {worker_id}, engine: {engine}')
+    while True:
+        claimed = _claim(queue_dir, worker_id)
+        if claimed is None:
+            if os.path.isfile(os.path.join(queue_dir, STOP_FILE)):
+                break
+            time.sleep(POLL_INTERVAL)
+            continue
+
+        name, lease_path = claimed
+        ticket = _read_json(lease_path)
+        if ticket is None:
+            logger.error(f'Cannot read ticket. | ticket: {name}')
+            remove_file(lease_path)
+            continue
+        model_dir, obj_file, settings = ticket["model_dir"], ticket["obj_file"], ticket["settings"]
+
+        stop = threading.Event()
+        heartbeat = threading.Thread(target=_heartbeat, args=(lease_path, ticket["lease_seconds"] / 3, stop), daemon=True)
+        heartbeat.start()
+        try:
+            if engine == ENGINE_NUMPY:
+                result = convert_or_fail(model_dir, obj_file, settings)
+            else:
+                try:
+                    if scene is None:
+                        from converter.batch import BatchScene
+                        scene = BatchScene(settings)
+                    result = scene.convert(model_dir, obj_file, settings)
+                # importer/exporter call sys.exit() on error. the worker has to survive it.
+                except (Exception, SystemExit) as e:
+                    logger.exception(f'Convert failed. | file: {obj_file}')
+                    result = new_result(model_dir, obj_file, STATUS_FAILED, f'{type(e).__name__}: {e}')
+        finally:
+            stop.set()
+            heartbeat.join()
+
+        result["worker"] = worker_id
+        log_result(logger, result)
+        _write_json(os.path.join(queue_dir, DONE_DIR, f'{name}.{TICKET_EXTENSION}'), result)
+        remove_file(lease_path)
+        results.append(result)
+
+    logger.info(f'Cluster worker stopped. | worker: {worker_id}, items: {len(results)}')
+    return results
@@ -0,0 +1,145 @@
+import os, sys, time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional, Tuple
+from inspect import stack
+from logging import getLogger, Logger
+
+root_logger_name = os.path.splitext(os.path.basename(stack()[-2].filename))[0]
+module_logger_name = f'{root_logger_name}.converter.engine'
+module_logger = getLogger(module_logger_name)
+
+from utils import get_profiler, validate_path, get_temp_path, replace_file, remove_file
+from clothes import parse_clothes_id, optimize_obj_data
+from importer import parse_obj, parse_obj_mmap
+from exporter import write_fbx
+from converter.result import new_result, delete_obj_mtl, log_result, STATUS_SKIPPED, STATUS_FAILED
+from converter.lod import get_lod_ratios, submit_lods
+
+ENGINE_BLENDER = 'blender'
+ENGINE_NUMPY = 'numpy'
+ENGINES = (
+    ENGINE_BLENDER,
+    ENGINE_NUMPY,
+)
+
+
+def convert_item_numpy(model_dir: str, obj_file: str, settings: Dict[str, any]) -> Dict[str, any]:
+    # convert_item without blender. obj to fbx with numpy only, usable from plain python.
+    clothes_id = parse_clothes_id(obj_file)
+    start = time.perf_counter()
+    result = new_result(model_dir, obj_file)
+
+    fbx_exists = os.path.isfile(os.path.join(model_dir, clothes_id.id + '.fbx'))
+    if fbx_exists and not settings["overwrite_fbx"] and not settings.get("use_manifest"):
+        result["status"] = STATUS_SKIPPED
+        result["messages"].append('FBX already exists.')
+        return result
+
+    module_logger.info(f'Convert start. | clothesId: {clothes_id.id}')
+    profiler = get_profiler()
+    # no scene to count
+    profiler.counter = None
+    profiler.begin_item(clothes_id.id)
+
+    with profiler.stage('import'):
+        path_valid = validate_path(model_dir, clothes_id.id, 'obj')
+        if path_valid.get("error") or path_valid.get("warn"):
+            module_logger.error(path_valid.get("error") or path_valid.get("warn"))
+            sys.exit()
+        # mmap bounds the memory of very large files. other readers need blender and read as numpy.
+        reader = parse_obj_mmap if settings.get("obj_reader") == 'mmap' else parse_obj
+        obj_data = reader(path_valid["path"])
+
+    with profiler.stage('optimize'):
+        mesh = optimize_obj_data(obj_data, clothes_id)
+    # LODs are decimated and written on a thread while the full mesh is written
+    lod_ratios = get_lod_ratios(settings)
+    lod_future = submit_lods(model_dir, clothes_id.id, mesh, lod_ratios) if lod_ratios else None
+
+    # fbx only. other export_formats need the blender exporters.
+    with profiler.stage('export_fbx') as record:
+        path_valid = validate_path(model_dir, clothes_id.id, 'fbx')
+        if path_valid.get("error"):
+            module_logger.error(path_valid["error"])
+            sys.exit()
+        temp_path = get_temp_path(path_valid["path"])
+        try:
+            write_fbx(temp_path, mesh)
+        except BaseException:
+            remove_file(temp_path)
+            raise
+        replace_file(temp_path, path_valid["path"])
+        record["bytes"] = os.path.getsize(path_valid["path"])
+    result["outputs"] = [f'{clothes_id.id}.fbx']
+    for lod in lod_future.result() if lod_future else list():
+        file = lod.pop("file", None)
+        profiler.record(**lod)
+        if file:
+            result["outputs"].append(file)
+    result["messages"].append('Convert completed.')
+    if fbx_exists:
+        result["messages"].append('FBX was overwritten.')
+
+    if settings["delete_obj_mtl"]:
+        deleted_files = delete_obj_mtl(model_dir, clothes_id.id)
+        if deleted_files:
+            result["messages"].append(f'{", ".join(deleted_files)} file deleted.')
+
+    result["stages"] = profiler.end_item()
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def convert_or_fail(model_dir: str, obj_file: str, settings: Dict[str, any]) -> Dict[str, any]:
+    try:
+        return convert_item_numpy(model_dir, obj_file, settings)
+    # sys.exit() on a bad path. keep converting the rest.
+    except (Exception, SystemExit) as e:
+        module_logger.exception(f'Convert failed. | file: {obj_file}')
+        return new_result(model_dir, obj_file, STATUS_FAILED, f'{type(e).__name__}: {e}')
+
+
+def run_numpy(
+    work_items: List[Tuple[str, str]],
+    settings: Dict[str, any],
+    workers: Optional[int] = None,
+    on_result: Optional[Callable[[Dict[str, any]], None]] = None,
+    logger: Optional[Logger] = None,
+) -> List[Dict[str, any]]:
+    # one plain python process per worker. no blender is started.
+    # logger: results are logged to it. module loggers are not under the root logger when started from plain python.
+    logger = logger or module_logger
+    results = list()
+    if not workers or workers <= 1:
+        for model_dir, obj_file in work_items:
+            result = convert_or_fail(model_dir, obj_file, settings)
+            log_result(logger, result)
+            if on_result:
+                on_result(result)
+            results.append(result)
+        return results
+
+    # largest obj first, the pool hands the next item to the first free worker
+    def obj_size(item: Tuple[str, str]) -> int:
+        try:
+            return os.path.getsize(os.path.join(*item))
+        except OSError:
+            return 0
+    work_items = sorted(work_items, key=obj_size, reverse=True)
+
+    logger.info(f'Parallel convertion start. | engine: {ENGINE_NUMPY}, workers: {workers}, items: {len(work_items)}')
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(convert_or_fail, model_dir, obj_file, settings): (model_dir, obj_file) for model_dir, obj_file in work_items}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            # worker process died
+            except Exception as e:
+                model_dir, obj_file = futures[future]
+                result = new_result(model_dir, obj_file, STATUS_FAILED, f'{type(e).__name__}: {e}')
+            log_result(logger, result)
+            if on_result:
+                on_result(result)
+            results.append(result)
+
+    return results
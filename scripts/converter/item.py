@@ -0,0 +1,113 @@
+import bpy
+import os, time
+from typing import Dict, Optional
+from inspect import stack
+from logging import getLogger
+
+root_logger_name = os.path.splitext(os.path.basename(stack()[-2].filename))[0]
+module_logger_name = f'{root_logger_name}.converter.item'
+module_logger = getLogger(module_logger_name)
+
+from utils import get_profiler
+from editor import initialize, get_scene_stats, new_active_collection, remove_collection
+from importer import import_model
+from exporter import export_model, get_texture_optimizer, get_fbx_mesh
+from clothes import parse_clothes_id, Clo3dItemObj
+from converter.result import new_result, delete_obj_mtl, get_export_formats, STATUS_SKIPPED
+from converter.lod import get_lod_ratios, submit_lods
+
+def convert_item(
+    model_dir: str,
+    obj_file: str,
+    settings: Dict[str, any],
+    reset_scene: bool = True,
+    use_collection: bool = False,
+    export_dir: Optional[str] = None,
+) -> Dict[str, any]:
+    # use_collection: the garment is imported, optimized and exported in its own collection, then removed
+    # export_dir: the outputs are exported there instead of model_dir. moving them and deleting the obj/mtl is left to the caller.
+    clothes_id = parse_clothes_id(obj_file)
+    start = time.perf_counter()
+    result = new_result(model_dir, obj_file)
+    export_formats = get_export_formats(settings)
+
+    # check the first output exists. with the manifest, items reaching here are already known to be stale.
+    output_exists = os.path.isfile(os.path.join(model_dir, f'{clothes_id.id}.{export_formats[0]}'))
+    if output_exists and not settings["overwrite_fbx"] and not settings.get("use_manifest"):
+        result["status"] = STATUS_SKIPPED
+        result["messages"].append(f'{export_formats[0].upper()} already exists.')
+        return result
+
+    # convertion
+    module_logger.info(f'Convert start. | clothesId: {clothes_id.id}')
+    profiler = get_profiler()
+    profiler.counter = lambda: get_scene_stats(bpy.context)
+    profiler.begin_item(clothes_id.id)
+
+    # images left on the materials after the optimize are resized and transcoded at the export
+    texture_optimizer = get_texture_optimizer(settings)
+
+    if reset_scene:
+        with profiler.stage('initialize'):
+            initialize(bpy.data)
+    collection = None
+    if use_collection:
+        collection = new_active_collection(bpy.context, bpy.data, clothes_id.id)
+        profiler.counter = lambda: get_scene_stats(bpy.context, collection)
+    with profiler.stage('import'):
+        import_model(model_dir, clothes_id.id, 'obj', obj_reader= settings.get("obj_reader", 'legacy'))
+
+    with profiler.stage('optimize'):
+        clo3d_obj = Clo3dItemObj()
+        clo3d_obj.optimize_for_virtualtryon(clothes_id, mode= settings.get("optimize_mode", 'operator'), collection= collection)
+
+    # the optimized mesh is read once from the scene. its LODs are decimated and written on a thread during the export.
+    lod_future = None
+    lod_ratios = get_lod_ratios(settings)
+    if lod_ratios:
+        with profiler.stage('lod_mesh'):
+            mesh = get_fbx_mesh(bpy.context, use_collection)
+        if mesh is None:
+            result["messages"].append('LOD needs a single mesh. No LOD was written.')
+        else:
+            lod_future = submit_lods(export_dir or model_dir, clothes_id.id, mesh, lod_ratios)
+
+    # every format from the same optimized scene. the export stage is the whole, overlapped writes included.
+    with profiler.stage('export'):
+        outputs = export_model(
+            export_dir or model_dir,
+            clothes_id.id,
+            export_formats,
+            use_active_collection= use_collection,
+            fbx_writer= settings.get("fbx_writer", 'blender'),
+            texture_optimizer= texture_optimizer,
+            glb_profile= settings.get("glb_profile", 'default'),
+        )
+    # time and file size per format
+    for extension, output in outputs.items():
+        profiler.record(f'export_{extension}', output["wall"], output["cpu"], bytes= output["bytes"])
+    result["outputs"] = [f'{clothes_id.id}.{extension}' for extension in export_formats]
+    # time, file size and triangles per LOD
+    for lod in lod_future.result() if lod_future else list():
+        file = lod.pop("file", None)
+        profiler.record(**lod)
+        if file:
+            result["outputs"].append(file)
+    if collection:
+        # the collection is removed in this stage
+        profiler.counter = lambda: get_scene_stats(bpy.context)
+        with profiler.stage('cleanup'):
+            remove_collection(bpy.context, bpy.data, collection)
+    result["messages"].append('Convert completed.')
+    if output_exists:
+        result["messages"].append(f'{export_formats[0].upper()} was overwritten.')
+
+    # delete obj
+    if settings["delete_obj_mtl"] and not export_dir:
+        deleted_files = delete_obj_mtl(model_dir, clothes_id.id)
+        if deleted_files:
+            result["messages"].append(f'{", ".join(deleted_files)} file deleted.')
+
+    result["stages"] = profiler.end_item()
+    result["seconds"] = time.perf_counter() - start
+    return result
@@ -0,0 +1,164 @@
+import os, json, time
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+from inspect import stack
+from logging import getLogger
+
+root_logger_name = os.path.splitext(os.path.basename(stack()[-2].filename))[0]
+module_logger_name = f'{root_logger_name}.converter.journal'
+module_logger = getLogger(module_logger_name)
+
+from clothes import parse_clothes_id
+from converter.result import STATUS_CONVERTED, STATUS_SKIPPED
+
+JOURNAL_FILE_NAME = '.vtryon_journal.jsonl'
+JOURNAL_FORMAT = 1
+
+# one json per line, appended while the batch runs
+EVENT_START = 'start'
+EVENT_ITEM = 'item'
+EVENT_LISTED = 'listed'
+EVENT_DONE = 'done'
+EVENT_FINISHED = 'finished'
+
+# failed items are converted again when resumed
+DONE_STATUSES = (
+    STATUS_CONVERTED,
+    STATUS_SKIPPED,
+)
+
+
+class Journal:
+    def __init__(self, parent: str) -> None:
+        self._logger_name = f'{root_logger_name}.{self.__module__}'
+        self._logger = getLogger(self._logger_name)
+
+        self.parent: str = parent
+        self.path: str = os.path.join(parent, JOURNAL_FILE_NAME)
+        # work items in listing order, as paths relative to parent
+        self.items: List[Tuple[str, str]] = list()
+        # (model_dir, clothesId) relative to parent
+        self.done: Set[Tuple[str, str]] = set()
+        # the whole tree was listed. a resumed batch does not scan it again.
+        self.listed: bool = False
+        self.finished: bool = False
+        self._listed_keys: Set[Tuple[str, str]] = set()
+        self._file = None
+
+    def load(self) -> bool:
+        # True when the journal is of a batch which did not finish
+        if not os.path.isfile(self.path):
+            return False
+
+        try:
+            with open(self.path, mode='r') as f:
+                lines = f.read().splitlines()
+        except OSError as e:
+            self._logger.warning(f'Cannot read journal. | path: {self.path}, error: {e}')
+            return False
+
+        records = list()
+        for i, line in enumerate(lines):
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                # the last line can be cut by the kill
+                if i != len(lines) - 1:
+                    self._logger.warning(f'Broken journal line is ignored. | path: {self.path}, line: {i + 1}')
+
+        if not records or records[0].get("event") != EVENT_START or records[0].get("format") != JOURNAL_FORMAT:
+            return False
+        for record in records:
+            self._apply(record)
+        return not self.finished
+
+    def _apply(self, record: Dict[str, any]) -> None:
+        event = record.get("event")
+        if event == EVENT_ITEM:
+            key = (record["model_dir"], parse_clothes_id(record["obj_file"]).id)
+            if key not in self._listed_keys:
+                self._listed_keys.add(key)
+                self.items.append((record["model_dir"], record["obj_file"]))
+        elif event == EVENT_LISTED:
+            self.listed = True
+        elif event == EVENT_DONE:
+            self.done.add((record["model_dir"], record["clothes_id"]))
+        elif event == EVENT_FINISHED:
+            self.finished = True
+        return
+
+    def open(self, resume: bool = False) -> None:
+        # resume: appends to the loaded journal. otherwise a new journal is started.
+        if not resume:
+            self.items, self.done, self._listed_keys = list(), set(), set()
+            self.listed = self.finished = False
+        self._file = open(self.path, mode='a' if resume else 'w')
+        if not resume:
+            self._write({"event": EVENT_START, "format": JOURNAL_FORMAT, "time": time.time()})
+        elif self._file.tell() and not self._ends_with_newline():
+            # the line cut by the kill is closed, so that the next record starts on its own line
+            self._file.write('\n')
+        return
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.path, mode='rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b'\n'
+
+    def close(self, finished: bool = True) -> None:
+        if self._file is None:
+            return
+        if finished:
+            self._write({"event": EVENT_FINISHED, "time": time.time()}, sync=True)
+        self._file.close()
+        self._file = None
+        return
+
+    def _write(self, record: Dict[str, any], sync: bool = False) -> None:
+        self._file.write(json.dumps(record) + '\n')
+        self._file.flush()
+        if sync:
+            os.fsync(self._file.fileno())
+        return
+
+    def _relpath(self, model_dir: str) -> str:
+        return os.path.relpath(model_dir, self.parent).replace('\\', '/')
+
+    def is_done(self, model_dir: str, obj_file: str) -> bool:
+        return (self._relpath(model_dir), parse_clothes_id(obj_file).id) in self.done
+
+    def add_items(self, work_items: Iterable[Tuple[str, str]]) -> Iterator[Tuple[str, str]]:
+        # journals the listed items, then yields the ones not done yet. the listing is marked complete at the end.
+        for model_dir, obj_file in work_items:
+            key = (self._relpath(model_dir), parse_clothes_id(obj_file).id)
+            if key not in self._listed_keys:
+                self._listed_keys.add(key)
+                self.items.append((key[0], obj_file))
+                self._write({"event": EVENT_ITEM, "model_dir": key[0], "obj_file": obj_file})
+            if key not in self.done:
+                yield model_dir, obj_file
+
+        self.listed = True
+        self._write({"event": EVENT_LISTED}, sync=True)
+        return
+
+    def remaining(self) -> Iterator[Tuple[str, str]]:
+        # items of the journal not done yet, without scanning the tree
+        for rel_dir, obj_file in self.items:
+            model_dir = os.path.normpath(os.path.join(self.parent, rel_dir))
+            if self.is_done(model_dir, obj_file):
+                continue
+            # killed after the fbx was in place and the obj deleted, before the item was journaled
+            clothes_id = parse_clothes_id(obj_file).id
+            if not os.path.isfile(os.path.join(model_dir, obj_file)) and os.path.isfile(os.path.join(model_dir, clothes_id + '.fbx')):
+                self._logger.info(f'OBJ already converted and deleted. | clothesId: {clothes_id}')
+                continue
+            yield model_dir, obj_file
+        return
+
+    def record(self, result: Dict[str, any]) -> None:
+        if result["status"] not in DONE_STATUSES:
+            return
+        key = (self._relpath(result["model_dir"]), result["clothes_id"])
+        self.done.add(key)
+        self._write({"event": EVENT_DONE, "model_dir": key[0], "clothes_id": key[1], "status": result["status"]}, sync=True)
+        return
@@ -0,0 +1,87 @@
+import os, sys, time, atexit
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List
+from inspect import stack
+from logging import getLogger
+
+root_logger_name = os.path.splitext(os.path.basename(stack()[-2].filename))[0]
+module_logger_name = f'{root_logger_name}.converter.lod'
+module_logger = getLogger(module_logger_name)
+
+from utils import validate_path, get_temp_path, replace_file, remove_file
+from clothes import decimate_mesh, get_mesh_charts
+from exporter import FbxMesh, write_fbx
+
+# <clothesId>_LOD1.fbx is the largest LOD
+LOD_SUFFIX = '_LOD'
+# the decimation holds the gil. one thread overlaps it with the export, garments run in parallel in the worker processes.
+LOD_WORKERS = 1
+
+_lod_executor = None
+
+
+def get_lod_ratios(settings: Dict[str, any]) -> List[float]:
+    # triangle budgets of the LODs, largest first. empty when no LOD is written.
+    ratios = list()
+    for ratio in settings.get("lod_ratios") or list():
+        if not 0 < float(ratio) < 1:
+            module_logger.warning(f'Unexpected LOD ratio. ratio must be between 0 and 1 | lod_ratio: {ratio}')
+            continue
+        if float(ratio) not in ratios:
+            ratios.append(float(ratio))
+    return sorted(ratios, reverse=True)
+
+
+def get_lod_name(file_name: str, level: int) -> str:
+    return f'{file_name}{LOD_SUFFIX}{level}'
+
+
+def submit_lods(directory: str, file_name: str, mesh: FbxMesh, ratios: List[float]) -> Future:
+    # decimates and writes <file_name>_LOD<level>.fbx per ratio on a thread, while the caller exports the full mesh.
+    # the future returns StageProfiler.record arguments: the charts shared by the LODs, then each LOD with its file, bytes and triangles.
+    # the paths are checked here, before the caller exports anything.
+    paths = list()
+    for level in range(1, len(ratios) + 1):
+        path_valid = validate_path(directory, get_lod_name(file_name, level), 'fbx')
+        if path_valid.get("error"):
+            module_logger.error(path_valid["error"])
+            sys.exit()
+        paths.append(path_valid["path"])
+
+    global _lod_executor
+    if _lod_executor is None:
+        _lod_executor = ThreadPoolExecutor(max_workers=LOD_WORKERS, thread_name_prefix='vtryon_lod')
+        atexit.register(_lod_executor.shutdown)
+    return _lod_executor.submit(export_lods, paths, mesh, ratios)
+
+
+def export_lods(paths: List[str], mesh: FbxMesh, ratios: List[float]) -> List[Dict[str, any]]:
+    # paths: one fbx path per ratio, checked by the caller
+    wall = time.perf_counter()
+    cpu = time.thread_time()
+    charts = get_mesh_charts(mesh)
+    records = [{"name": 'lod_charts', "wall": time.perf_counter() - wall, "cpu": time.thread_time() - cpu}]
+
+    for level, (path, ratio) in enumerate(zip(paths, ratios), start=1):
+        wall = time.perf_counter()
+        cpu = time.thread_time()
+        lod = decimate_mesh(mesh, ratio, os.path.splitext(os.path.basename(path))[0], charts)
+        temp_path = get_temp_path(path)
+        try:
+            write_fbx(temp_path, lod)
+        except BaseException:
+            remove_file(temp_path)
+            raise
+        size = os.path.getsize(temp_path)
+        replace_file(temp_path, path)
+
+        records.append({
+            "name": f'lod{level}',
+            "file": os.path.basename(path),
+            "wall": time.perf_counter() - wall,
+            "cpu": time.thread_time() - cpu,
+            "bytes": size,
+            "triangles": len(lod.triangles),
+        })
+
+    return records
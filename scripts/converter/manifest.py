@@ -0,0 +1,175 @@
+import os, json, hashlib
+from typing import Dict, List, Optional, Tuple
+from inspect import stack
+from logging import getLogger
+
+root_logger_name = os.path.splitext(os.path.basename(stack()[-2].filename))[0]
+module_logger_name = f'{root_logger_name}.converter.manifest'
+module_logger = getLogger(module_logger_name)
+
+from clothes import parse_clothes_id
+from converter.result import get_export_formats
+
+MANIFEST_FILE_NAME = '.vtryon_manifest.json'
+MANIFEST_FORMAT = 1
+# version of the convertion result. bump when the exported fbx changes for the same input.
+TOOL_VERSION = '1.2.0'
+# settings which change the exported files. the others (overwrite_fbx, batch_size, etc.) are not fingerprinted.
+# add a new setting here when it changes the output.
+FINGERPRINT_SETTINGS = (
+    'obj_reader',
+    'optimize_mode',
+    'fbx_writer',
+    'texture_max_size',
+    'texture_format',
+    'export_formats',
+    'glb_profile',
+    'lod_ratios',
+)
+HASH_CHUNK_SIZE = 1024 * 1024
+SAVE_INTERVAL = 50
+
+
+class Manifest:
+    def __init__(self, parent: str, settings: Dict[str, any], engine: str) -> None:
+        self._logger_name = f'{root_logger_name}.{self.__module__}'
+        self._logger = getLogger(self._logger_name)
+
+        self.parent: str = parent
+        self.path: str = os.path.join(parent, MANIFEST_FILE_NAME)
+        self.settings: Dict[str, any] = {k: settings[k] for k in FINGERPRINT_SETTINGS if k in settings}
+        # the numpy fbx writer and the blender exporter write different files
+        self.engine: str = engine
+        # the first export format is fingerprinted. recorded as "fbx" whatever its format.
+        self.output_ext: str = get_export_formats(settings)[0]
+        self.entries: Dict[str, Dict[str, any]] = self._load()
+
+        # input fingerprints of stale items, recorded when the convertion succeeds
+        self._pending: Dict[str, Dict[str, any]] = dict()
+        self._unsaved: int = 0
+
+    def _load(self) -> Dict[str, Dict[str, any]]:
+        if not os.path.isfile(self.path):
+            return dict()
+
+        try:
+            with open(self.path, mode='r') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError) as e:
+            self._logger.warning(f'Cannot read manifest. All items are converted. | path: {self.path}, error: {e}')
+            return dict()
+
+        if manifest.get("format") != MANIFEST_FORMAT:
+            return dict()
+        return manifest.get("entries", dict())
+
+    def _key(self, model_dir: str, obj_file: str) -> str:
+        return os.path.relpath(os.path.join(model_dir, obj_file), self.parent).replace('\\', '/')
+
+    def filter_stale(self, work_items: List[Tuple[str, str]]) -> Tuple[List[Tuple[str, str]], List[Tuple[str, str]]]:
+        stale_items = list()
+        fresh_items = list()
+        for model_dir, obj_file in work_items:
+            if self.is_stale(model_dir, obj_file):
+                stale_items.append((model_dir, obj_file))
+            else:
+                fresh_items.append((model_dir, obj_file))
+
+        self._logger.info(f'Manifest checked. | stale: {len(stale_items)}, up to date: {len(fresh_items)}')
+        return stale_items, fresh_items
+
+    def is_stale(self, model_dir: str, obj_file: str) -> bool:
+        key = self._key(model_dir, obj_file)
+        entry = self.entries.get(key)
+        inputs = _input_fingerprint(model_dir, obj_file, entry)
+
+        if not _is_fresh(entry, inputs, self.settings, self.engine, model_dir, obj_file, self.output_ext):
+            self._pending[key] = inputs
+            return True
+
+        # touched but identical inputs. keep the new mtime so they are not hashed again.
+        if any(entry[name] != inputs[name] for name in ("obj", "mtl")):
+            entry.update(inputs)
+            self._unsaved += 1
+        return False
+
+    def record(self, model_dir: str, clothes_id: str) -> None:
+        obj_file = f'{clothes_id}.obj'
+        key = self._key(model_dir, obj_file)
+        inputs = self._pending.pop(key, None)
+        fbx = _stat(os.path.join(model_dir, f'{clothes_id}.{self.output_ext}'))
+        if inputs is None or fbx is None:
+            return
+
+        self.entries[key] = {
+            **inputs,
+            "fbx": fbx,
+            "settings": self.settings,
+            "version": TOOL_VERSION,
+            "engine": self.engine,
+        }
+        self._unsaved += 1
+        if self._unsaved >= SAVE_INTERVAL:
+            self.save()
+        return
+
+    def save(self) -> None:
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, mode='w') as f:
+            json.dump({"format": MANIFEST_FORMAT, "entries": self.entries}, f, indent=1)
+        os.replace(tmp_path, self.path)
+        self._unsaved = 0
+        return
+
+
+def _stat(path: str) -> Optional[Dict[str, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def _file_hash(path: str) -> str:
+    h = hashlib.blake2b(digest_size=20)
+    with open(path, mode='rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _fingerprint(path: str, recorded: Optional[Dict[str, any]]) -> Optional[Dict[str, any]]:
+    st = _stat(path)
+    if st is None:
+        return None
+
+    # hash only when size or mtime changed. a touched but identical file stays up to date.
+    if recorded and recorded.get("size") == st["size"] and recorded.get("mtime_ns") == st["mtime_ns"]:
+        st["hash"] = recorded["hash"]
+    else:
+        st["hash"] = _file_hash(path)
+    return st
+
+
+def _input_fingerprint(model_dir: str, obj_file: str, entry: Optional[Dict[str, any]]) -> Dict[str, any]:
+    entry = entry or dict()
+    clothes_id = parse_clothes_id(obj_file).id
+    return {
+        "obj": _fingerprint(os.path.join(model_dir, obj_file), entry.get("obj")),
+        "mtl": _fingerprint(os.path.join(model_dir, f'{clothes_id}.mtl'), entry.get("mtl")),
+    }
+
+
+def _is_fresh(entry: Optional[Dict[str, any]], inputs: Dict[str, any], settings: Dict[str, any], engine: str, model_dir: str, obj_file: str, output_ext: str = 'fbx') -> bool:
+    if not entry:
+        return False
+    if entry.get("version") != TOOL_VERSION or entry.get("engine") != engine or entry.get("settings") != settings:
+        return False
+    for name in ("obj", "mtl"):
+        recorded, current = entry.get(name), inputs[name]
+        if (recorded and recorded.get("hash")) != (current and current.get("hash")):
+            return False
+
+    # output removed or replaced after the convertion
+    fbx = _stat(os.path.join(model_dir, f'{parse_clothes_id(obj_file).id}.{output_ext}'))
+    return fbx is not None and fbx == entry.get("fbx")
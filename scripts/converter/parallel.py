@@ -0,0 +1,144 @@
+import bpy
+import os, json, subprocess, tempfile, time
+from typing import Callable, Dict, List, Optional, Tuple
+from inspect import stack
+from logging import getLogger
+
+root_logger_name = os.path.splitext(os.path.basename(stack()[-2].filename))[0]
+module_logger_name = f'{root_logger_name}.converter.parallel'
+module_logger = getLogger(module_logger_name)
+
+from utils import ARGS_WORKER_JOBS
+from clothes import parse_clothes_id
+from converter.result import new_result, log_result, STATUS_FAILED
+from converter.batch import BatchScene
+
+POLL_INTERVAL = 1.0
+WORKER_LOG_TAIL = 20
+
+
+def split_work_items(work_items: List[Tuple[str, str]], workers: int) -> List[List[Tuple[str, str]]]:
+    # largest obj first to the least loaded worker. obj size is a good enough estimate of convertion time.
+    sized_items = list()
+    for model_dir, obj_file in work_items:
+        try:
+            size = os.path.getsize(os.path.join(model_dir, obj_file))
+        except OSError:
+            size = 0
+        sized_items.append((size, model_dir, obj_file))
+    sized_items.sort(key=lambda x: x[0], reverse=True)
+
+    shares = [list() for _ in range(workers)]
+    loads = [0] * workers
+    for size, model_dir, obj_file in sized_items:
+        i = loads.index(min(loads))
+        shares[i].append((model_dir, obj_file))
+        loads[i] += size
+
+    return [share for share in shares if share]
+
+
+def run_parallel(
+    script_path: str,
+    parent: str,
+    work_items: List[Tuple[str, str]],
+    workers: int,
+    on_result: Optional[Callable[[Dict[str, any]], None]] = None,
+    settings: Optional[Dict[str, any]] = None,
+) -> List[Dict[str, any]]:
+    # settings: given to the workers instead of their settings.json, e.g. with command line overrides
+    shares = split_work_items(work_items, workers)
+    module_logger.info(f'Parallel convertion start. | workers: {len(shares)}, items: {len(work_items)}')
+
+    results = list()
+    with tempfile.TemporaryDirectory(prefix='vtryon_') as tmp_dir:
+        procs = list()
+        for i, share in enumerate(shares):
+            job_file = os.path.join(tmp_dir, f'worker{i}.json')
+            result_file = os.path.join(tmp_dir, f'worker{i}.jsonl')
+            output_file = os.path.join(tmp_dir, f'worker{i}.log')
+            with open(job_file, mode='w') as f:
+                json.dump({"items": share, "results": result_file, "settings": settings}, f)
+            open(result_file, mode='w').close()
+
+            with open(output_file, mode='w') as output:
+                proc = subprocess.Popen(
+                    [bpy.app.binary_path, '--background', '--python', script_path, parent, '--', ARGS_WORKER_JOBS, job_file],
+                    cwd = os.path.dirname(script_path),
+                    stdout = output,
+                    stderr = subprocess.STDOUT,
+                )
+            procs.append({"proc": proc, "share": share, "results": result_file, "output": output_file, "pos": 0, "done": set()})
+
+        # merge worker results into this process log while workers are running
+        while procs:
+            for worker in list(procs):
+                finished = worker["proc"].poll() is not None
+                new_results = _read_new_results(worker)
+                if finished:
+                    new_results += _collect_lost_items(worker)
+                    procs.remove(worker)
+
+                for result in new_results:
+                    log_result(module_logger, result)
+                    if on_result:
+                        on_result(result)
+                results += new_results
+            if procs:
+                time.sleep(POLL_INTERVAL)
+
+    return results
+
+
+def _read_new_results(worker: Dict[str, any]) -> List[Dict[str, any]]:
+    with open(worker["results"], mode='rb') as f:
+        f.seek(worker["pos"])
+        chunk = f.read()
+
+    # a line without newline is still being written by the worker
+    complete = chunk[:chunk.rfind(b'\n') + 1]
+    worker["pos"] += len(complete)
+
+    results = [json.loads(line) for line in complete.decode().splitlines() if line]
+    worker["done"].update((result["model_dir"], result["clothes_id"]) for result in results)
+    return results
+
+
+def _collect_lost_items(worker: Dict[str, any]) -> List[Dict[str, any]]:
+    returncode = worker["proc"].returncode
+    lost = [
+        (model_dir, obj_file) for model_dir, obj_file in worker["share"]
+        if (model_dir, parse_clothes_id(obj_file).id) not in worker["done"]
+    ]
+    if not lost:
+        return list()
+
+    with open(worker["output"], mode='r', errors='replace') as f:
+        tail = f.readlines()[-WORKER_LOG_TAIL:]
+    module_logger.error(f'Worker exited before convertion completed. | returncode: {returncode}, lost: {len(lost)}\n{"".join(tail)}')
+
+    results = list()
+    for model_dir, obj_file in lost:
+        results.append(new_result(model_dir, obj_file, STATUS_FAILED, f'Worker exited. returncode: {returncode}'))
+
+    return results
+
+
+def run_worker(job_file: str, settings: Dict[str, any]) -> None:
+    with open(job_file, mode='r') as f:
+        job = json.load(f)
+    settings = job.get("settings") or settings
+
+    scene = BatchScene(settings)
+    with open(job["results"], mode='a') as results:
+        for model_dir, obj_file in job["items"]:
+            try:
+                result = scene.convert(model_dir, obj_file, settings)
+            # importer/exporter call sys.exit() on error. keep converting the rest of the share.
+            except (Exception, SystemExit) as e:
+                module_logger.exception(f'Convert failed. | file: {obj_file}')
+                result = new_result(model_dir, obj_file, STATUS_FAILED, f'{type(e).__name__}: {e}')
+            results.write(json.dumps(result) + '\n')
+            results.flush()
+
+    return
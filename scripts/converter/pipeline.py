@@ -0,0 +1,127 @@
+import os, shutil, tempfile, time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Deque, Dict, Iterable, Iterator, List, Tuple
+from inspect import stack
+from logging import getLogger
+
+root_logger_name = os.path.splitext(os.path.basename(stack()[-2].filename))[0]
+module_logger_name = f'{root_logger_name}.converter.pipeline'
+module_logger = getLogger(module_logger_name)
+
+from utils import get_filename_without_ext, get_temp_path, replace_file, peak_rss_mb
+from converter.result import delete_obj_mtl, STATUS_CONVERTED, STATUS_FAILED
+
+DEFAULT_PIPELINE_DEPTH = 0
+PREFETCH_BLOCK_SIZE = 1024 * 1024
+
+
+def prefetch_item(model_dir: str, obj_file: str) -> int:
+    # reads the obj and mtl once, so that the importer reads them from the os file cache
+    buffer = bytearray(PREFETCH_BLOCK_SIZE)
+    total = 0
+    for file_name in (obj_file, get_filename_without_ext(obj_file) + '.mtl'):
+        try:
+            with open(os.path.join(model_dir, file_name), mode='rb', buffering=0) as f:
+                while True:
+                    size = f.readinto(buffer)
+                    if not size:
+                        break
+                    total += size
+        except OSError:
+            continue
+    return total
+
+
+class ConvertPipeline:
+    def __init__(self, settings: Dict[str, any], depth: int) -> None:
+        self._logger_name = f'{root_logger_name}.{self.__module__}'
+        self._logger = getLogger(self._logger_name)
+
+        # the main thread only converts. one thread reads the next `depth` obj/mtl ahead,
+        # another moves the exported fbx into place and deletes the obj/mtl.
+        self.settings: Dict[str, any] = settings
+        self.depth: int = max(1, depth)
+        # fbx are exported here first. a local directory when the model directories are on a network share.
+        # each item has its own subdirectory, the same clothesId can be in the Clothes and Coord trees.
+        self.export_dir: str = tempfile.mkdtemp(prefix='vtryon_fbx_')
+        self._item_count: int = 0
+        self._prefetcher = ThreadPoolExecutor(max_workers=1, thread_name_prefix='vtryon_prefetch')
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='vtryon_writer')
+        self._pending: Deque[Future] = deque()
+
+    def items(self, work_items: Iterable[Tuple[str, str]]) -> Iterator[Tuple[str, str]]:
+        # the work items are still listed on the calling thread. only the file reads run ahead.
+        window = deque()
+        for model_dir, obj_file in work_items:
+            self._prefetcher.submit(prefetch_item, model_dir, obj_file)
+            window.append((model_dir, obj_file))
+            if len(window) > self.depth:
+                yield window.popleft()
+        while window:
+            yield window.popleft()
+        return
+
+    def item_export_dir(self) -> str:
+        # a new subdirectory of export_dir for the next item. the result of the item carries it as "export_dir".
+        self._item_count += 1
+        export_dir = os.path.join(self.export_dir, str(self._item_count))
+        os.makedirs(export_dir)
+        return export_dir
+
+    def submit(self, result: Dict[str, any]) -> List[Dict[str, any]]:
+        # returns the results whose fbx are in place, in convertion order
+        if result["status"] == STATUS_CONVERTED:
+            self._pending.append(self._writer.submit(self._write, result))
+        else:
+            future = Future()
+            future.set_result(result)
+            self._pending.append(future)
+
+        results = list()
+        while self._pending and self._pending[0].done():
+            results.append(self._pending.popleft().result())
+        return results
+
+    def close(self) -> List[Dict[str, any]]:
+        results = [future.result() for future in self._pending]
+        self._pending.clear()
+        self._prefetcher.shutdown(wait=False, cancel_futures=True)
+        self._writer.shutdown(wait=True)
+        shutil.rmtree(self.export_dir, ignore_errors=True)
+        return results
+
+    def _write(self, result: Dict[str, any]) -> Dict[str, any]:
+        wall = time.perf_counter()
+        cpu = time.thread_time()
+        clothes_id = result["clothes_id"]
+        model_dir = result["model_dir"]
+        export_dir = result["export_dir"]
+        try:
+            # copied next to the target first. a move across file systems is not atomic.
+            for output in result.get("outputs", [clothes_id + '.fbx']):
+                output_path = os.path.join(model_dir, output)
+                temp_path = get_temp_path(output_path)
+                shutil.move(os.path.join(export_dir, output), temp_path)
+                replace_file(temp_path, output_path)
+            shutil.rmtree(export_dir, ignore_errors=True)
+            if self.settings["delete_obj_mtl"]:
+                deleted_files = delete_obj_mtl(model_dir, clothes_id)
+                if deleted_files:
+                    result["messages"].append(f'{", ".join(deleted_files)} file deleted.')
+        except OSError as e:
+            self._logger.exception(f'Cannot move outputs into place. | clothesId: {clothes_id}, dir: {model_dir}')
+            result["status"] = STATUS_FAILED
+            result["messages"].append(f'{type(e).__name__}: {e}')
+
+        # same record as StageProfiler.stage. this thread does not touch the profiler of the main thread.
+        result.setdefault("stages", list()).append({
+            "item": clothes_id,
+            "stage": 'write',
+            "wall": time.perf_counter() - wall,
+            "cpu": time.thread_time() - cpu,
+            "peak_rss_mb": peak_rss_mb(),
+            "before": dict(),
+            "after": dict(),
+        })
+        return result
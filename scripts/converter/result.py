@@ -0,0 +1,92 @@
+import os
+from typing import Dict, List, Optional
+from inspect import stack
+from logging import getLogger
+
+root_logger_name = os.path.splitext(os.path.basename(stack()[-2].filename))[0]
+module_logger_name = f'{root_logger_name}.converter.result'
+module_logger = getLogger(module_logger_name)
+
+from clothes import parse_clothes_id
+
+STATUS_CONVERTED = 'converted'
+STATUS_SKIPPED = 'skipped'
+STATUS_FAILED = 'failed'
+
+# written from one optimized scene. the first format is checked for an existing and up to date output.
+DEFAULT_EXPORT_FORMATS = (
+    'fbx',
+)
+
+PLAN_CONVERT = 'convert'
+PLAN_OVERWRITE = 'overwrite'
+PLAN_SKIP = 'skip'
+
+
+def get_plan(fbx_state: Optional[os.stat_result], settings: Dict[str, any], stale: Optional[bool] = None) -> str:
+    # what convert_item will do. stale is the manifest check, None without the manifest.
+    if stale is False:
+        return PLAN_SKIP
+    if fbx_state is None:
+        return PLAN_CONVERT
+    if settings["overwrite_fbx"] or stale:
+        return PLAN_OVERWRITE
+    return PLAN_SKIP
+
+
+def get_export_formats(settings: Dict[str, any]) -> List[str]:
+    formats = list()
+    for extension in settings.get("export_formats") or DEFAULT_EXPORT_FORMATS:
+        if extension.lower() not in formats:
+            formats.append(extension.lower())
+    return formats
+
+
+def new_result(model_dir: str, obj_file: str, status: str = STATUS_CONVERTED, message: str = '') -> Dict[str, any]:
+    return {
+        "clothes_id": parse_clothes_id(obj_file).id,
+        "model_dir": model_dir,
+        "status": status,
+        "messages": [message] if message else list(),
+        "seconds": 0.0,
+    }
+
+
+def delete_obj_mtl(model_dir: str, clothes_id: str) -> List[str]:
+    obj = os.path.join(model_dir, clothes_id + '.obj')
+    mtl = os.path.join(model_dir, clothes_id + '.mtl')
+    deleted_files = list()
+    if os.path.isfile(obj):
+        os.remove(obj)
+        deleted_files.append("OBJ")
+    if os.path.isfile(mtl):
+        os.remove(mtl)
+        deleted_files.append("MTL")
+
+    return deleted_files
+
+
+def log_result(logger: any, result: Dict[str, any]) -> None:
+    msg = " ".join(result["messages"])
+    if result["status"] == STATUS_SKIPPED:
+        logger.info(f'Skip convertion. {msg} | clothesId: {result["clothes_id"]}')
+    elif result["status"] == STATUS_FAILED:
+        logger.error(f'Convert failed. {msg} | clothesId: {result["clothes_id"]}')
+    else:
+        logger.info(f'{msg} | clothesId: {result["clothes_id"]}')
+    return
+
+
+def log_summary(logger: any, results: List[Dict[str, any]], seconds: float) -> None:
+    counts = {status: 0 for status in (STATUS_CONVERTED, STATUS_SKIPPED, STATUS_FAILED)}
+    for result in results:
+        counts[result["status"]] += 1
+
+    logger.info(
+        f'Summary. | converted: {counts[STATUS_CONVERTED]}, skipped: {counts[STATUS_SKIPPED]}, '
+        f'failed: {counts[STATUS_FAILED]}, total: {len(results)}, seconds: {seconds:.1f}'
+    )
+    failed_ids = [result["clothes_id"] for result in results if result["status"] == STATUS_FAILED]
+    if failed_ids:
+        logger.error(f'Failed clothesIds. | clothesIds: {", ".join(failed_ids)}')
+    return
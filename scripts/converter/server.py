@@ -0,0 +1,143 @@
+import os, json, time
+from typing import Dict, List, Optional, Tuple
+from inspect import stack
+from logging import getLogger
+
+root_logger_name = os.path.splitext(os.path.basename(stack()[-2].filename))[0]
+module_logger_name = f'{root_logger_name}.converter.server'
+module_logger = getLogger(module_logger_name)
+
+from utils import load_settings, get_ext, str_today, StageReport, REPORT_SUFFIX
+from clothes import get_model_dirs, get_work_items, parse_clothes_id
+from converter.result import new_result, log_result, log_summary, STATUS_CONVERTED, STATUS_SKIPPED, STATUS_FAILED
+from converter.manifest import Manifest
+from converter.batch import BatchScene
+from converter.engine import ENGINE_BLENDER
+
+QUEUE_DIR = 'queue'
+RUNNING_DIR = 'running'
+DONE_DIR = 'done'
+JOB_EXTENSION = 'json'
+RESULT_EXTENSION = 'jsonl'
+COMMAND_STOP = 'stop'
+POLL_INTERVAL = 0.5
+
+
+# job: spool_dir/queue/<job>.json {"target": "<parent dir or ClothesId.obj path>"} or {"command": "stop"}
+# result: spool_dir/done/<job>.jsonl, one json line per item and a summary line at the end
+def serve(spool_dir: str, overrides: Optional[Dict[str, any]] = None) -> None:
+    # overrides: command line options put over settings.json of each job
+    for d in (QUEUE_DIR, RUNNING_DIR, DONE_DIR):
+        os.makedirs(os.path.join(spool_dir, d), exist_ok=True)
+
+    # one server per spool is expected. jobs left by a killed server are converted again.
+    for job_file in _list_jobs(spool_dir, RUNNING_DIR):
+        os.replace(os.path.join(spool_dir, RUNNING_DIR, job_file), os.path.join(spool_dir, QUEUE_DIR, job_file))
+        module_logger.warning(f'Requeue interrupted job. | job: {job_file}')
+
+    report = StageReport(os.path.join(spool_dir, f'{str_today()}{REPORT_SUFFIX}'))
+    module_logger.info(f'Worker is waiting for jobs. | spool: {os.path.abspath(spool_dir)}')
+    while True:
+        job_files = _list_jobs(spool_dir, QUEUE_DIR)
+        if not job_files:
+            time.sleep(POLL_INTERVAL)
+            continue
+
+        for job_file in job_files:
+            job_path = os.path.join(spool_dir, RUNNING_DIR, job_file)
+            try:
+                os.replace(os.path.join(spool_dir, QUEUE_DIR, job_file), job_path)
+            except FileNotFoundError:
+                # claimed by another server
+                continue
+
+            if not _run_job(spool_dir, job_path, report, overrides or dict()):
+                report.close()
+                for line in report.summary():
+                    module_logger.info(line)
+                module_logger.info('Worker stopped.')
+                return
+
+
+def _list_jobs(spool_dir: str, state_dir: str) -> List[str]:
+    return sorted(file for file in os.listdir(os.path.join(spool_dir, state_dir)) if get_ext(file) == JOB_EXTENSION)
+
+
+def _run_job(spool_dir: str, job_path: str, report: StageReport, overrides: Dict[str, any]) -> bool:
+    job_file = os.path.basename(job_path)
+    job_name = os.path.splitext(job_file)[0]
+    result_path = os.path.join(spool_dir, DONE_DIR, f'{job_name}.{RESULT_EXTENSION}')
+    start = time.perf_counter()
+
+    try:
+        with open(job_path, mode='r') as f:
+            job = json.load(f)
+    except (OSError, ValueError) as e:
+        module_logger.error(f'Cannot read job. | job: {job_file}, error: {e}')
+        job = dict()
+
+    keep_serving = job.get("command") != COMMAND_STOP
+    module_logger.info(f'Job start. | job: {job_file}')
+
+    results = list()
+    with open(result_path, mode='w') as f:
+        if keep_serving:
+            # settings.json may be edited while the worker is resident
+            settings = load_settings()
+            settings.update(overrides)
+            work_items = _resolve_target(job.get("target"))
+
+            manifest = None
+            if settings.get("use_manifest") and work_items and os.path.isdir(job["target"]):
+                # served jobs are converted in the blender scene
+                manifest = Manifest(job["target"], settings, ENGINE_BLENDER)
+                work_items, fresh_items = manifest.filter_stale(work_items)
+                for model_dir, obj_file in fresh_items:
+                    result = new_result(model_dir, obj_file, STATUS_SKIPPED, 'FBX is up to date.')
+                    results.append(result)
+                    f.write(json.dumps(result) + '\n')
+
+            scene = BatchScene(settings)
+            for model_dir, obj_file in work_items:
+                try:
+                    result = scene.convert(model_dir, obj_file, settings)
+                # importer/exporter call sys.exit() on error. the worker has to survive it.
+                except (Exception, SystemExit) as e:
+                    module_logger.exception(f'Convert failed. | file: {obj_file}')
+                    result = new_result(model_dir, obj_file, STATUS_FAILED, f'{type(e).__name__}: {e}')
+                log_result(module_logger, result)
+                report.write(result.get("stages", list()))
+                if manifest and result["status"] == STATUS_CONVERTED:
+                    manifest.record(model_dir, result["clothes_id"])
+                results.append(result)
+                f.write(json.dumps(result) + '\n')
+                f.flush()
+
+            if manifest:
+                manifest.save()
+
+        seconds = time.perf_counter() - start
+        log_summary(module_logger, results, seconds)
+        f.write(json.dumps({"job": job_name, "items": len(results), "seconds": seconds}) + '\n')
+
+    os.replace(job_path, os.path.join(spool_dir, DONE_DIR, job_file))
+    return keep_serving
+
+
+def _resolve_target(target: Optional[str]) -> List[Tuple[str, str]]:
+    if not isinstance(target, str) or not os.path.exists(target):
+        module_logger.error(f'Job target does not exist. | target: {target}')
+        return list()
+
+    # single ClothesId obj
+    if os.path.isfile(target):
+        if get_ext(target) != 'obj' or not parse_clothes_id(os.path.basename(target)).match:
+            module_logger.error(f'Job target is not a ClothesId obj. | target: {target}')
+            return list()
+        return [(os.path.dirname(target), os.path.basename(target))]
+
+    # parent of Clothes and Coord, or a single model directory
+    model_dirs = get_model_dirs(target)
+    if not model_dirs:
+        model_dirs = [target]
+    return get_work_items(model_dirs)
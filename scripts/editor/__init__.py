@@ -1,6 +1,9 @@
-from editor.scene import *
-from editor.armature import *
-from editor.capture import *
-from editor.material import *
-from editor.mesh import *
-from editor.world import *
\ No newline at end of file
+from editor.meshdata import *
+from utils import BPY_AVAILABLE
+if BPY_AVAILABLE:
+    from editor.scene import *
+    from editor.armature import *
+    from editor.capture import *
+    from editor.material import *
+    from editor.mesh import *
+    from editor.world import *
@@ -1,6 +1,6 @@
 import bpy
 import os
-from typing import Optional
+from typing import Iterable, Optional, Union
 from inspect import stack
 from logging import getLogger
 
@@ -8,18 +8,20 @@ root_logger_name = os.path.splitext(os.path.basename(stack()[-2].filename))[0]
 module_logger_name = f'{root_logger_name}.editor.armature'
 module_logger = getLogger(module_logger_name)
 
+from editor.scene import get_objects
+
 
 def is_armature_obj(obj: bpy.types.Object) -> bool:
     return bool(obj.type == 'ARMATURE')
 
 
-def armature_exists(context: bpy.types.Context) -> bool:
-    return any(ob.type == "ARMATURE" and ob.data.users for ob in context.scene.objects)
+def armature_exists(context: bpy.types.Context, objects: Optional[Union[bpy.types.Collection, Iterable[bpy.types.Object]]] = None) -> bool:
+    return any(ob.type == "ARMATURE" and ob.data.users for ob in get_objects(context, objects))
 
 
-def multiple_armatures_exist(context: bpy.types.Context) -> bool:
+def multiple_armatures_exist(context: bpy.types.Context, objects: Optional[Union[bpy.types.Collection, Iterable[bpy.types.Object]]] = None) -> bool:
     first_amt_exists = False
-    for obj in context.scene.objects:
+    for obj in get_objects(context, objects):
         if obj.type != 'ARMATURE':
             continue
 
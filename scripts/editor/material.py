@@ -1,6 +1,8 @@
 import bpy
 import os, sys
-from typing import List, Optional
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 from inspect import stack
 from logging import getLogger
 
@@ -28,6 +30,93 @@ IMAGE_EXTENSIONS = (
     'TGA',
 )
 
+# pixel memory of the images kept decoded by the image cache
+IMAGE_CACHE_BYTES = 1024 * 1024 * 1024
+
+# texture slots in node order. (slot, shader input)
+TEXTURE_SLOTS = (
+    ('basecolor', 'Base Color'),
+    ('normal', 'Normal'),
+    ('roughness', 'Roughness'),
+    ('emission', 'Emission'),
+)
+
+
+class ImageCache:
+    def __init__(self, max_bytes: int = IMAGE_CACHE_BYTES) -> None:
+        self._logger_name = f'{root_logger_name}.{self.__module__}'
+        self._logger = getLogger(self._logger_name)
+
+        # (path, mtime, size) → (image name, pixel bytes), least recently used first
+        self._images: OrderedDict[Tuple[str, int, int], Tuple[str, int]] = OrderedDict()
+        self.max_bytes: int = max_bytes
+        self.bytes: int = 0
+        self.hits: int = 0
+        self.loads: int = 0
+
+    def load(self, path: str, state: Optional[os.stat_result] = None) -> bpy.types.Image:
+        # a texture shared by many materials is decoded once. an edited file has a new mtime and is loaded again.
+        state = state or os.stat(path)
+        key = (os.path.abspath(path), state.st_mtime_ns, state.st_size)
+        entry = self._images.get(key)
+        if entry:
+            image = bpy.data.images.get(entry[0])
+            # gone with a scene reset or an orphans purge
+            if image is not None and os.path.abspath(bpy.path.abspath(image.filepath)) == key[0]:
+                self._images.move_to_end(key)
+                self.hits += 1
+                if entry[1] == 0:
+                    # pixels freed by an eviction. the same datablock decodes them again when its size is read.
+                    pixel_bytes = _pixel_bytes(image)
+                    self._images[key] = (entry[0], pixel_bytes)
+                    self.bytes += pixel_bytes
+                    self._evict()
+                return image
+            self._drop(key)
+
+        image = bpy.data.images.load(filepath= path)
+        pixel_bytes = _pixel_bytes(image)
+        self._images[key] = (image.name, pixel_bytes)
+        self.bytes += pixel_bytes
+        self.loads += 1
+        self._evict()
+        return image
+
+    def _drop(self, key: Tuple[str, int, int]) -> None:
+        _, pixel_bytes = self._images.pop(key)
+        self.bytes -= pixel_bytes
+        return
+
+    def _evict(self) -> None:
+        # the image just loaded is kept even when it is larger than max_bytes
+        for key in list(self._images)[:-1]:
+            if self.bytes <= self.max_bytes:
+                break
+            name, pixel_bytes = self._images[key]
+            if pixel_bytes == 0:
+                continue
+            image = bpy.data.images.get(name)
+            if image is not None and image.users:
+                # an image still used by a material stays cached as the same datablock, only its decoded pixels are freed
+                image.buffers_free()
+                self._images[key] = (name, 0)
+                self.bytes -= pixel_bytes
+            else:
+                if image is not None:
+                    bpy.data.images.remove(image)
+                self._drop(key)
+            self._logger.debug(f'Image evicted. | path: {key[0]}')
+        return
+
+    def clear(self) -> None:
+        self._images.clear()
+        self.bytes = 0
+        return
+
+
+image_cache = ImageCache()
+
+
 class Material:
     def __init__(self, mat: bpy.types.Material) -> None:
         self._logger_name = f'{root_logger_name}.{self.__module__}'
@@ -51,6 +140,8 @@ class Material:
         self.emission_color: List[float] = [0.0, 0.0, 0.0, 1.0]
         self.blend_method: str = 'OPAQUE'
         self.multiply_color = None
+        # stat of the texture paths, reused as the image cache key
+        self._tex_states: Dict[str, os.stat_result] = dict()
 
     def set_shader(self, shader: str) -> None:
         sd = shader.upper()
@@ -62,33 +153,40 @@ class Material:
     
     def _set_basecolor_tex_path(self, path: str) -> None:
         # 画像ファイル拡張子で検出した方がいい
-        if not os.path.exists(path):
+        if not self._stat_texture(path):
             self._logger.warning(f'Base color texture path does not exist. | path: {path}')
             return
         self.basecolor_tex_path = path
         return
     
     def _set_normal_tex_path(self, path: str) -> None:
-        if not os.path.exists(path):
+        if not self._stat_texture(path):
             self._logger.warning(f'Normal texture path does not exist. | path: {path}')
             return
         self.normal_tex_path = path
         return
     
     def _set_roughness_tex_path(self, path: str) -> None:
-        if not os.path.exists(path):
+        if not self._stat_texture(path):
             self._logger.warning(f'Roughness texture path does not exist. | path: {path}')
             return
         self.roughness_tex_path = path
         return
     
     def _set_emission_tex_path(self, path: str) -> None:
-        if not os.path.exists(path):
+        if not self._stat_texture(path):
             self._logger.warning(f'Emission texture path does not exist. | path: {path}')
             return
         self.emission_tex_path = path
         return
     
+    def _stat_texture(self, path: str) -> bool:
+        try:
+            self._tex_states[path] = os.stat(path)
+        except OSError:
+            return False
+        return True
+
     def set_blend_method(self, blend_method: str) -> None:
         bm = blend_method.upper()
         if bm in BLEND_METHODS:
@@ -97,79 +195,51 @@ class Material:
             self._logger.warning(f'Unexpected blend method. blend method must be {[x for x in BLEND_METHODS]} | blend_method: {blend_method}')
         return
 
-    def _create_unlit_material(self) -> None:
+    def _texture_paths(self) -> Dict[str, str]:
+        paths = {
+            'basecolor': self.basecolor_tex_path,
+            'normal': self.normal_tex_path,
+            'roughness': self.roughness_tex_path,
+            'emission': self.emission_tex_path,
+        }
+        # unlit uses the base color only
+        if self.shader == 'UNLIT':
+            paths = {'basecolor': self.basecolor_tex_path}
+        return {slot: path for slot, path in paths.items() if path}
+
+    def _build_node_tree(self) -> Dict[str, bpy.types.Node]:
         # set blend method
         self.material.blend_method = self.blend_method
 
         self.material.use_nodes = True
-        node_tree = self.material.node_tree
-
-        # remove all nodes
-        for node in node_tree.nodes:
-            node_tree.nodes.remove(node)
-
-        # create unlit nodes
-        trs_node = node_tree.nodes.new(type='ShaderNodeBsdfTransparent')
-        trs_node.location = 0, -400
-        mix_node = node_tree.nodes.new(type='ShaderNodeMixShader')
-        mix_node.location = 350, 0
-        mat_out_node = node_tree.nodes.new(type='ShaderNodeOutputMaterial')
-        mat_out_node.location = 600, 0
-        node_tree.links.new(trs_node.outputs[0], mix_node.inputs[1])
-        node_tree.links.new(mix_node.outputs[0], mat_out_node.inputs['Surface'])
-
-        if self.basecolor_tex_path:
-            # set base color tex node
-            _create_image_node(node_tree, self.basecolor_tex_path, mix_node.inputs[2], mix_node.inputs[0])
-        else:
+        tex_paths = self._texture_paths()
+        template = _node_template(self.shader, self.blend_method, tuple(tex_paths), self.multiply_color is not None)
+        nodes = _apply_node_template(self.material.node_tree, template)
+
+        # the same texture file is decoded once for all the materials
+        for slot, path in tex_paths.items():
+            nodes[slot].image = image_cache.load(path, self._tex_states.get(path))
+        return nodes
+
+    def _create_unlit_material(self) -> None:
+        if not self.basecolor_tex_path:
             # set gray
             self._logger.warning(f'No base color texture. Set gray color.')
-            color_node = node_tree.nodes.new(type='ShaderNodeRGB')
-            node_tree.links.new(color_node.outputs[0], mix_node.inputs[2])
-        
+        self._build_node_tree()
         return
 
     def _create_standard_material(self) -> None:
-        # set blend method
-        self.material.blend_method = self.blend_method
-            
-        self.material.use_nodes = True
-        node_tree = self.material.node_tree
-
-        # remove all nodes
-        for node in node_tree.nodes:
-            node_tree.nodes.remove(node)
-        
-        # create stadard shader nodes
-        shader_node = node_tree.nodes.new(type='ShaderNodeBsdfPrincipled')
-        shader_node.location = 400, 0
-        mat_out_node = node_tree.nodes.new(type='ShaderNodeOutputMaterial')
-        mat_out_node.location = 700, 0
-        self.material.node_tree.links.new(shader_node.outputs[0], mat_out_node.inputs['Surface'])
+        nodes = self._build_node_tree()
+        shader_node = nodes['shader']
 
         # set shader params
         shader_node.inputs['Metallic'].default_value = self.metallic_param
         shader_node.inputs['Roughness'].default_value = self.roughness_param
-        
-        # set base color
-        if self.basecolor_tex_path:
-            if self.blend_method == 'OPAQUE':
-                _create_image_node(node_tree= node_tree, image_path= self.basecolor_tex_path, color_input= shader_node.inputs['Base Color'], multiply_color= self.multiply_color)
-            else:
-                _create_image_node(node_tree= node_tree, image_path= self.basecolor_tex_path, color_input= shader_node.inputs['Base Color'], alpha_input= shader_node.inputs['Alpha'], multiply_color= self.multiply_color)
-
-        # set normal
-        if self.normal_tex_path:
-            _create_image_node(node_tree, self.normal_tex_path, shader_node.inputs['Normal'], None, True)
 
-        # set roughness
-        if self.roughness_tex_path:
-            _create_image_node(node_tree, self.roughness_tex_path, shader_node.inputs['Roughness'])
+        if 'basecolor_multiply' in nodes:
+            nodes['basecolor_multiply'].inputs['Color2'].default_value = self.multiply_color
 
-        # set emission
-        if self.emission_tex_path:
-            _create_image_node(node_tree, self.emission_tex_path, shader_node.inputs['Emission'])
-        else:
+        if not self.emission_tex_path:
             shader_node.inputs['Emission'].default_value = self.emission_color
 
         return
@@ -236,47 +306,88 @@ class Material:
         return
 
 
-def _create_image_node(
-    node_tree: bpy.types.ShaderNodeTree, 
-    image_path: str, 
-    color_input: bpy.types.NodeSocket,
-    alpha_input: Optional[bpy.types.NodeSocket] = None,
-    is_normal: bool = False,
-    multiply_color: Optional[List[int]] =  None,
-) -> None:
-    module_logger.debug(sys._getframe().f_code.co_name)
-    # create image node
-    img_node = node_tree.nodes.new(type='ShaderNodeTexImage')
-    img_node.location = 0, 0
-    node_tree.nodes.active = img_node
-    loadimage = bpy.data.images.load(filepath = image_path)
-    img_node.image = loadimage
-
-    if multiply_color:
-        mix_rgb_node = node_tree.nodes.new(type='ShaderNodeMixRGB')
-        mix_rgb_node.blend_type = 'MULTIPLY'
-        mix_rgb_node.inputs['Fac'].default_value = 1
-        mix_rgb_node.inputs['Color2'].default_value = multiply_color
-
-    if is_normal:
-        # normal map
-        normal_map_node = node_tree.nodes.new(type='ShaderNodeNormalMap')
-        normal_map_node.location = 0, -600
-        normal_map_node.uv_map = "UVMap" # get uvmap
-        node_tree.links.new(img_node.outputs['Color'], normal_map_node.inputs['Color'])
-        node_tree.links.new(normal_map_node.outputs['Normal'], color_input)
-    else:
-        # other
-        if multiply_color:
-            node_tree.links.new(img_node.outputs['Color'], mix_rgb_node.inputs['Color1'])
-            node_tree.links.new(mix_rgb_node.outputs['Color'], color_input)
+@lru_cache(maxsize=None)
+def _node_template(shader: str, blend_method: str, slots: Tuple[str, ...], multiply: bool) -> Tuple[tuple, tuple]:
+    # node tree of a shader, blend method and texture slot combination, built once and replayed for every material.
+    # node: (name, type, location, properties, input values), link: (from node, output, to node, input)
+    nodes = list()
+    links = list()
+    if shader == 'UNLIT':
+        nodes += [
+            ('transparent', 'ShaderNodeBsdfTransparent', (0, -400), (), ()),
+            ('mix', 'ShaderNodeMixShader', (350, 0), (), ()),
+            ('output', 'ShaderNodeOutputMaterial', (600, 0), (), ()),
+        ]
+        links += [
+            ('transparent', 0, 'mix', 1),
+            ('mix', 0, 'output', 'Surface'),
+        ]
+        if 'basecolor' in slots:
+            nodes.append(('basecolor', 'ShaderNodeTexImage', (0, 0), (), ()))
+            links += [
+                ('basecolor', 'Color', 'mix', 2),
+                ('basecolor', 'Alpha', 'mix', 0),
+            ]
         else:
-            node_tree.links.new(img_node.outputs['Color'], color_input)
+            nodes.append(('color', 'ShaderNodeRGB', (0, 0), (), ()))
+            links.append(('color', 0, 'mix', 2))
+        return tuple(nodes), tuple(links)
+
+    nodes += [
+        ('shader', 'ShaderNodeBsdfPrincipled', (400, 0), (), ()),
+        ('output', 'ShaderNodeOutputMaterial', (700, 0), (), ()),
+    ]
+    links.append(('shader', 0, 'output', 'Surface'))
+    for slot, shader_input in TEXTURE_SLOTS:
+        if slot not in slots:
+            continue
+        nodes.append((slot, 'ShaderNodeTexImage', (0, 0), (), ()))
+        if slot == 'normal':
+            # normal map
+            nodes.append(('normal_map', 'ShaderNodeNormalMap', (0, -600), (('uv_map', 'UVMap'),), ()))
+            links += [
+                (slot, 'Color', 'normal_map', 'Color'),
+                ('normal_map', 'Normal', 'shader', shader_input),
+            ]
+        elif slot == 'basecolor' and multiply:
+            nodes.append(('basecolor_multiply', 'ShaderNodeMixRGB', (0, 0), (('blend_type', 'MULTIPLY'),), (('Fac', 1),)))
+            links += [
+                (slot, 'Color', 'basecolor_multiply', 'Color1'),
+                ('basecolor_multiply', 'Color', 'shader', shader_input),
+            ]
+        else:
+            links.append((slot, 'Color', 'shader', shader_input))
+        if slot == 'basecolor' and blend_method != 'OPAQUE':
+            links.append((slot, 'Alpha', 'shader', 'Alpha'))
+    return tuple(nodes), tuple(links)
 
-        if alpha_input:
-            node_tree.links.new(img_node.outputs['Alpha'], alpha_input)
-    
-    return
+
+def _apply_node_template(node_tree: bpy.types.ShaderNodeTree, template: Tuple[tuple, tuple]) -> Dict[str, bpy.types.Node]:
+    module_logger.debug(sys._getframe().f_code.co_name)
+    # remove all nodes
+    node_tree.nodes.clear()
+
+    nodes = dict()
+    for name, node_type, location, properties, input_values in template[0]:
+        node = node_tree.nodes.new(type= node_type)
+        node.name = name
+        node.location = location
+        for key, value in properties:
+            setattr(node, key, value)
+        for key, value in input_values:
+            node.inputs[key].default_value = value
+        if node_type == 'ShaderNodeTexImage':
+            node_tree.nodes.active = node
+        nodes[name] = node
+
+    for from_name, from_output, to_name, to_input in template[1]:
+        node_tree.links.new(nodes[from_name].outputs[from_output], nodes[to_name].inputs[to_input])
+    return nodes
+
+
+def _pixel_bytes(image: bpy.types.Image) -> int:
+    width, height = image.size
+    return width * height * image.channels * (4 if image.is_float else 1)
 
 def remove_all_materials(mesh: bpy.types.Object) -> None:
     mesh.data.materials.clear()
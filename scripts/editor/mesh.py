@@ -1,49 +1,35 @@
 import bpy
 import bmesh
 import os
-from typing import Optional
+import numpy as np
+from typing import Iterable, Optional, Union
+from mathutils import Matrix
 from inspect import stack
 from logging import getLogger
 
-from editor import deselect_all, clean
+from editor import deselect_all, clean, get_objects, remove_unused
+from editor.meshdata import COLORS, loop_colors_by_materials, find_doubles, vertex_normals
 
 root_logger_name = os.path.splitext(os.path.basename(stack()[-2].filename))[0]
 module_logger_name = f'{root_logger_name}.editor.mesh'
 module_logger = getLogger(module_logger_name)
 
-COLORS =  (
-    (1,0,0),
-    (0,0,1),
-    (1,0.843137255,0),
-    (0,0.501960784,0),
-    (0,0.749019608,1),
-    (0.933333333,0.509803922,0.933333333),
-    (0.956862745,0.643137255,0.376470588),
-    (0.941176471,0.501960784,0.501960784),
-    (1,0.270588235,0),
-    (1,0.549019608,0),
-    (0.933333333,0.909803922,0.419607843),
-    (0.501960784,0.501960784,0),
-    (0.48627451,0.988235294,0),
-    (0.560784314,0.737254902,0.560784314),
-    (0.4,1,0.666666667),
-    (0.498039216,1,0.831372549),
-    (0.68627451,0.933333333,0.933333333),
-    (0.254901961,0.411764706,0.882352941),
-    (0.541176471,0.168627451,0.88627451),
-    (1,0.078431373,0.576470588),
-    (1,0.71372549,0.756862745),
-    (0,0,0),
-    (1,1,1)
-)
-
 
 def _is_mesh_obj(obj: bpy.types.Object) -> bool:
     return bool(obj.type == 'MESH')
 
 
-def get_mesh_obj_by_name(context: bpy.types.Context, mesh_obj_name: str) -> Optional[bpy.types.Object]:
-    obj = context.scene.objects.get(mesh_obj_name)
+def get_mesh_obj_by_name(
+    context: bpy.types.Context,
+    mesh_obj_name: str,
+    objects: Optional[Union[bpy.types.Collection, Iterable[bpy.types.Object]]] = None,
+) -> Optional[bpy.types.Object]:
+    if objects is None:
+        obj = context.scene.objects.get(mesh_obj_name)
+    elif isinstance(objects, bpy.types.Collection):
+        obj = objects.all_objects.get(mesh_obj_name)
+    else:
+        obj = next((ob for ob in objects if ob.name == mesh_obj_name), None)
 
     if not obj:
         return None
@@ -65,18 +51,6 @@ def has_blendshape(mesh: bpy.types.Object) -> bool:
     return True
 
 
-def _select_all_verts(edit_mesh: any) -> None:
-    edit_mesh.select_mode = {'VERT'}
-    for vert in edit_mesh.verts:
-        vert.select_set(True)
-    return
-
-def _deselect_all_verts(edit_mesh: any) -> None:
-    for vert in edit_mesh.verts:
-        vert.select_set(False)
-    return
-
-
 def select_mesh_object(context: bpy.types.Context, mesh: bpy.types.Object) -> None:
     if not _is_mesh_obj(mesh):
         module_logger.error(f'Object type must be "MESH". | object: {mesh}, type: {mesh.type}')
@@ -88,18 +62,23 @@ def select_mesh_object(context: bpy.types.Context, mesh: bpy.types.Object) -> No
     return
 
 
-def join_all_meshes(context: bpy.types.Context, data: bpy.types.BlendData, joined_name: str = 'Mesh') -> bpy.types.Object:
-    is_first_obj = True
-    for ob in context.scene.objects:
-        if ob.type != 'MESH':
-            ob.select_set(False)
-            continue
-        ob.select_set(True)
+def join_all_meshes(
+    context: bpy.types.Context,
+    data: bpy.types.BlendData,
+    joined_name: str = 'Mesh',
+    objects: Optional[Union[bpy.types.Collection, Iterable[bpy.types.Object]]] = None,
+) -> bpy.types.Object:
+    # objects: only the meshes in it are joined, and only their meshes left without users are removed.
+    # whole scene and orphans_purge when None.
+    scoped = objects is not None
+    deselect_all(context)
 
-        if is_first_obj:
-            context.view_layer.objects.active = ob
-            bpy.ops.object.mode_set(mode = "OBJECT")
-            is_first_obj = False
+    meshes = [ob for ob in get_objects(context, objects) if ob.type == 'MESH']
+    joined_data = [ob.data for ob in meshes]
+    context.view_layer.objects.active = meshes[0]
+    bpy.ops.object.mode_set(mode = "OBJECT")
+    for ob in meshes:
+        ob.select_set(True)
 
     bpy.ops.object.join()
 
@@ -107,37 +86,70 @@ def join_all_meshes(context: bpy.types.Context, data: bpy.types.BlendData, joine
     joined_mesh.name = joined_name
     joined_mesh.data.name = joined_name
 
-    clean(data)
+    if scoped:
+        remove_unused(data, meshes=[me for me in joined_data if me != joined_mesh.data])
+    else:
+        clean(data)
     deselect_all(context)
 
     return joined_mesh
 
 
 def remove_doubles(context: bpy.types.Context, mesh: bpy.types.Object, threshold: float = 1e-05) -> None:
-    select_mesh_object(context, mesh)
-
-    bpy.ops.object.mode_set(mode='EDIT')
-    edit_mesh = bmesh.from_edit_mesh(mesh.data)
-    _select_all_verts(edit_mesh)
-    bpy.ops.mesh.remove_doubles(threshold=threshold, use_unselected=False, use_sharp_edge_from_normals=False)
-    _deselect_all_verts(edit_mesh)
-    bpy.ops.object.mode_set(mode='OBJECT')
+    if not _is_mesh_obj(mesh):
+        module_logger.error(f'Object type must be "MESH". | object: {mesh}, type: {mesh.type}')
+        return
 
-    deselect_all(context)
+    removed = _weld_doubles(mesh.data, threshold)
+    module_logger.debug(f'Doubles removed. | object: {mesh.name}, removed: {removed}')
     return 
 
 
+def _weld_doubles(me: bpy.types.Mesh, threshold: float) -> int:
+    # find doubles with numpy and weld them in object mode. no edit mode, no per vertex selection.
+    positions = np.zeros(len(me.vertices) * 3, dtype=np.float32)
+    me.vertices.foreach_get('co', positions)
+    targets = find_doubles(positions.reshape(-1, 3), threshold)
+    doubles = np.flatnonzero(targets != np.arange(len(targets)))
+    if not len(doubles):
+        return 0
+
+    bm = bmesh.new()
+    bm.from_mesh(me)
+    bm.verts.ensure_lookup_table()
+    verts = bm.verts
+    targets = targets.tolist()
+    bmesh.ops.weld_verts(bm, targetmap={verts[i]: verts[targets[i]] for i in doubles.tolist()})
+    bm.to_mesh(me)
+    bm.free()
+    me.update()
+
+    return len(doubles)
+
+
 def recalculate_normals(context: bpy.types.Context, mesh: bpy.types.Object, smooth_angle: float=3.14159) -> None:
-    select_mesh_object(context, mesh)
-    
-    # shade_smooth() work at selected objects only
-    bpy.ops.object.shade_smooth()
-    bpy.ops.mesh.customdata_custom_splitnormals_clear()
-    context.object.data.use_auto_smooth = True
-    context.object.data.auto_smooth_angle = smooth_angle
-    bpy.ops.mesh.customdata_custom_splitnormals_add()
+    # shade_smooth, custom split normals clear/add with auto smooth on the mesh data. no selection, no operator.
+    if not _is_mesh_obj(mesh):
+        module_logger.error(f'Object type must be "MESH". | object: {mesh}, type: {mesh.type}')
+        return
 
-    deselect_all(context)
+    _set_smooth_normals(mesh.data, smooth_angle)
+    return
+
+
+def _set_smooth_normals(me: bpy.types.Mesh, smooth_angle: float) -> None:
+    me.polygons.foreach_set('use_smooth', np.ones(len(me.polygons), dtype=bool))
+    me.use_auto_smooth = True
+    me.auto_smooth_angle = smooth_angle
+
+    # area weighted vertex normals of the welded mesh, written as custom split normals.
+    # replaces the custom normals from the obj.
+    positions = np.zeros(len(me.vertices) * 3, dtype=np.float32)
+    me.vertices.foreach_get('co', positions)
+    me.calc_loop_triangles()
+    triangles = np.zeros(len(me.loop_triangles) * 3, dtype=np.int32)
+    me.loop_triangles.foreach_get('vertices', triangles)
+    me.normals_split_custom_set_from_vertices(vertex_normals(positions.reshape(-1, 3), triangles.reshape(-1, 3)))
     return
 
 
@@ -149,25 +161,20 @@ def separate_mesh_by_materials(context: bpy.types.Context, mesh: bpy.types.Objec
 
 
 def set_vertexcol_by_materials(context: bpy.types.Context, mesh: bpy.types.Object) -> None:
-    separate_mesh_by_materials(context, mesh)
-
-    num = 0
-    for ob in context.scene.objects:
-        if ob.type != 'MESH':
-            continue
-        select_mesh_object(context, ob)
-        bpy.ops.object.mode_set(mode='VERTEX_PAINT')
-        context.object.data.use_paint_mask = False
-        color = COLORS[num]
-        bpy.data.brushes["Draw"].color = (color)
-        bpy.ops.paint.vertex_color_set()
-        bpy.ops.object.mode_set(mode='OBJECT')
-
-        num += 1
-        if num > len(COLORS):
-            num = 0
-    
-    deselect_all(context)
+    if not _is_mesh_obj(mesh):
+        module_logger.error(f'Object type must be "MESH". | object: {mesh}, type: {mesh.type}')
+        return
+
+    # same colors as painting each mesh separated by material, without separate/join and mode switches
+    me = mesh.data
+    face_materials = np.zeros(len(me.polygons), dtype=np.int32)
+    face_sizes = np.zeros(len(me.polygons), dtype=np.int32)
+    me.polygons.foreach_get('material_index', face_materials)
+    me.polygons.foreach_get('loop_total', face_sizes)
+
+    vertex_colors = me.vertex_colors.active or me.vertex_colors.new()
+    vertex_colors.data.foreach_set('color', loop_colors_by_materials(face_materials, face_sizes).ravel())
+    me.update()
     return
 
 
@@ -186,8 +193,9 @@ def limit_vertex_weight_total(context: bpy.types.Context, mesh: bpy.types.Object
 
 def reset_material(context: bpy.types.Context, data: bpy.types.BlendData, mesh: bpy.types.Object, name: str) -> None:
     select_mesh_object(context, mesh)
+    materials = [mat for mat in mesh.data.materials if mat]
     mesh.data.materials.clear()
-    bpy.ops.outliner.orphans_purge(do_recursive=True)
+    remove_unused(data, materials=materials)
     newmat = data.materials.new(name)
     mesh.data.materials.append(newmat)
     return
@@ -199,4 +207,36 @@ def rescale(context: bpy.types.Context, mesh: bpy.types.Object, scale_factor: fl
     mesh.scale.y *= scale_factor
     mesh.scale.z *= scale_factor
     deselect_all(context)
-    return
\ No newline at end of file
+    return
+
+
+def bake_transform(mesh: bpy.types.Object, scale_factor: float = 1.0) -> None:
+    # rescale() and reset_transform_all() on the mesh data. no selection, no transform_apply.
+    matrix = mesh.matrix_world @ Matrix.Scale(scale_factor, 4)
+    mesh.data.transform(matrix)
+    mesh.matrix_world = Matrix.Identity(4)
+    mesh.data.update()
+    return
+
+
+def weld_and_smooth(mesh: bpy.types.Object, threshold: float = 1e-05, smooth_angle: float = 3.14159) -> None:
+    # remove_doubles() and recalculate_normals() on the mesh data
+    if not _is_mesh_obj(mesh):
+        module_logger.error(f'Object type must be "MESH". | object: {mesh}, type: {mesh.type}')
+        return
+
+    me = mesh.data
+    _weld_doubles(me, threshold)
+    _set_smooth_normals(me, smooth_angle)
+    return
+
+
+def replace_materials(data: bpy.types.BlendData, mesh: bpy.types.Object, name: str) -> None:
+    # reset_material() without selection. only the old materials of the mesh and their images are removed.
+    materials = [mat for mat in mesh.data.materials if mat]
+    mesh.data.materials.clear()
+    remove_unused(data, materials=materials)
+
+    newmat = data.materials.new(name)
+    mesh.data.materials.append(newmat)
+    return
@@ -0,0 +1,333 @@
+import os, math
+import numpy as np
+from typing import Sequence, Tuple
+from inspect import stack
+from logging import getLogger
+
+root_logger_name = os.path.splitext(os.path.basename(stack()[-2].filename))[0]
+module_logger_name = f'{root_logger_name}.editor.meshdata'
+module_logger = getLogger(module_logger_name)
+
+COLORS =  (
+    (1,0,0),
+    (0,0,1),
+    (1,0.843137255,0),
+    (0,0.501960784,0),
+    (0,0.749019608,1),
+    (0.933333333,0.509803922,0.933333333),
+    (0.956862745,0.643137255,0.376470588),
+    (0.941176471,0.501960784,0.501960784),
+    (1,0.270588235,0),
+    (1,0.549019608,0),
+    (0.933333333,0.909803922,0.419607843),
+    (0.501960784,0.501960784,0),
+    (0.48627451,0.988235294,0),
+    (0.560784314,0.737254902,0.560784314),
+    (0.4,1,0.666666667),
+    (0.498039216,1,0.831372549),
+    (0.68627451,0.933333333,0.933333333),
+    (0.254901961,0.411764706,0.882352941),
+    (0.541176471,0.168627451,0.88627451),
+    (1,0.078431373,0.576470588),
+    (1,0.71372549,0.756862745),
+    (0,0,0),
+    (1,1,1)
+)
+
+
+def material_color_order(face_materials: np.ndarray) -> np.ndarray:
+    # material index painted with COLORS[i], as separate(type='MATERIAL') left them in the scene.
+    # separate splits off materials in the order of their first face and the original object keeps
+    # the last one. the original object comes first in the scene, then the separated ones.
+    _, first_faces = np.unique(face_materials, return_index=True)
+    order = face_materials[np.sort(first_faces)]
+    return np.roll(order, 1)
+
+
+def material_color_table(face_materials: np.ndarray) -> np.ndarray:
+    # RGBA per material index
+    face_materials = np.asarray(face_materials)
+    table = np.ones((int(face_materials.max(initial=0)) + 1, 4), dtype=np.float32)
+    for i, material_index in enumerate(material_color_order(face_materials)):
+        table[material_index, :3] = COLORS[i % len(COLORS)]
+    return table
+
+
+def loop_colors_by_materials(face_materials: np.ndarray, face_sizes: np.ndarray) -> np.ndarray:
+    # RGBA per face corner. loops of a face are contiguous and in face order.
+    face_materials = np.asarray(face_materials)
+    return np.repeat(material_color_table(face_materials)[face_materials], face_sizes, axis=0)
+
+
+# cell hash. collisions only add candidates, the distance check decides.
+_HASH_PRIMES = np.array([73856093, 19349663, 83492791], dtype=np.uint64)
+# half of the 26 neighbor cells. a pair across cells is found from the cell on either side.
+_NEIGHBOR_CELLS = np.array([(x, y, z) for x in (-1, 0, 1) for y in (-1, 0, 1) for z in (-1, 0, 1) if (x, y, z) > (0, 0, 0)], dtype=np.int64)
+# cell size in threshold units. only vertices within threshold of a cell face look into the neighbor cell.
+CELL_SCALE = 32
+# uv and color values of the corners of a vertex closer than these are the same value
+UV_EPSILON = 1e-06
+COLOR_EPSILON = 1e-03
+# search steps of the decimation cell size, and how far under the triangle budget is close enough
+DECIMATE_STEPS = 16
+DECIMATE_TOLERANCE = 0.05
+
+
+def _cell_hash(cells: np.ndarray) -> np.ndarray:
+    h = cells.astype(np.uint64) * _HASH_PRIMES
+    return h[:, 0] ^ h[:, 1] ^ h[:, 2]
+
+
+def find_double_pairs(positions: np.ndarray, threshold: float) -> np.ndarray:
+    # (i, j) with i < j and |p_i - p_j| <= threshold, found by a uniform grid hash
+    positions = np.asarray(positions, dtype=np.float64)
+    n = len(positions)
+    if n < 2 or threshold <= 0:
+        return np.zeros((0, 2), dtype=np.int64)
+
+    cell_size = threshold * CELL_SCALE
+    scaled = positions / cell_size
+    cells = np.floor(scaled).astype(np.int64)
+    frac = (scaled - cells) * CELL_SCALE
+    near = {-1: frac <= 1.0, 0: np.ones_like(frac, dtype=bool), 1: frac >= CELL_SCALE - 1.0}
+
+    keys = _cell_hash(cells)
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+
+    # same cell. members of a run of equal keys pair with the following members of the run.
+    run_starts = np.flatnonzero(np.diff(sorted_keys)) + 1
+    run_ends = np.append(run_starts, n)
+    run_lengths = np.diff(np.insert(run_ends, 0, 0))
+    following = np.repeat(run_ends, run_lengths) - np.arange(n) - 1
+    total = int(following.sum())
+    a = np.repeat(np.arange(n), following)
+    b = a + 1 + np.arange(total) - np.repeat(np.cumsum(following) - following, following)
+    candidates = [(order[a], order[b])]
+
+    for offset in _NEIGHBOR_CELLS:
+        mask = near[offset[0]][:, 0] & near[offset[1]][:, 1] & near[offset[2]][:, 2]
+        i = np.flatnonzero(mask)
+        if not len(i):
+            continue
+
+        neighbor_keys = _cell_hash(cells[i] + offset)
+        lo = np.searchsorted(sorted_keys, neighbor_keys, side='left')
+        hi = np.searchsorted(sorted_keys, neighbor_keys, side='right')
+        counts = hi - lo
+        total = int(counts.sum())
+        if total == 0:
+            continue
+
+        starts = np.repeat(lo - np.cumsum(counts) + counts, counts)
+        candidates.append((np.repeat(i, counts), order[starts + np.arange(total)]))
+
+    pair_keys = list()
+    for a, b in candidates:
+        i, j = np.minimum(a, b), np.maximum(a, b)
+        keep = i < j
+        i, j = i[keep], j[keep]
+        d = positions[i] - positions[j]
+        keep = np.einsum('ij,ij->i', d, d) <= threshold * threshold
+        pair_keys.append(i[keep] * n + j[keep])
+
+    # the same pair can be found from several cells
+    pair_keys = np.unique(np.concatenate(pair_keys))
+    return np.stack((pair_keys // n, pair_keys % n), axis=1)
+
+
+def find_doubles(positions: np.ndarray, threshold: float = 1e-05) -> np.ndarray:
+    # vertex index each vertex is merged into, itself for kept vertices.
+    # greedy in index order without chains, same as blender remove_doubles (kdtree calc_duplicates).
+    targets = np.arange(len(positions))
+    pairs = find_double_pairs(positions, threshold)
+    if not len(pairs):
+        return targets
+
+    merged = np.zeros(len(positions), dtype=bool)
+    for i, j in pairs.tolist():
+        if merged[i] or merged[j]:
+            continue
+        targets[j] = i
+        merged[j] = True
+
+    return targets
+
+
+def fan_triangles(face_sizes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # loop indices (n, 3) of each face split as a fan from its first loop, and the face of each triangle
+    face_sizes = np.asarray(face_sizes, dtype=np.int64)
+    starts = np.cumsum(face_sizes) - face_sizes
+    counts = np.maximum(face_sizes - 2, 0)
+    faces = np.repeat(np.arange(len(face_sizes)), counts)
+    corner = np.arange(len(faces)) - np.repeat(np.cumsum(counts) - counts, counts) + 1
+    first = starts[faces]
+    return np.stack((first, first + corner, first + corner + 1), axis=1), faces
+
+
+def vertex_normals(positions: np.ndarray, triangles: np.ndarray) -> np.ndarray:
+    # smooth normal per vertex, area weighted. the cross product length is twice the triangle area.
+    positions = np.asarray(positions, dtype=np.float64)
+    a, b, c = (positions[triangles[:, k]] for k in range(3))
+    u, v = b - a, c - a
+    # per axis. np.cross on (n, 3) arrays is slower than the columns.
+    face_normals = (
+        u[:, 1] * v[:, 2] - u[:, 2] * v[:, 1],
+        u[:, 2] * v[:, 0] - u[:, 0] * v[:, 2],
+        u[:, 0] * v[:, 1] - u[:, 1] * v[:, 0],
+    )
+
+    # every corner adds the normal of its triangle to its vertex
+    corners = triangles.T.ravel()
+    normals = np.empty((len(positions), 3), dtype=np.float64)
+    for axis in range(3):
+        normals[:, axis] = np.bincount(corners, weights=np.tile(face_normals[axis], 3), minlength=len(positions))
+
+    # vertices without faces keep a zero normal
+    normals /= np.maximum(np.sqrt(np.einsum('ij,ij->i', normals, normals)), 1e-30)[:, None]
+    return normals
+
+
+def _group_ids(rows: np.ndarray) -> np.ndarray:
+    # dense id per distinct row of integers. rows are packed into one int64 key when the ranges allow it.
+    rows = np.asarray(rows, dtype=np.int64)
+    if rows.ndim == 1:
+        rows = rows[:, None]
+    if not len(rows):
+        return np.zeros(0, dtype=np.int64)
+
+    # column by column. reductions along axis 0 of a row major array are slow.
+    columns = [np.ascontiguousarray(column) for column in rows.T]
+    lows = [int(column.min()) for column in columns]
+    spans = [int(column.max()) - low + 1 for column, low in zip(columns, lows)]
+    if math.prod(spans) >= 2 ** 63:
+        _, ids = np.unique(rows, axis=0, return_inverse=True)
+        return ids.ravel()
+
+    keys = np.zeros(len(rows), dtype=np.int64)
+    for column, low, span in zip(columns, lows, spans):
+        keys *= span
+        keys += column - low
+    _, ids = np.unique(keys, return_inverse=True)
+    return ids.ravel()
+
+
+def _components(n: int, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    # component label of n nodes joined by the edges (a, b), the smallest node of the component
+    labels = np.arange(n)
+    while True:
+        la, lb = labels[a], labels[b]
+        differ = la != lb
+        if not differ.any():
+            return labels
+
+        # the larger root is hooked under the smaller one, then every node points to its root again
+        la, lb = la[differ], lb[differ]
+        np.minimum.at(labels, np.maximum(la, lb), np.minimum(la, lb))
+        while True:
+            roots = labels[labels]
+            if np.array_equal(roots, labels):
+                break
+            labels = roots
+
+
+def value_ids(values: np.ndarray, epsilon: float) -> np.ndarray:
+    # same id for rows of values equal within epsilon, e.g. the uv or color table of a mesh
+    return _group_ids(np.round(np.asarray(values, dtype=np.float64) / epsilon))
+
+
+def vertex_charts(n_vertices: int, triangles: np.ndarray, corner_keys: Sequence[np.ndarray] = ()) -> Tuple[np.ndarray, np.ndarray]:
+    # per vertex, whether it is locked and its chart. corner_keys: value_ids of the uv, color, ... of every triangle corner.
+    # a chart is a part of the surface where the keys are continuous. locked vertices are on a uv seam,
+    # a color boundary (the material colors of set_vertexcol_by_materials) or an open or non manifold edge.
+    corners = triangles.ravel()
+    columns = [corners, *corner_keys]
+
+    # a wedge is a vertex with one uv and color. a vertex with several wedges is on a seam.
+    wedges = _group_ids(np.stack(columns, axis=1))
+    n_wedges = int(wedges.max(initial=-1)) + 1
+    wedge_vertices = np.zeros(n_wedges, dtype=np.int64)
+    wedge_vertices[wedges] = corners
+    locked = np.bincount(wedge_vertices, minlength=n_vertices) > 1
+
+    edges = np.sort(np.stack((triangles, np.roll(triangles, -1, axis=1)), axis=2).reshape(-1, 2), axis=1)
+    edge_ids = _group_ids(edges)
+    locked[edges[np.bincount(edge_ids)[edge_ids] != 2].ravel()] = True
+
+    # the wedges of a triangle are on the same chart
+    corner_wedges = wedges.reshape(-1, 3)
+    labels = _components(n_wedges, corner_wedges[:, :2].ravel(), corner_wedges[:, 1:].ravel())
+    charts = np.full(n_vertices, -1, dtype=np.int64)
+    charts[wedge_vertices] = labels
+    return locked, charts
+
+
+def cluster_vertices(positions: np.ndarray, locked: np.ndarray, charts: np.ndarray, cell_size: float) -> np.ndarray:
+    # cluster id per vertex. free vertices of a chart in the same grid cell share a cluster, locked vertices are alone.
+    free = np.flatnonzero(~locked)
+    cells = np.floor(positions[free] / cell_size).astype(np.int64)
+    ids = _group_ids(np.column_stack((cells, charts[free])))
+
+    clusters = np.empty(len(positions), dtype=np.int64)
+    clusters[free] = ids
+    fixed = np.flatnonzero(locked)
+    clusters[fixed] = int(ids.max(initial=-1)) + 1 + np.arange(len(fixed))
+    return clusters
+
+
+def collapse_triangles(triangles: np.ndarray) -> np.ndarray:
+    # triangles left after their vertices were merged. degenerate ones and all but the first of duplicates are removed.
+    keep = np.flatnonzero((triangles[:, 0] != triangles[:, 1]) & (triangles[:, 1] != triangles[:, 2]) & (triangles[:, 2] != triangles[:, 0]))
+    ids = _group_ids(np.sort(triangles[keep], axis=1))
+    _, first = np.unique(ids, return_index=True)
+    return keep[np.sort(first)]
+
+
+def decimate(positions: np.ndarray, triangles: np.ndarray, locked: np.ndarray, charts: np.ndarray, target: int) -> Tuple[np.ndarray, np.ndarray]:
+    # vertex clustering down to at most target triangles, as far as the locked vertices allow.
+    # returns the vertex each vertex is merged into and the indices of the triangles kept.
+    positions = np.asarray(positions, dtype=np.float64)
+    if target >= len(triangles) or not len(triangles):
+        return np.arange(len(positions)), np.arange(len(triangles))
+
+    def count(cell_size: float) -> int:
+        clusters = cluster_vertices(positions, locked, charts, cell_size)
+        return len(collapse_triangles(clusters[triangles]))
+
+    # triangles fall about with the square of the cell size. the guess is corrected by that and kept inside the
+    # bracket of sizes known to be over and within the budget, from a quarter of the mean edge to the whole mesh.
+    edges = positions[triangles[:, 1]] - positions[triangles[:, 0]]
+    mean_edge = float(np.sqrt(np.einsum('ij,ij->i', edges, edges)).mean())
+    lo, hi = mean_edge / 4, float(np.linalg.norm(positions.max(axis=0) - positions.min(axis=0))) + mean_edge
+    aim = target * (1 - DECIMATE_TOLERANCE / 2)
+    cell_size = mean_edge * math.sqrt(len(triangles) / target)
+    best = None
+    for _ in range(DECIMATE_STEPS):
+        triangles_left = count(cell_size)
+        if triangles_left > target:
+            lo = cell_size
+        else:
+            hi = best = cell_size
+            if triangles_left >= target * (1 - DECIMATE_TOLERANCE):
+                break
+        cell_size *= math.sqrt(max(triangles_left, 1) / aim)
+        if not lo < cell_size < hi:
+            cell_size = math.sqrt(lo * hi)
+
+    if best is None:
+        best = hi
+        module_logger.debug(f'Triangle budget not reached. Too many locked vertices. | target: {target}, triangles: {count(hi)}')
+
+    # the member nearest to the mean of its cluster represents it. an existing vertex keeps its uv and color valid.
+    clusters = cluster_vertices(positions, locked, charts, best)
+    n_clusters = int(clusters.max()) + 1
+    counts = np.bincount(clusters, minlength=n_clusters)
+    means = np.stack([np.bincount(clusters, weights=positions[:, k], minlength=n_clusters) for k in range(3)], axis=1) / counts[:, None]
+    d = positions - means[clusters]
+    order = np.lexsort((np.einsum('ij,ij->i', d, d), clusters))
+    firsts = order[np.r_[0, np.flatnonzero(np.diff(clusters[order])) + 1]]
+    representatives = np.empty(n_clusters, dtype=np.int64)
+    representatives[clusters[firsts]] = firsts
+
+    targets = representatives[clusters]
+    return targets, collapse_triangles(targets[triangles])
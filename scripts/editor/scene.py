@@ -1,5 +1,5 @@
 import bpy
-from typing import List
+from typing import Dict, Iterable, List, Optional, Set, Union
 # from inspect import stack
 # from logging import getLogger
 
@@ -21,6 +21,68 @@ def initialize(data: bpy.types.BlendData) -> None:
     bpy.ops.outliner.orphans_purge(do_recursive=True)
     return
 
+def get_objects(context: bpy.types.Context, objects: Optional[Union[bpy.types.Collection, Iterable[bpy.types.Object]]] = None) -> Iterable[bpy.types.Object]:
+    # scope of the editor functions. a collection (with its children) or an object list. the whole scene when None.
+    if objects is None:
+        return context.scene.objects
+    if isinstance(objects, bpy.types.Collection):
+        return objects.all_objects
+    return objects
+
+def get_scene_stats(context: bpy.types.Context, objects: Optional[Union[bpy.types.Collection, Iterable[bpy.types.Object]]] = None) -> Dict[str, int]:
+    meshes = [ob.data for ob in get_objects(context, objects) if ob.type == 'MESH']
+    return {
+        "objects": len(meshes),
+        "vertices": sum(len(me.vertices) for me in meshes),
+        "faces": sum(len(me.polygons) for me in meshes),
+        "materials": len(bpy.data.materials) if objects is None else len({mat for me in meshes for mat in me.materials if mat}),
+    }
+
+def new_active_collection(context: bpy.types.Context, data: bpy.types.BlendData, name: str) -> bpy.types.Collection:
+    # importers link new objects to the active collection
+    collection = data.collections.new(name)
+    context.scene.collection.children.link(collection)
+    context.view_layer.active_layer_collection = context.view_layer.layer_collection.children[collection.name]
+    return collection
+
+def remove_collection(context: bpy.types.Context, data: bpy.types.BlendData, collection: bpy.types.Collection) -> None:
+    # removes the objects of the collection, then their meshes and materials left without users. no orphans_purge.
+    context.view_layer.active_layer_collection = context.view_layer.layer_collection
+    objects = list(collection.all_objects)
+    meshes = {ob.data for ob in objects if ob.type == 'MESH'}
+    for ob in objects:
+        data.objects.remove(ob, do_unlink=True)
+    remove_unused(data, meshes=meshes)
+    data.collections.remove(collection)
+    return
+
+def remove_unused(data: bpy.types.BlendData, meshes: Iterable[bpy.types.Mesh] = (), materials: Iterable[bpy.types.Material] = ()) -> None:
+    # removes the given meshes and materials left without users, then the images of the removed materials.
+    # clean() does the same for all the data with orphans_purge.
+    materials = set(materials)
+    for me in meshes:
+        if me.users:
+            continue
+        materials.update(mat for mat in me.materials if mat)
+        data.meshes.remove(me)
+
+    images = set()
+    for mat in materials:
+        if mat.users:
+            continue
+        images.update(_material_images(mat))
+        data.materials.remove(mat)
+
+    for img in images:
+        if not img.users:
+            data.images.remove(img)
+    return
+
+def _material_images(mat: bpy.types.Material) -> Set[bpy.types.Image]:
+    if not mat.node_tree:
+        return set()
+    return {node.image for node in mat.node_tree.nodes if node.type == 'TEX_IMAGE' and node.image}
+
 def _controll_fake_user(datablocks: bpy.types.bpy_prop_collection, use_fake_user: bool) -> None:
     for datablock in datablocks:
         datablock.use_fake_user = use_fake_user
@@ -34,14 +96,15 @@ def clean(data: bpy.types.BlendData) -> None:
     return
 
 
-def select_all(context: bpy.types.Context) -> None:
-    for ob in context.scene.objects:
+def select_all(context: bpy.types.Context, objects: Optional[Union[bpy.types.Collection, Iterable[bpy.types.Object]]] = None) -> None:
+    for ob in get_objects(context, objects):
         ob.select_set(True)
     return
 
 
-def deselect_all(context: bpy.types.Context) -> None:
-    for ob in context.scene.objects:
+def deselect_all(context: bpy.types.Context, objects: Optional[Union[bpy.types.Collection, Iterable[bpy.types.Object]]] = None) -> None:
+    # without objects, only the selected objects are visited instead of the whole scene
+    for ob in (list(context.view_layer.objects.selected) if objects is None else get_objects(context, objects)):
         ob.select_set(False)
     context.view_layer.objects.active = None
     return
@@ -56,11 +119,18 @@ def reset_transform_all(
     context: bpy.types.Context, 
     reset_location: bool = True, 
     reset_rotation: bool = True, 
-    reset_scale: bool = True
+    reset_scale: bool = True,
+    objects: Optional[Union[bpy.types.Collection, Iterable[bpy.types.Object]]] = None,
 ) -> None:
+    # objects: only these objects are applied. whole scene when None.
+    scoped = objects is not None
+    objects = list(get_objects(context, objects))
+    deselect_all(context)
+
     scale = 1.0
     is_first_obj = True
-    for ob in context.scene.objects:
+    actions = set()
+    for ob in objects:
         if not ob.type in RESET_TARGET:
             ob.select_set(False)
             continue
@@ -69,6 +139,8 @@ def reset_transform_all(
 
         if ob.type == 'ARMATURE':
             scale = ob.scale.x
+            if ob.animation_data and ob.animation_data.action:
+                actions.add(ob.animation_data.action)
 
         if is_first_obj:
             context.view_layer.objects.active = ob
@@ -78,10 +150,9 @@ def reset_transform_all(
     bpy.ops.object.transform_apply(location = reset_location, rotation = reset_rotation, scale = reset_scale)
 
     deselect_all(context)
-    context.view_layer.objects.active = None
 
     if reset_scale and reset_scale != 1.0:
-        for act in bpy.data.actions:
+        for act in (actions if scoped else bpy.data.actions):
             correct_scale_fixed_action(act, scale)
     return
 
@@ -1 +1,6 @@
-from exporter.model import *
\ No newline at end of file
+from exporter.fbxwriter import *
+from exporter.texture import *
+from utils import BPY_AVAILABLE
+if BPY_AVAILABLE:
+    from exporter.fbxmesh import *
+    from exporter.model import *
@@ -0,0 +1,73 @@
+import bpy
+import os
+import numpy as np
+from typing import Optional
+from inspect import stack
+from logging import getLogger
+
+root_logger_name = os.path.splitext(os.path.basename(stack()[-2].filename))[0]
+module_logger_name = f'{root_logger_name}.exporter.fbxmesh'
+module_logger = getLogger(module_logger_name)
+
+from exporter.fbxwriter import FbxMesh, FBX_UNIT_SCALE
+
+
+def get_fbx_mesh(context: bpy.types.Context, use_active_collection: bool = False) -> Optional[FbxMesh]:
+    # the single mesh object in fbx space for exporter.fbxwriter, None when the scene is not a single mesh.
+    # write_fbx needs no bpy and can run on another thread.
+    objects = context.view_layer.active_layer_collection.collection.all_objects if use_active_collection else context.scene.objects
+    meshes = [ob for ob in objects if ob.type == 'MESH']
+    if len(meshes) != 1:
+        module_logger.warning(f'FBX writer needs a single mesh object. | meshes: {len(meshes)}')
+        return None
+
+    return mesh_from_object(meshes[0], context.scene.unit_settings.scale_length)
+
+
+def mesh_from_object(ob: bpy.types.Object, scale_length: float = 1.0) -> FbxMesh:
+    me = ob.data
+    me.calc_loop_triangles()
+    me.calc_normals_split()
+
+    mesh = FbxMesh(ob.name)
+    if me.materials and me.materials[0]:
+        mesh.material_name = me.materials[0].name
+
+    positions = np.zeros(len(me.vertices) * 3, dtype=np.float32)
+    me.vertices.foreach_get('co', positions)
+    tri_loops = np.zeros(len(me.loop_triangles) * 3, dtype=np.int32)
+    me.loop_triangles.foreach_get('loops', tri_loops)
+    loop_vertices = np.zeros(len(me.loops), dtype=np.int32)
+    me.loops.foreach_get('vertex_index', loop_vertices)
+    loop_normals = np.zeros(len(me.loops) * 3, dtype=np.float32)
+    me.loops.foreach_get('normal', loop_normals)
+
+    # world space, then blender z up to fbx y up: (x, y, z) -> (x, z, -y)
+    matrix = np.array(ob.matrix_world, dtype=np.float64)
+    normal_matrix = np.linalg.inv(matrix[:3, :3]).T
+    positions = positions.reshape(-1, 3) @ matrix[:3, :3].T + matrix[:3, 3]
+    normals = loop_normals.reshape(-1, 3)[tri_loops] @ normal_matrix.T
+    normals /= np.maximum(np.linalg.norm(normals, axis=1, keepdims=True), 1e-12)
+
+    mesh.positions = _to_fbx_axes(positions) * (FBX_UNIT_SCALE * scale_length)
+    mesh.triangles = loop_vertices[tri_loops].reshape(-1, 3)
+    mesh.normals = _to_fbx_axes(normals)
+    mesh.normal_mapping = 'ByPolygonVertex'
+
+    # per loop values, indexed by the loop of each triangle corner
+    if me.uv_layers.active:
+        uvs = np.zeros(len(me.loops) * 2, dtype=np.float32)
+        me.uv_layers.active.data.foreach_get('uv', uvs)
+        mesh.uvs = uvs.reshape(-1, 2)
+        mesh.uv_indices = tri_loops
+    if me.vertex_colors.active:
+        colors = np.zeros(len(me.loops) * 4, dtype=np.float32)
+        me.vertex_colors.active.data.foreach_get('color', colors)
+        mesh.colors = colors.reshape(-1, 4)
+        mesh.color_indices = tri_loops
+
+    return mesh
+
+
+def _to_fbx_axes(vectors: np.ndarray) -> np.ndarray:
+    return np.stack([vectors[:, 0], vectors[:, 2], -vectors[:, 1]], axis=1)
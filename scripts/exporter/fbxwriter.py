@@ -0,0 +1,353 @@
+import os, zlib, time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from struct import pack, pack_into
+from typing import Dict, List, Optional, Tuple
+from inspect import stack
+from logging import getLogger
+
+root_logger_name = os.path.splitext(os.path.basename(stack()[-2].filename))[0]
+module_logger_name = f'{root_logger_name}.exporter.fbxwriter'
+module_logger = getLogger(module_logger_name)
+
+FBX_VERSION = 7400
+# arrays smaller than this are stored raw, as the fbx sdk does
+COMPRESS_MIN_BYTES = 128
+COMPRESS_LEVEL = 1
+# blender meters to fbx centimeters, as apply_unit_scale with apply_scale_options='FBX_SCALE_NONE'
+FBX_UNIT_SCALE = 100.0
+CREATOR = 'clo3dobj_to_vtryon fbxwriter'
+
+# fixed file id, creation time and footer, same as blender's exporter. the fbx sdk checks them against each other.
+_HEAD_MAGIC = b'Kaydara FBX Binary\x20\x20\x00\x1a\x00'
+_FILE_ID = b'\x28\xb3\x2a\xeb\xb6\x24\xcc\xc2\xbf\xc8\xb0\x2a\xa9\x2b\xfc\xf1'
+_TIME_ID = b'1970-01-01 10:00:00:000'
+_FOOT_ID = b'\xfa\xbc\xab\x09\xd0\xc8\xd4\x66\xb1\x76\xfb\x83\x1c\xf7\x26\x7e'
+_FOOT_MAGIC = b'\xf8\x5a\x8c\x6a\xde\xf5\xd9\x7e\xec\xe9\x0c\xe3\x75\x8f\x29\x0b'
+_NULL_RECORD = b'\x00' * 13
+_NAME_SEPARATOR = b'\x00\x01'
+
+# object ids. one document, model, geometry and material per file.
+_DOCUMENT_ID = 1000
+_MODEL_ID = 2000
+_GEOMETRY_ID = 3000
+_MATERIAL_ID = 4000
+
+# (name, properties, children). properties are already encoded.
+Node = Tuple[bytes, List[bytes], List[any]]
+
+
+class FbxMesh:
+    def __init__(self, name: str) -> None:
+        # fbx space. y up, centimeters when UnitScaleFactor is 1.
+        self.name: str = name
+        self.positions: np.ndarray = np.zeros((0, 3), dtype=np.float32)
+        self.triangles: np.ndarray = np.zeros((0, 3), dtype=np.int32)
+
+        # per vertex (normal_mapping 'ByVertice') or per triangle corner ('ByPolygonVertex')
+        self.normals: Optional[np.ndarray] = None
+        self.normal_mapping: str = 'ByVertice'
+        # uv and color values, indexed per triangle corner
+        self.uvs: Optional[np.ndarray] = None
+        self.uv_indices: Optional[np.ndarray] = None
+        self.colors: Optional[np.ndarray] = None
+        self.color_indices: Optional[np.ndarray] = None
+        self.material_name: str = 'Material'
+        self.unit_scale_factor: float = 1.0
+
+
+def write_fbx(path: str, mesh: FbxMesh, compress_level: int = COMPRESS_LEVEL) -> None:
+    start = time.perf_counter()
+    buffer = bytearray(_HEAD_MAGIC)
+    buffer += pack('<I', FBX_VERSION)
+
+    for node in _document_nodes(mesh, compress_level):
+        _write_node(buffer, node, top_level=True)
+    buffer += _NULL_RECORD
+    _write_footer(buffer)
+
+    with open(path, mode='wb') as f:
+        f.write(buffer)
+
+    module_logger.debug(f'FBX written. | path: {path}, bytes: {len(buffer)}, seconds: {time.perf_counter() - start:.3f}')
+    return
+
+
+# properties
+
+def _int16(value: int) -> bytes:
+    return b'Y' + pack('<h', value)
+
+def _bool(value: bool) -> bytes:
+    return b'C' + pack('<?', value)
+
+def _int32(value: int) -> bytes:
+    return b'I' + pack('<i', value)
+
+def _int64(value: int) -> bytes:
+    return b'L' + pack('<q', value)
+
+def _float64(value: float) -> bytes:
+    return b'D' + pack('<d', value)
+
+def _string(value: str|bytes) -> bytes:
+    if isinstance(value, str):
+        value = value.encode('utf-8')
+    return b'S' + pack('<I', len(value)) + value
+
+def _raw(value: bytes) -> bytes:
+    return b'R' + pack('<I', len(value)) + value
+
+def _name(name: str, class_name: str) -> bytes:
+    # "name::class" is stored as name, \x00\x01, class
+    return _string(name.encode('utf-8') + _NAME_SEPARATOR + class_name.encode('utf-8'))
+
+_ARRAY_TYPES = {
+    b'd': np.float64,
+    b'f': np.float32,
+    b'i': np.int32,
+    b'l': np.int64,
+    b'b': np.bool_,
+}
+
+def _arrays(arrays: Dict[str, Tuple[bytes, np.ndarray]], compress_level: int) -> Dict[str, bytes]:
+    # zlib releases the gil. the arrays of a mesh are compressed side by side.
+    with ThreadPoolExecutor(max_workers=len(arrays)) as executor:
+        encoded = executor.map(lambda item: _array(*item, compress_level), arrays.values())
+        return dict(zip(arrays, encoded))
+
+def _array(code: bytes, values: np.ndarray, compress_level: int) -> bytes:
+    values = np.ascontiguousarray(values, dtype=_ARRAY_TYPES[code]).ravel()
+    data = values.tobytes()
+    encoding = 0
+    if len(data) >= COMPRESS_MIN_BYTES:
+        data = zlib.compress(data, compress_level)
+        encoding = 1
+    return code + pack('<3I', len(values), encoding, len(data)) + data
+
+
+# nodes
+
+def _node(name: str, *props: bytes, children: Optional[List[Node]] = None) -> Node:
+    return name.encode('ascii'), list(props), children or list()
+
+def _p(name: str, type_name: str, label: str, flags: str, *values: bytes) -> Node:
+    # Properties70 entry
+    return _node('P', _string(name), _string(type_name), _string(label), _string(flags), *values)
+
+def _write_node(buffer: bytearray, node: Node, top_level: bool = False) -> None:
+    name, props, children = node
+    start = len(buffer)
+    buffer += pack('<3I', 0, len(props), sum(len(prop) for prop in props))
+    buffer += pack('<B', len(name)) + name
+    for prop in props:
+        buffer += prop
+
+    if children:
+        for child in children:
+            _write_node(buffer, child)
+        buffer += _NULL_RECORD
+    elif not props and not top_level:
+        buffer += _NULL_RECORD
+
+    # end offset is absolute in the file
+    pack_into('<I', buffer, start, len(buffer))
+    return
+
+def _write_footer(buffer: bytearray) -> None:
+    buffer += _FOOT_ID
+    buffer += b'\x00' * 4
+    pad = ((len(buffer) + 15) & ~15) - len(buffer)
+    buffer += b'\x00' * (pad or 16)
+    buffer += pack('<I', FBX_VERSION)
+    buffer += b'\x00' * 120
+    buffer += _FOOT_MAGIC
+    return
+
+
+def _document_nodes(mesh: FbxMesh, compress_level: int) -> List[Node]:
+    now = time.localtime()
+    header = _node('FBXHeaderExtension', children=[
+        _node('FBXHeaderVersion', _int32(1003)),
+        _node('FBXVersion', _int32(FBX_VERSION)),
+        _node('EncryptionType', _int32(0)),
+        _node('CreationTimeStamp', children=[
+            _node('Version', _int32(1000)),
+            _node('Year', _int32(now.tm_year)),
+            _node('Month', _int32(now.tm_mon)),
+            _node('Day', _int32(now.tm_mday)),
+            _node('Hour', _int32(now.tm_hour)),
+            _node('Minute', _int32(now.tm_min)),
+            _node('Second', _int32(now.tm_sec)),
+            _node('Millisecond', _int32(0)),
+        ]),
+        _node('Creator', _string(CREATOR)),
+    ])
+
+    # y up, -z forward, same axes as bpy.ops.export_scene.fbx(axis_forward='-Z', axis_up='Y')
+    global_settings = _node('GlobalSettings', children=[
+        _node('Version', _int32(1000)),
+        _node('Properties70', children=[
+            _p('UpAxis', 'int', 'Integer', '', _int32(1)),
+            _p('UpAxisSign', 'int', 'Integer', '', _int32(1)),
+            _p('FrontAxis', 'int', 'Integer', '', _int32(2)),
+            _p('FrontAxisSign', 'int', 'Integer', '', _int32(1)),
+            _p('CoordAxis', 'int', 'Integer', '', _int32(0)),
+            _p('CoordAxisSign', 'int', 'Integer', '', _int32(1)),
+            _p('OriginalUpAxis', 'int', 'Integer', '', _int32(-1)),
+            _p('OriginalUpAxisSign', 'int', 'Integer', '', _int32(1)),
+            _p('UnitScaleFactor', 'double', 'Number', '', _float64(mesh.unit_scale_factor)),
+            _p('OriginalUnitScaleFactor', 'double', 'Number', '', _float64(mesh.unit_scale_factor)),
+            _p('AmbientColor', 'ColorRGB', 'Color', '', _float64(0.0), _float64(0.0), _float64(0.0)),
+            _p('DefaultCamera', 'KString', '', '', _string('Producer Perspective')),
+            _p('TimeMode', 'enum', '', '', _int32(11)),
+            _p('TimeSpanStart', 'KTime', 'Time', '', _int64(0)),
+            _p('TimeSpanStop', 'KTime', 'Time', '', _int64(46186158000)),
+            _p('CustomFrameRate', 'double', 'Number', '', _float64(24.0)),
+        ]),
+    ])
+
+    documents = _node('Documents', children=[
+        _node('Count', _int32(1)),
+        _node('Document', _int64(_DOCUMENT_ID), _string('Scene'), _string('Scene'), children=[
+            _node('Properties70', children=[
+                _p('SourceObject', 'object', '', ''),
+                _p('ActiveAnimStackName', 'KString', '', '', _string('')),
+            ]),
+            _node('RootNode', _int64(0)),
+        ]),
+    ])
+
+    definitions = _node('Definitions', children=[
+        _node('Version', _int32(100)),
+        _node('Count', _int32(4)),
+        _node('ObjectType', _string('GlobalSettings'), children=[_node('Count', _int32(1))]),
+        _node('ObjectType', _string('Model'), children=[_node('Count', _int32(1))]),
+        _node('ObjectType', _string('Geometry'), children=[_node('Count', _int32(1))]),
+        _node('ObjectType', _string('Material'), children=[_node('Count', _int32(1))]),
+    ])
+
+    objects = _node('Objects', children=[
+        _geometry_node(mesh, compress_level),
+        _node('Model', _int64(_MODEL_ID), _name(mesh.name, 'Model'), _string('Mesh'), children=[
+            _node('Version', _int32(232)),
+            _node('Properties70', children=[
+                _p('Lcl Translation', 'Lcl Translation', '', 'A', _float64(0.0), _float64(0.0), _float64(0.0)),
+                _p('Lcl Rotation', 'Lcl Rotation', '', 'A', _float64(0.0), _float64(0.0), _float64(0.0)),
+                _p('Lcl Scaling', 'Lcl Scaling', '', 'A', _float64(1.0), _float64(1.0), _float64(1.0)),
+                _p('DefaultAttributeIndex', 'int', 'Integer', '', _int32(0)),
+                _p('InheritType', 'enum', '', '', _int32(1)),
+            ]),
+            _node('MultiLayer', _int32(0)),
+            _node('MultiTake', _int32(0)),
+            _node('Shading', _bool(True)),
+            _node('Culling', _string('CullingOff')),
+        ]),
+        _node('Material', _int64(_MATERIAL_ID), _name(mesh.material_name, 'Material'), _string(''), children=[
+            _node('Version', _int32(102)),
+            _node('ShadingModel', _string('Phong')),
+            _node('MultiLayer', _int32(0)),
+            _node('Properties70', children=[
+                _p('DiffuseColor', 'Color', '', 'A', _float64(0.8), _float64(0.8), _float64(0.8)),
+                _p('Diffuse', 'Vector3D', 'Vector', '', _float64(0.8), _float64(0.8), _float64(0.8)),
+            ]),
+        ]),
+    ])
+
+    connections = _node('Connections', children=[
+        _node('C', _string('OO'), _int64(_MODEL_ID), _int64(0)),
+        _node('C', _string('OO'), _int64(_GEOMETRY_ID), _int64(_MODEL_ID)),
+        _node('C', _string('OO'), _int64(_MATERIAL_ID), _int64(_MODEL_ID)),
+    ])
+
+    return [
+        header,
+        _node('FileId', _raw(_FILE_ID)),
+        _node('CreationTime', _string(_TIME_ID)),
+        _node('Creator', _string(CREATOR)),
+        global_settings,
+        documents,
+        _node('References'),
+        definitions,
+        objects,
+        connections,
+        _node('Takes', children=[_node('Current', _string(''))]),
+    ]
+
+
+def _geometry_node(mesh: FbxMesh, compress_level: int) -> Node:
+    triangles = np.asarray(mesh.triangles, dtype=np.int32).reshape(-1, 3)
+    # the last index of every polygon is stored as -(index + 1)
+    polygon_vertex_index = triangles.copy()
+    polygon_vertex_index[:, 2] = -polygon_vertex_index[:, 2] - 1
+
+    arrays = {
+        "Vertices": (b'd', mesh.positions),
+        "PolygonVertexIndex": (b'i', polygon_vertex_index),
+        "Materials": (b'i', np.zeros(1)),
+    }
+    if mesh.normals is not None:
+        arrays["Normals"] = (b'd', mesh.normals)
+    if mesh.colors is not None:
+        arrays["Colors"] = (b'd', mesh.colors)
+        arrays["ColorIndex"] = (b'i', mesh.color_indices)
+    if mesh.uvs is not None:
+        arrays["UV"] = (b'd', mesh.uvs)
+        arrays["UVIndex"] = (b'i', mesh.uv_indices)
+    arrays = _arrays(arrays, compress_level)
+
+    children = [
+        _node('Properties70'),
+        _node('GeometryVersion', _int32(124)),
+        _node('Vertices', arrays["Vertices"]),
+        _node('PolygonVertexIndex', arrays["PolygonVertexIndex"]),
+    ]
+    layer = list()
+
+    if mesh.normals is not None:
+        children.append(_node('LayerElementNormal', _int32(0), children=[
+            _node('Version', _int32(101)),
+            _node('Name', _string('')),
+            _node('MappingInformationType', _string(mesh.normal_mapping)),
+            _node('ReferenceInformationType', _string('Direct')),
+            _node('Normals', arrays["Normals"]),
+        ]))
+        layer.append('LayerElementNormal')
+
+    if mesh.colors is not None:
+        children.append(_node('LayerElementColor', _int32(0), children=[
+            _node('Version', _int32(101)),
+            _node('Name', _string('Col')),
+            _node('MappingInformationType', _string('ByPolygonVertex')),
+            _node('ReferenceInformationType', _string('IndexToDirect')),
+            _node('Colors', arrays["Colors"]),
+            _node('ColorIndex', arrays["ColorIndex"]),
+        ]))
+        layer.append('LayerElementColor')
+
+    if mesh.uvs is not None:
+        children.append(_node('LayerElementUV', _int32(0), children=[
+            _node('Version', _int32(101)),
+            _node('Name', _string('UVMap')),
+            _node('MappingInformationType', _string('ByPolygonVertex')),
+            _node('ReferenceInformationType', _string('IndexToDirect')),
+            _node('UV', arrays["UV"]),
+            _node('UVIndex', arrays["UVIndex"]),
+        ]))
+        layer.append('LayerElementUV')
+
+    # one material for the whole mesh
+    children.append(_node('LayerElementMaterial', _int32(0), children=[
+        _node('Version', _int32(101)),
+        _node('Name', _string('')),
+        _node('MappingInformationType', _string('AllSame')),
+        _node('ReferenceInformationType', _string('IndexToDirect')),
+        _node('Materials', arrays["Materials"]),
+    ]))
+    layer.append('LayerElementMaterial')
+
+    children.append(_node('Layer', _int32(0), children=[_node('Version', _int32(100))] + [
+        _node('LayerElement', children=[_node('Type', _string(element)), _node('TypedIndex', _int32(0))]) for element in layer
+    ]))
+
+    return _node('Geometry', _int64(_GEOMETRY_ID), _name(mesh.name, 'Geometry'), _string('Mesh'), children=children)
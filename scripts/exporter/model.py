@@ -1,5 +1,7 @@
 import bpy
-import os, sys
+import os, sys, time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Union
 from inspect import stack
 from logging import getLogger
 
@@ -7,9 +9,35 @@ root_logger_name = os.path.splitext(os.path.basename(stack()[-2].filename))[0]
 module_logger_name = f'{root_logger_name}.exporter.model'
 module_logger = getLogger(module_logger_name)
 
-from utils import validate_path
+from utils import validate_path, get_temp_path, replace_file, remove_file
+from exporter.fbxwriter import write_fbx
+from exporter.fbxmesh import get_fbx_mesh
+from exporter.texture import TextureOptimizer
 
 
+FBX_WRITERS = (
+    'blender',
+    'numpy',
+)
+
+GLB_PROFILES = {
+    # as before. no compression.
+    'default': {
+        "export_draco_mesh_compression_enable": False,
+    },
+    # web delivery. draco compressed meshes with quantized attributes, decoded by the client.
+    'draco': {
+        "export_draco_mesh_compression_enable": True,
+        "export_draco_mesh_compression_level": 6,
+        "export_draco_position_quantization": 14,
+        "export_draco_normal_quantization": 10,
+        "export_draco_texcoord_quantization": 12,
+        "export_draco_color_quantization": 10,
+        "export_draco_generic_quantization": 12,
+    },
+}
+DEFAULT_GLB_PROFILE = 'default'
+
 EXTENSIONS = (
     'fbx',
     'glb',
@@ -18,28 +46,123 @@ EXTENSIONS = (
     'vrm'
 )
 
-def export_model(directory: str, file_name: str, extension: str) -> None:
-    extension = extension.lower()
-    if extension not in EXTENSIONS:
-        module_logger.error(f'File extension not supported. | extension: {extension}')
+def export_model(
+    directory: str,
+    file_name: str,
+    extensions: Union[str, List[str]],
+    use_active_collection: bool = False,
+    fbx_writer: str = 'blender',
+    texture_optimizer: Optional[TextureOptimizer] = None,
+    glb_profile: str = DEFAULT_GLB_PROFILE,
+) -> Dict[str, Dict[str, float]]:
+    # extensions: one or several formats, all written from the current scene. returns wall, cpu and bytes per format.
+    # use_active_collection: fbx, glb and gltf. exports the active collection instead of the whole scene.
+    # fbx_writer: numpy writes a single mesh with exporter.fbxwriter, otherwise bpy.ops.export_scene.fbx.
+    # texture_optimizer: the images are embedded from its resized and transcoded files.
+    # glb_profile: glb and gltf only. one of GLB_PROFILES.
+    if isinstance(extensions, str):
+        extensions = [extensions]
+    extensions = list(dict.fromkeys(extension.lower() for extension in extensions))
+    for extension in extensions:
+        if extension not in EXTENSIONS:
+            module_logger.error(f'File extension not supported. | extension: {extension}')
+            sys.exit()
+
+    if fbx_writer not in FBX_WRITERS:
+        module_logger.error(f'FBX writer not supported. | fbx_writer: {fbx_writer}')
         sys.exit()
 
-    path_valid = validate_path(directory, file_name, extension)
-
-    if path_valid.get("error"):
-        module_logger.error(path_valid["error"])
+    if glb_profile not in GLB_PROFILES:
+        module_logger.error(f'GLB profile not supported. | glb_profile: {glb_profile}')
         sys.exit()
 
-    file_path = path_valid.get("path")
-
-    if not path_valid.get("warn"):
-        module_logger.debug(f'Overwrite file. | path: {file_path}')
-
-    module_logger.debug(f'{extension.upper()} export start.')
+    file_paths = dict()
+    for extension in extensions:
+        path_valid = validate_path(directory, file_name, extension)
+
+        if path_valid.get("error"):
+            module_logger.error(path_valid["error"])
+            sys.exit()
+
+        file_paths[extension] = path_valid.get("path")
+
+        if not path_valid.get("warn"):
+            module_logger.debug(f'Overwrite file. | path: {file_paths[extension]}')
+
+    if texture_optimizer:
+        _use_optimized_textures(texture_optimizer)
+
+    # the blender exporters run one after another on this thread. the numpy fbx write and the fsync and rename
+    # of every file run on threads meanwhile. the numpy fbx goes first so that its write overlaps the others.
+    extensions.sort(key=lambda extension: not (extension == 'fbx' and fbx_writer == 'numpy'))
+    outputs = dict()
+    try:
+        with ThreadPoolExecutor(max_workers=len(extensions), thread_name_prefix='vtryon_export') as executor:
+            futures = dict()
+            for extension in extensions:
+                module_logger.debug(f'{extension.upper()} export start.')
+                wall = time.perf_counter()
+                cpu = time.thread_time()
+                # written next to the file and renamed over it when complete. a killed export leaves no truncated file.
+                temp_path = get_temp_path(file_paths[extension])
+                write = _export(temp_path, extension, use_active_collection, fbx_writer, glb_profile)
+                outputs[extension] = {"wall": time.perf_counter() - wall, "cpu": time.thread_time() - cpu}
+                futures[extension] = executor.submit(_write, extension, write, temp_path, file_paths[extension])
+
+            for extension, future in futures.items():
+                output = future.result()
+                outputs[extension]["wall"] += output["wall"]
+                outputs[extension]["cpu"] += output["cpu"]
+                outputs[extension]["bytes"] = output["bytes"]
+    except BaseException:
+        # the threads are done here. files already renamed stay.
+        for file_path in file_paths.values():
+            remove_file(get_temp_path(file_path))
+        raise
+
+    return outputs
+
+
+def _write(extension: str, write: Optional[Callable[[], None]], temp_path: str, file_path: str) -> Dict[str, float]:
+    wall = time.perf_counter()
+    cpu = time.thread_time()
+    if write:
+        write()
+
+    if not os.path.isfile(temp_path):
+        module_logger.error(f'{extension.upper()} export did not write the file. | path: {temp_path}')
+        sys.exit()
+    size = os.path.getsize(temp_path)
+    replace_file(temp_path, file_path)
 
+    module_logger.debug(f'{extension.upper()} export completed.')
+    return {"wall": time.perf_counter() - wall, "cpu": time.thread_time() - cpu, "bytes": size}
+
+
+def _use_optimized_textures(texture_optimizer: TextureOptimizer) -> None:
+    # images used by the exported materials are switched to the optimized files. the images are optimized side by side
+    # on the threads of the optimizer. the default materials of the optimize have no image and nothing is optimized.
+    images = dict()
+    for image in bpy.data.images:
+        if not image.users or image.source != 'FILE' or image.packed_file or not image.filepath:
+            continue
+        images[image.name] = os.path.abspath(bpy.path.abspath(image.filepath))
+    texture_optimizer.submit(images.values())
+
+    for name, path in images.items():
+        optimized_path = texture_optimizer.result(path)
+        if optimized_path != path:
+            image = bpy.data.images[name]
+            image.filepath = optimized_path
+            image.reload()
+    return
+
+
+def _export(temp_path: str, extension: str, use_active_collection: bool, fbx_writer: str, glb_profile: str) -> Optional[Callable[[], None]]:
+    # the part needing bpy. returns the file write left for another thread, or None when the file is written.
     if extension == 'vrm':
         bpy.ops.export_scene.vrm(
-            filepath = file_path, 
+            filepath = temp_path, 
             export_invisibles = False, 
             export_only_selections = False, 
             enable_advanced_preferences = False, 
@@ -48,30 +171,36 @@ def export_model(directory: str, file_name: str, extension: str) -> None:
 
     elif extension == 'glb':
         bpy.ops.export_scene.gltf(
-            filepath = file_path, 
+            filepath = temp_path, 
             export_format = 'GLB', 
-            export_draco_mesh_compression_enable = False, 
+            use_active_collection = use_active_collection, 
             export_tangents = False, 
             export_materials = 'EXPORT', 
             export_yup = True, 
-            export_animations = True
+            export_animations = True,
+            **GLB_PROFILES[glb_profile],
         )
 
     elif extension == 'gltf':
         bpy.ops.export_scene.gltf(
-            filepath = file_path, 
+            filepath = temp_path, 
             export_format = 'GLTF_EMBEDDED', 
-            export_draco_mesh_compression_enable = False, 
+            use_active_collection = use_active_collection, 
             export_tangents = False, 
             export_materials = 'EXPORT', 
             export_yup = True, 
-            export_animations = True
+            export_animations = True,
+            **GLB_PROFILES[glb_profile],
         )
 
     elif extension == 'fbx':
+        # falls back to the blender exporter when the scene is not a single mesh
+        mesh = get_fbx_mesh(bpy.context, use_active_collection) if fbx_writer == 'numpy' else None
+        if mesh is not None:
+            return lambda: write_fbx(temp_path, mesh)
         bpy.ops.export_scene.fbx(
-            filepath = file_path, 
-            use_active_collection = False, 
+            filepath = temp_path, 
+            use_active_collection = use_active_collection, 
             global_scale = 1.0, 
             apply_unit_scale = True, 
             apply_scale_options = 'FBX_SCALE_NONE', 
@@ -85,6 +214,4 @@ def export_model(directory: str, file_name: str, extension: str) -> None:
             embed_textures = True,  # Emmed texture
         )
 
-    module_logger.debug(f'{extension.upper()} export completed.')
-
     return
\ No newline at end of file
@@ -0,0 +1,167 @@
+import os, atexit, hashlib, shutil, tempfile, threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+from inspect import stack
+from logging import getLogger
+
+root_logger_name = os.path.splitext(os.path.basename(stack()[-2].filename))[0]
+module_logger_name = f'{root_logger_name}.exporter.texture'
+module_logger = getLogger(module_logger_name)
+
+from utils import PIL_AVAILABLE
+if PIL_AVAILABLE:
+    from PIL import Image
+
+# pillow format → file extension. empty format keeps the format of the source.
+TEXTURE_FORMATS = {
+    'PNG': 'png',
+    'JPEG': 'jpg',
+}
+DEFAULT_TEXTURE_MAX_SIZE = 0
+DEFAULT_TEXTURE_FORMAT = ''
+JPEG_QUALITY = 90
+TEXTURE_WORKERS = 4
+DIGEST_CHUNK_SIZE = 1024 * 1024
+
+_texture_optimizer = None
+
+
+class TextureOptimizer:
+    def __init__(self, max_size: int = DEFAULT_TEXTURE_MAX_SIZE, image_format: str = DEFAULT_TEXTURE_FORMAT, workers: int = TEXTURE_WORKERS) -> None:
+        self._logger_name = f'{root_logger_name}.{self.__module__}'
+        self._logger = getLogger(self._logger_name)
+
+        # max_size: longest side in pixels, 0 keeps the size. image_format: one of TEXTURE_FORMATS or empty.
+        self.max_size: int = max_size
+        self.image_format: str = image_format
+        # optimized textures of the whole batch, named by the digest of the source
+        self.out_dir: str = tempfile.mkdtemp(prefix='vtryon_tex_')
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='vtryon_texture')
+        self._lock = threading.Lock()
+        # (path, mtime, size) → optimized path, and digest → optimized path. a file shared by garments is done once.
+        self._by_path: Dict[Tuple[str, int, int], Future] = dict()
+        self._by_digest: Dict[str, Future] = dict()
+
+    def submit(self, paths: Iterable[str]) -> List[Future]:
+        # starts the textures on the thread pool. the mesh is processed meanwhile.
+        return [future for future in (self._submit(path) for path in paths) if future is not None]
+
+    def _submit(self, path: str) -> Optional[Future]:
+        try:
+            state = os.stat(path)
+        except OSError:
+            self._logger.warning(f'Texture does not exist. | path: {path}')
+            return None
+        key = (os.path.abspath(path), state.st_mtime_ns, state.st_size)
+        with self._lock:
+            future = self._by_path.get(key)
+            if future is None:
+                future = self._executor.submit(self._optimize_file, key[0])
+                self._by_path[key] = future
+        return future
+
+    def result(self, path: str) -> str:
+        # optimized texture of path, or path itself when it is kept or cannot be read
+        future = self._submit(path)
+        if future is None:
+            return path
+        try:
+            return future.result()
+        except Exception as e:
+            self._logger.warning(f'Texture optimization failed. The texture is kept. | path: {path}, error: {type(e).__name__}: {e}')
+            return path
+
+    def _optimize_file(self, path: str) -> str:
+        digest = file_digest(path)
+        with self._lock:
+            future = self._by_digest.get(digest)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._by_digest[digest] = future
+        # the same image under another path is being or was optimized by another thread
+        if not owner:
+            return future.result()
+
+        try:
+            out_path = self._optimize_image(path, digest)
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        future.set_result(out_path)
+        return out_path
+
+    def _optimize_image(self, path: str, digest: str) -> str:
+        with Image.open(path) as image:
+            size = fit_size(image.size, self.max_size)
+            source_format = image.format
+            image_format = self.image_format or source_format
+            if size == image.size and image_format == source_format:
+                return path
+
+            if size != image.size:
+                # pillow releases the gil while resampling. the threads run beside blender.
+                image = image.resize(size, Image.LANCZOS, reducing_gap=3.0)
+            if image_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+                # no alpha in jpeg
+                image = image.convert('RGB')
+
+            extension = TEXTURE_FORMATS.get(image_format, os.path.splitext(path)[1][1:].lower())
+            # the file name is kept for the exporters, the digest dir keeps the names apart
+            out_dir = os.path.join(self.out_dir, digest[:16])
+            os.makedirs(out_dir, exist_ok=True)
+            out_path = os.path.join(out_dir, f'{os.path.splitext(os.path.basename(path))[0]}.{extension}')
+            options = {"quality": JPEG_QUALITY, "optimize": True} if image_format == 'JPEG' else dict()
+            image.save(out_path, format=image_format, **options)
+
+        self._logger.debug(f'Texture optimized. | path: {path}, size: {size}, format: {image_format}')
+        return out_path
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        shutil.rmtree(self.out_dir, ignore_errors=True)
+        return
+
+
+def get_texture_optimizer(settings: Dict[str, any]) -> Optional[TextureOptimizer]:
+    # None when settings keep the textures as they are. the optimizer is shared by the items of the process.
+    global _texture_optimizer
+    max_size = int(settings.get("texture_max_size", DEFAULT_TEXTURE_MAX_SIZE))
+    image_format = str(settings.get("texture_format", DEFAULT_TEXTURE_FORMAT)).upper()
+    if image_format and image_format not in TEXTURE_FORMATS:
+        module_logger.warning(f'Unexpected texture format. format must be {[x for x in TEXTURE_FORMATS]} | texture_format: {image_format}')
+        image_format = DEFAULT_TEXTURE_FORMAT
+    if max_size <= 0 and not image_format:
+        return None
+    if not PIL_AVAILABLE:
+        module_logger.warning(f'Pillow is not installed. Textures are exported as they are.')
+        return None
+
+    # settings are read again by the resident worker
+    if _texture_optimizer and (_texture_optimizer.max_size, _texture_optimizer.image_format) != (max_size, image_format):
+        _texture_optimizer.close()
+        _texture_optimizer = None
+    if _texture_optimizer is None:
+        _texture_optimizer = TextureOptimizer(max_size, image_format)
+        atexit.register(_texture_optimizer.close)
+    return _texture_optimizer
+
+
+def fit_size(size: Tuple[int, int], max_size: int) -> Tuple[int, int]:
+    # longest side to max_size, keeping the aspect. never enlarged.
+    width, height = size
+    if max_size <= 0 or max(width, height) <= max_size:
+        return width, height
+    scale = max_size / max(width, height)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def file_digest(path: str) -> str:
+    digest = hashlib.sha1()
+    with open(path, mode='rb') as f:
+        while True:
+            block = f.read(DIGEST_CHUNK_SIZE)
+            if not block:
+                break
+            digest.update(block)
+    return digest.hexdigest()
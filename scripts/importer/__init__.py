@@ -1,2 +1,6 @@
-from importer.model import *
-from importer.blend import *
\ No newline at end of file
+from importer.objparser import *
+from utils import BPY_AVAILABLE
+if BPY_AVAILABLE:
+    from importer.objmesh import *
+    from importer.model import *
+    from importer.blend import *
@@ -9,6 +9,7 @@ module_logger_name = f'{root_logger_name}.importer.model'
 module_logger = getLogger(module_logger_name)
 
 from utils import validate_path, get_ext, get_filename_without_ext
+from importer.objmesh import import_obj_numpy
 
 
 EXTENSIONS = (
@@ -19,7 +20,13 @@ EXTENSIONS = (
     'vrm'
 )
 
-def import_model(directory: str, file_name: str, extension: Optional[str] = None) -> None:
+OBJ_READERS = (
+    'legacy',
+    'numpy',
+    'mmap',
+)
+
+def import_model(directory: str, file_name: str, extension: Optional[str] = None, obj_reader: str = 'legacy') -> None:
     if extension:
         extension = extension.lower()
     else:
@@ -32,6 +39,10 @@ def import_model(directory: str, file_name: str, extension: Optional[str] = None
         module_logger.error(f'File extension not supported. | extension: {extension}')
         sys.exit()
 
+    if obj_reader not in OBJ_READERS:
+        module_logger.error(f'OBJ reader not supported. | obj_reader: {obj_reader}')
+        sys.exit()
+
     path_valid = validate_path(directory, file_name, extension)
 
     if path_valid.get("error"):
@@ -75,6 +86,14 @@ def import_model(directory: str, file_name: str, extension: Optional[str] = None
             guess_original_bind_pose = True
         )
 
+    elif extension == 'obj' and obj_reader in ('numpy', 'mmap'):
+        import_obj_numpy(
+            file_path,
+            axis_forward = '-Z',
+            axis_up = 'Y',
+            use_mmap = obj_reader == 'mmap',
+        )
+
     elif extension == 'obj':
         bpy.ops.import_scene.obj(
             filepath = file_path, 
@@ -0,0 +1,88 @@
+import bpy
+import os
+import numpy as np
+from typing import Dict
+from inspect import stack
+from logging import getLogger
+from bpy_extras.io_utils import axis_conversion
+
+root_logger_name = os.path.splitext(os.path.basename(stack()[-2].filename))[0]
+module_logger_name = f'{root_logger_name}.importer.objmesh'
+module_logger = getLogger(module_logger_name)
+
+from importer.objparser import ObjData, parse_obj, parse_obj_mmap, parse_mtl
+
+
+def import_obj_numpy(file_path: str, axis_forward: str = '-Z', axis_up: str = 'Y', use_mmap: bool = False) -> bpy.types.Object:
+    # use_mmap: two pass parse into preallocated arrays. bounded memory for very large files.
+    obj_data = parse_obj_mmap(file_path) if use_mmap else parse_obj(file_path)
+
+    # materials. slot order follows the first usemtl, same as the legacy importer.
+    mtl_defs = dict()
+    for mtllib in obj_data.mtllibs:
+        mtl_path = os.path.join(os.path.dirname(file_path), mtllib)
+        if os.path.isfile(mtl_path):
+            mtl_defs.update(parse_mtl(mtl_path))
+        else:
+            module_logger.warning(f'MTL file does not exist. | path: {mtl_path}')
+
+    name = os.path.splitext(os.path.basename(file_path))[0]
+    mesh = build_mesh(name, obj_data, mtl_defs)
+
+    ob = bpy.data.objects.new(name, mesh)
+    bpy.context.view_layer.active_layer_collection.collection.objects.link(ob)
+    # same object transform as bpy.ops.import_scene.obj
+    ob.matrix_world = axis_conversion(from_forward=axis_forward, from_up=axis_up).to_4x4()
+
+    return ob
+
+
+def build_mesh(name: str, obj_data: ObjData, mtl_defs: Dict[str, Dict[str, any]]) -> bpy.types.Mesh:
+    mesh = bpy.data.meshes.new(name)
+
+    mesh.vertices.add(len(obj_data.positions))
+    mesh.vertices.foreach_set('co', obj_data.positions.ravel())
+
+    mesh.loops.add(len(obj_data.loop_vertices))
+    mesh.loops.foreach_set('vertex_index', obj_data.loop_vertices)
+
+    mesh.polygons.add(len(obj_data.face_sizes))
+    mesh.polygons.foreach_set('loop_start', obj_data.face_starts)
+    mesh.polygons.foreach_set('loop_total', obj_data.face_sizes)
+    mesh.polygons.foreach_set('material_index', obj_data.face_materials.astype(np.int32))
+    mesh.polygons.foreach_set('use_smooth', np.ones(len(obj_data.face_sizes), dtype=bool))
+
+    if obj_data.loop_uvs is not None and len(obj_data.uvs):
+        uv_layer = mesh.uv_layers.new(name='UVMap')
+        uv_layer.data.foreach_set('uv', obj_data.uvs[obj_data.loop_uvs].ravel())
+
+    for material_name in obj_data.material_names:
+        mesh.materials.append(_new_material(material_name, mtl_defs.get(material_name, dict())))
+
+    has_normals = obj_data.loop_normals is not None and len(obj_data.normals)
+    if has_normals:
+        # kept in loop data so that they follow the loops removed by validate()
+        mesh.create_normals_split()
+        mesh.loops.foreach_set('normal', obj_data.normals[obj_data.loop_normals].ravel())
+
+    mesh.update(calc_edges=True)
+    mesh.validate(clean_customdata=False)
+
+    if has_normals:
+        loop_normals = np.zeros(len(mesh.loops) * 3, dtype=np.float32)
+        mesh.loops.foreach_get('normal', loop_normals)
+        mesh.normals_split_custom_set(loop_normals.reshape(-1, 3))
+        mesh.use_auto_smooth = True
+
+    return mesh
+
+
+def _new_material(name: str, mtl_def: Dict[str, any]) -> bpy.types.Material:
+    # always a new material, as the legacy importer. a material of the same name may be left by an earlier garment
+    # in the batch scene, with another Kd. blender renames this one to <name>.001 and remove_unused deletes the old one.
+    # textures are not loaded. the virtual tryon convertion replaces all materials.
+    mat = bpy.data.materials.new(name)
+    kd = mtl_def.get("Kd")
+    if kd:
+        mat.diffuse_color = (*kd, mtl_def.get("d", 1.0))
+    return mat
@@ -0,0 +1,426 @@
+import os, mmap
+import numpy as np
+from typing import Dict, Iterator, List, Optional, Tuple
+from inspect import stack
+from logging import getLogger
+
+root_logger_name = os.path.splitext(os.path.basename(stack()[-2].filename))[0]
+module_logger_name = f'{root_logger_name}.importer.objparser'
+module_logger = getLogger(module_logger_name)
+
+# bytes read at once. records are never split because a chunk is cut at the last newline.
+CHUNK_SIZE = 64 * 1024 * 1024
+# mapped window of parse_obj_mmap. the window and its temporary arrays are the only memory besides the result arrays.
+MMAP_CHUNK_SIZE = 4 * 1024 * 1024
+
+
+class ObjData:
+    def __init__(self) -> None:
+        # vertex order is the order of "v" records. same as split_mode='OFF' of the legacy importer.
+        self.positions: np.ndarray = np.zeros((0, 3), dtype=np.float32)
+        self.uvs: np.ndarray = np.zeros((0, 2), dtype=np.float32)
+        self.normals: np.ndarray = np.zeros((0, 3), dtype=np.float32)
+
+        # per face corner (loop) indices. uv and normal indices are None when the file has none.
+        self.loop_vertices: np.ndarray = np.zeros(0, dtype=np.int32)
+        self.loop_uvs: Optional[np.ndarray] = None
+        self.loop_normals: Optional[np.ndarray] = None
+
+        self.face_sizes: np.ndarray = np.zeros(0, dtype=np.int32)
+        self.face_materials: np.ndarray = np.zeros(0, dtype=np.int16)
+        # material slot order is the order of the first "usemtl" of each name
+        self.material_names: List[str] = list()
+        self.mtllibs: List[str] = list()
+
+    @property
+    def face_starts(self) -> np.ndarray:
+        starts = np.zeros(len(self.face_sizes), dtype=np.int32)
+        np.cumsum(self.face_sizes[:-1], out=starts[1:])
+        return starts
+
+
+class _ChunkRecords:
+    def __init__(self) -> None:
+        self.v: List[bytes] = list()
+        self.vt: List[bytes] = list()
+        self.vn: List[bytes] = list()
+        self.f: List[bytes] = list()
+        # (index of the first face using the material, material name)
+        self.usemtl: List[Tuple[int, str]] = list()
+        self.mtllib: List[str] = list()
+
+
+def parse_obj(path: str, chunk_size: int = CHUNK_SIZE) -> ObjData:
+    positions, uvs, normals = list(), list(), list()
+    corners, face_sizes, face_materials = list(), list(), list()
+    counts = [0, 0, 0]
+    material_index: Dict[str, int] = dict()
+    current_material = 0
+    corner_format = None
+    obj = ObjData()
+
+    with open(path, mode='rb') as f:
+        rest = b''
+        while True:
+            data = f.read(chunk_size)
+            if not data and not rest:
+                break
+
+            if data:
+                data = rest + data
+                cut = data.rfind(b'\n') + 1
+                if cut == 0:
+                    rest = data
+                    continue
+                rest = data[cut:]
+                data = data[:cut]
+            else:
+                # last record without newline
+                data, rest = rest, b''
+
+            records = _split_records(data)
+
+            positions.append(_parse_floats(b'\n'.join(records.v), len(records.v), 3))
+            uvs.append(_parse_floats(b'\n'.join(records.vt), len(records.vt), 2))
+            normals.append(_parse_floats(b'\n'.join(records.vn), len(records.vn), 3))
+
+            if records.f:
+                if corner_format is None:
+                    corner_format = _corner_format(records.f[0])
+                chunk_corners, chunk_sizes = _parse_faces(np.frombuffer(b'\n'.join(records.f) + b'\n', dtype=np.uint8), corner_format)
+                if (chunk_corners < 0).any():
+                    _resolve_relative_indices(data, chunk_corners, chunk_sizes, counts)
+                else:
+                    chunk_corners -= 1
+                corners.append(chunk_corners)
+                face_sizes.append(chunk_sizes)
+
+            # material of every face in this chunk
+            chunk_materials = np.full(len(records.f), current_material, dtype=np.int16)
+            for first_face, name in records.usemtl:
+                current_material = material_index.setdefault(name, len(material_index))
+                chunk_materials[first_face:] = current_material
+            face_materials.append(chunk_materials)
+
+            obj.mtllibs += records.mtllib
+            counts[0] += len(positions[-1])
+            counts[1] += len(uvs[-1])
+            counts[2] += len(normals[-1])
+
+    obj.positions = np.concatenate(positions) if positions else obj.positions
+    obj.uvs = np.concatenate(uvs) if uvs else obj.uvs
+    obj.normals = np.concatenate(normals) if normals else obj.normals
+    obj.material_names = list(material_index)
+
+    if corners:
+        corners = np.concatenate(corners)
+        obj.face_sizes = np.concatenate(face_sizes)
+        obj.face_materials = np.concatenate(face_materials)
+        obj.loop_vertices = np.ascontiguousarray(corners[:, 0])
+        if corner_format[1]:
+            obj.loop_uvs = np.ascontiguousarray(corners[:, 1])
+        if corner_format[2]:
+            obj.loop_normals = np.ascontiguousarray(corners[:, 2])
+
+    module_logger.debug(f'OBJ parsed. | vertices: {len(obj.positions)}, faces: {len(obj.face_sizes)}, materials: {len(obj.material_names)}')
+    return obj
+
+
+def parse_obj_mmap(path: str, chunk_size: int = MMAP_CHUNK_SIZE) -> ObjData:
+    # parse_obj for very large files. the first pass counts the records, the second parses each chunk
+    # into the preallocated result arrays. one window of the file is mapped at a time and parsed as numpy arrays,
+    # so peak memory is the result arrays and one chunk.
+    obj = ObjData()
+    if not os.path.getsize(path):
+        return obj
+
+    with open(path, mode='rb') as f:
+        v_count, vt_count, vn_count, f_count, corner_count = 0, 0, 0, 0, 0
+        for data in _mmap_chunks(f, chunk_size):
+            counts = _count_records(data)
+            v_count += counts[0]
+            vt_count += counts[1]
+            vn_count += counts[2]
+            f_count += counts[3]
+            corner_count += counts[4]
+
+        obj.positions = np.zeros((v_count, 3), dtype=np.float32)
+        obj.uvs = np.zeros((vt_count, 2), dtype=np.float32)
+        obj.normals = np.zeros((vn_count, 3), dtype=np.float32)
+        obj.loop_vertices = np.zeros(corner_count, dtype=np.int32)
+        obj.face_sizes = np.zeros(f_count, dtype=np.int32)
+        obj.face_materials = np.zeros(f_count, dtype=np.int16)
+
+        # filled counts of v, vt, vn, and of faces and corners
+        counts = [0, 0, 0]
+        face_pos, corner_pos = 0, 0
+        material_index: Dict[str, int] = dict()
+        current_material = 0
+        corner_format = None
+
+        for data in _mmap_chunks(f, chunk_size):
+            buf = _chunk_buffer(data)
+            starts, ends, kinds = _line_kinds(buf)
+            chunk_counts = list()
+            for array, kind, skip, i in ((obj.positions, _V, 2, 0), (obj.uvs, _T, 3, 1), (obj.normals, _N, 3, 2)):
+                is_kind = kinds == kind
+                chunk_counts.append(int(is_kind.sum()))
+                values = _parse_floats(_line_text(buf, starts[is_kind], ends[is_kind], skip).tobytes(), chunk_counts[i], array.shape[1])
+                array[counts[i]:counts[i] + chunk_counts[i]] = values
+
+            is_f = kinds == _F
+            chunk_faces = int(is_f.sum())
+            if chunk_faces:
+                faces = _line_text(buf, starts[is_f], ends[is_f], 2)
+                if corner_format is None:
+                    corner_format = _corner_format(faces[:np.argmax(faces == _NEWLINE)].tobytes())
+                    if corner_format[1]:
+                        obj.loop_uvs = np.zeros(corner_count, dtype=np.int32)
+                    if corner_format[2]:
+                        obj.loop_normals = np.zeros(corner_count, dtype=np.int32)
+
+                chunk_corners, chunk_sizes = _parse_faces(faces, corner_format)
+                if (chunk_corners < 0).any():
+                    _resolve_relative_indices(data, chunk_corners, chunk_sizes, counts)
+                else:
+                    chunk_corners -= 1
+                if corner_pos + len(chunk_corners) > corner_count:
+                    raise ValueError(f'Face corners do not match the first pass. | path: {path}')
+
+                corner_end = corner_pos + len(chunk_corners)
+                obj.loop_vertices[corner_pos:corner_end] = chunk_corners[:, 0]
+                if obj.loop_uvs is not None:
+                    obj.loop_uvs[corner_pos:corner_end] = chunk_corners[:, 1]
+                if obj.loop_normals is not None:
+                    obj.loop_normals[corner_pos:corner_end] = chunk_corners[:, 2]
+                obj.face_sizes[face_pos:face_pos + len(chunk_sizes)] = chunk_sizes
+                corner_pos = corner_end
+
+            chunk_materials = obj.face_materials[face_pos:face_pos + chunk_faces]
+            chunk_materials[:] = current_material
+            # usemtl and mtllib are the few other lines starting with u or m
+            others = np.flatnonzero((kinds == 0) & ((buf[starts] == _U) | (buf[starts] == _M)))
+            if len(others):
+                faces_before = np.cumsum(is_f)
+                for line_index in others:
+                    line = data[starts[line_index]:ends[line_index]]
+                    if line.startswith(b'usemtl'):
+                        current_material = material_index.setdefault(line[7:].strip().decode(errors='replace'), len(material_index))
+                        chunk_materials[faces_before[line_index]:] = current_material
+                    elif line.startswith(b'mtllib'):
+                        obj.mtllibs.append(line[7:].strip().decode(errors='replace'))
+            face_pos += chunk_faces
+            counts = [count + chunk_count for count, chunk_count in zip(counts, chunk_counts)]
+
+    if corner_pos != corner_count:
+        raise ValueError(f'Face corners do not match the first pass. | path: {path}')
+    obj.material_names = list(material_index)
+
+    module_logger.debug(f'OBJ parsed. | vertices: {len(obj.positions)}, faces: {len(obj.face_sizes)}, materials: {len(obj.material_names)}')
+    return obj
+
+
+def _mmap_chunks(f, chunk_size: int) -> Iterator[bytes]:
+    # chunks cut after a newline. a line longer than chunk_size makes a longer chunk.
+    # each window is unmapped before the next one, so the pages of parsed chunks do not stay resident.
+    size = os.fstat(f.fileno()).st_size
+    start = 0
+    while start < size:
+        # mmap offset must be a multiple of the allocation granularity
+        offset = start - start % mmap.ALLOCATIONGRANULARITY
+        length = min(start + chunk_size, size) - offset
+        while True:
+            with mmap.mmap(f.fileno(), length, access=mmap.ACCESS_READ, offset=offset) as mm:
+                end = offset + length
+                if end < size:
+                    cut = mm.rfind(b'\n', start - offset)
+                    if cut < 0:
+                        length = min(length * 2, size - offset)
+                        continue
+                    end = offset + cut + 1
+                data = mm[start - offset:end - offset]
+            break
+        yield data
+        start = end
+    return
+
+
+_SPACE, _NEWLINE = ord(' '), ord('\n')
+_V, _T, _N, _F, _U, _M = ord('v'), ord('t'), ord('n'), ord('f'), ord('u'), ord('m')
+
+def _chunk_buffer(data: bytes) -> np.ndarray:
+    # every line of the buffer ends with a newline
+    if not data.endswith(b'\n'):
+        data += b'\n'
+    return np.frombuffer(data, dtype=np.uint8)
+
+
+def _line_kinds(buf: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # start, newline and kind of each line, classified as _split_records does.
+    # kind is _V, _T, _N or _F for v, vt, vn and f records, 0 for the others.
+    ends = np.flatnonzero(buf == _NEWLINE)
+    starts = np.zeros(len(ends), dtype=ends.dtype)
+    starts[1:] = ends[:-1] + 1
+    # first two bytes of each line. an empty line reads its own newline and the next line.
+    first = buf[starts]
+    second = buf[np.minimum(starts + 1, len(buf) - 1)]
+
+    kinds = np.zeros(len(starts), dtype=np.uint8)
+    is_v = first == _V
+    kinds[is_v & (second == _SPACE)] = _V
+    kinds[is_v & (second == _T)] = _T
+    kinds[is_v & (second == _N)] = _N
+    kinds[(first == _F) & (second == _SPACE)] = _F
+    return starts, ends, kinds
+
+
+def _line_text(buf: np.ndarray, starts: np.ndarray, ends: np.ndarray, skip: int) -> np.ndarray:
+    # bytes of the given lines without their first `skip` bytes, each line ending with its newline
+    mask = np.zeros(len(buf) + 1, dtype=np.int8)
+    mask[np.minimum(starts + skip, ends)] = 1
+    mask[ends + 1] = -1
+    np.cumsum(mask, out=mask)
+    return buf[mask[:-1].view(bool)]
+
+
+def _face_sizes(text: np.ndarray) -> np.ndarray:
+    # corners of each face record, the tokens of each line of text
+    token = np.empty(len(text), dtype=bool)
+    token[:1] = text[:1] > _SPACE
+    np.greater(text[1:], _SPACE, out=token[1:])
+    token[1:] &= text[:-1] <= _SPACE
+    positions = np.flatnonzero(token)
+    del token
+    ends = np.searchsorted(positions, np.flatnonzero(text == _NEWLINE))
+    return np.diff(ends, prepend=0).astype(np.int32)
+
+
+def _count_records(data: bytes) -> Tuple[int, int, int, int, int]:
+    # v, vt, vn, f records and face corners
+    buf = _chunk_buffer(data)
+    starts, ends, kinds = _line_kinds(buf)
+    is_f = kinds == _F
+    corners = int(_face_sizes(_line_text(buf, starts[is_f], ends[is_f], 2)).sum()) if is_f.any() else 0
+    return int((kinds == _V).sum()), int((kinds == _T).sum()), int((kinds == _N).sum()), int(is_f.sum()), corners
+
+
+def _split_records(data: bytes) -> _ChunkRecords:
+    records = _ChunkRecords()
+    v, vt, vn, f = records.v.append, records.vt.append, records.vn.append, records.f.append
+
+    for line in data.split(b'\n'):
+        head = line[:2]
+        if head == b'v ':
+            v(line[2:])
+        elif head == b'vt':
+            vt(line[3:])
+        elif head == b'vn':
+            vn(line[3:])
+        elif head == b'f ':
+            f(line[2:].strip())
+        elif line.startswith(b'usemtl'):
+            records.usemtl.append((len(records.f), line[7:].strip().decode(errors='replace')))
+        elif line.startswith(b'mtllib'):
+            records.mtllib.append(line[7:].strip().decode(errors='replace'))
+
+    return records
+
+
+def _parse_floats(text: bytes, count: int, width: int) -> np.ndarray:
+    # text: `count` records without their prefix, one per line
+    if not count:
+        return np.zeros((0, width), dtype=np.float32)
+
+    values = np.fromstring(text, dtype=np.float32, sep=' ')
+    if values.size == count * width:
+        return values.reshape(-1, width)
+
+    # optional components (v x y z w, vt u v w, vertex colors). keep the first `width` values of each record.
+    return np.array([line.split()[:width] for line in text.split(b'\n')[:count]], dtype=np.float32)
+
+
+def _corner_format(face: bytes) -> Tuple[bool, bool, bool]:
+    # (vertex, uv, normal) of the first corner. v, v/vt, v//vn or v/vt/vn.
+    corner = face.split(maxsplit=1)[0]
+    parts = corner.split(b'/')
+    has_uv = len(parts) > 1 and parts[1] != b''
+    has_normal = len(parts) > 2 and parts[2] != b''
+    return True, has_uv, has_normal
+
+
+def _parse_faces(text: np.ndarray, corner_format: Tuple[bool, bool, bool]) -> Tuple[np.ndarray, np.ndarray]:
+    # text: bytes of the face records without "f ", each line ending with a newline
+    width = 3
+    sizes = _face_sizes(text)
+    data = text.tobytes()
+    # v//vn leaves two spaces, which the separator also matches
+    values = np.fromstring(data.replace(b'/', b' '), dtype=np.int64, sep=' ')
+
+    n = int(sizes.sum())
+    stride = sum(corner_format)
+    if values.size == n * stride:
+        corners = np.zeros((n, width), dtype=np.int64)
+        columns = [i for i in range(width) if corner_format[i]]
+        corners[:, columns] = values.reshape(-1, stride)
+        return corners, sizes
+
+    # mixed corner formats
+    return _parse_faces_per_corner(data.split(b'\n')[:-1])
+
+
+def _parse_faces_per_corner(faces: List[bytes]) -> Tuple[np.ndarray, np.ndarray]:
+    sizes = list()
+    corners = list()
+    for face in faces:
+        tokens = face.split()
+        sizes.append(len(tokens))
+        for token in tokens:
+            parts = token.split(b'/')
+            corners.append([int(parts[i]) if i < len(parts) and parts[i] else 0 for i in range(3)])
+    return np.array(corners, dtype=np.int64).reshape(-1, 3), np.array(sizes, dtype=np.int32)
+
+
+def _resolve_relative_indices(data: bytes, corners: np.ndarray, sizes: np.ndarray, counts: List[int]) -> None:
+    # negative index is relative to the elements defined before the face. count them per face.
+    snapshots = list()
+    v, vt, vn = counts
+    for line in data.split(b'\n'):
+        head = line[:2]
+        if head == b'v ':
+            v += 1
+        elif head == b'vt':
+            vt += 1
+        elif head == b'vn':
+            vn += 1
+        elif head == b'f ':
+            snapshots.append((v, vt, vn))
+
+    per_corner = np.repeat(np.array(snapshots, dtype=np.int64).reshape(-1, 3), sizes, axis=0)
+    # 0 is a missing index and stays -1
+    np.copyto(corners, np.where(corners < 0, per_corner + corners, corners - 1))
+    return
+
+
+def parse_mtl(path: str) -> Dict[str, Dict[str, any]]:
+    materials = dict()
+    material = None
+    with open(path, mode='rb') as f:
+        for line in f:
+            tokens = line.split()
+            if not tokens:
+                continue
+            key = tokens[0].decode(errors='replace')
+            if key == 'newmtl':
+                material = dict()
+                materials[line[6:].strip().decode(errors='replace')] = material
+            elif material is None:
+                continue
+            elif key in ('Kd', 'Ka', 'Ks', 'Ke'):
+                material[key] = [float(x) for x in tokens[1:4]]
+            elif key in ('d', 'Ns', 'Ni', 'illum'):
+                material[key] = float(tokens[1])
+            elif key.startswith('map_') or key in ('bump', 'disp', 'norm'):
+                # texture file name is the last token. options such as -bm come before it.
+                material[key] = line.split(maxsplit=1)[1].strip().rsplit(b' ', 1)[-1].decode(errors='replace')
+
+    return materials
@@ -1,3 +1,7 @@
 from utils.logger import *
 from utils.cmd_arg import *
-from utils.validate import *
\ No newline at end of file
+from utils.validate import *
+from utils.settings import *
+from utils.env import *
+from utils.profiler import *
+from utils.fileio import *
\ No newline at end of file
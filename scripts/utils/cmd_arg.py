@@ -3,17 +3,152 @@ from argparse import ArgumentParser
 from typing import Optional, List
 
 ARGS = '--export_exts'
-HELP = 'help'
+HELP = 'formats to export, e.g. fbx glb. overrides export_formats of settings.json'
+
+ARGS_WORKERS = '--workers'
+HELP_WORKERS = 'number of background blender worker processes'
+
+ARGS_WORKER_JOBS = '--worker_jobs'
+HELP_WORKER_JOBS = 'job file given to a worker process by the parallel driver'
+
+ARGS_SERVE = '--serve'
+HELP_SERVE = 'spool directory watched by a resident worker process'
+
+ARGS_COORDINATOR = '--coordinator'
+HELP_COORDINATOR = 'queue directory on a shared file system. tickets are written there for cluster workers'
+
+ARGS_CLUSTER_WORKER = '--cluster_worker'
+HELP_CLUSTER_WORKER = 'queue directory whose tickets are claimed and converted by this process'
+
+ARGS_DRY_RUN = '--dry_run'
+ARGS_DRY_RUN_ALIAS = '--dry-run'
+HELP_DRY_RUN = 'list the work plan without convertion'
+
+ARGS_RESUME = '--resume'
+HELP_RESUME = 'continue the batch stopped before it finished, from its journal'
+
+ARGS_ENGINE = '--engine'
+HELP_ENGINE = 'blender, or numpy to convert without blender'
 
 def get_cmd_export_exts() -> Optional[List[str]]:
     parser = ArgumentParser()
     parser.add_argument(ARGS, default= None ,nargs="*", help=HELP, required= False)
 
     try:
-        args = parser.parse_args(sys.argv[sys.argv.index('--') + 1:])
+        args, _ = parser.parse_known_args(sys.argv[sys.argv.index('--') + 1:])
         export_exts = args.export_exts
 
     except ValueError:
         export_exts = None
 
-    return export_exts
\ No newline at end of file
+    return export_exts
+
+def get_cmd_workers() -> Optional[int]:
+    parser = ArgumentParser()
+    parser.add_argument(ARGS_WORKERS, default= None, type= int, help=HELP_WORKERS, required= False)
+
+    try:
+        args, _ = parser.parse_known_args(sys.argv[sys.argv.index('--') + 1:])
+        workers = args.workers
+
+    except ValueError:
+        workers = None
+
+    return workers
+
+def get_cmd_worker_jobs() -> Optional[str]:
+    parser = ArgumentParser()
+    parser.add_argument(ARGS_WORKER_JOBS, default= None, help=HELP_WORKER_JOBS, required= False)
+
+    try:
+        args, _ = parser.parse_known_args(sys.argv[sys.argv.index('--') + 1:])
+        worker_jobs = args.worker_jobs
+
+    except ValueError:
+        worker_jobs = None
+
+    return worker_jobs
+
+
+def get_cmd_serve() -> Optional[str]:
+    parser = ArgumentParser()
+    parser.add_argument(ARGS_SERVE, default= None, help=HELP_SERVE, required= False)
+
+    try:
+        args, _ = parser.parse_known_args(sys.argv[sys.argv.index('--') + 1:])
+        serve = args.serve
+
+    except ValueError:
+        serve = None
+
+    return serve
+
+
+def get_cmd_coordinator() -> Optional[str]:
+    parser = ArgumentParser()
+    parser.add_argument(ARGS_COORDINATOR, default= None, help=HELP_COORDINATOR, required= False)
+
+    try:
+        args, _ = parser.parse_known_args(sys.argv[sys.argv.index('--') + 1:])
+        coordinator = args.coordinator
+
+    except ValueError:
+        coordinator = None
+
+    return coordinator
+
+
+def get_cmd_cluster_worker() -> Optional[str]:
+    parser = ArgumentParser()
+    parser.add_argument(ARGS_CLUSTER_WORKER, default= None, help=HELP_CLUSTER_WORKER, required= False)
+
+    try:
+        args, _ = parser.parse_known_args(sys.argv[sys.argv.index('--') + 1:])
+        cluster_worker = args.cluster_worker
+
+    except ValueError:
+        cluster_worker = None
+
+    return cluster_worker
+
+
+def get_cmd_dry_run() -> bool:
+    parser = ArgumentParser()
+    parser.add_argument(ARGS_DRY_RUN, ARGS_DRY_RUN_ALIAS, action='store_true', help=HELP_DRY_RUN, required= False)
+
+    try:
+        args, _ = parser.parse_known_args(sys.argv[sys.argv.index('--') + 1:])
+        dry_run = args.dry_run
+
+    except ValueError:
+        dry_run = False
+
+    return dry_run
+
+
+def get_cmd_engine() -> Optional[str]:
+    parser = ArgumentParser()
+    parser.add_argument(ARGS_ENGINE, default= None, help=HELP_ENGINE, required= False)
+
+    try:
+        args, _ = parser.parse_known_args(sys.argv[sys.argv.index('--') + 1:])
+        engine = args.engine
+
+    except ValueError:
+        engine = None
+
+    return engine
+
+
+def get_cmd_resume() -> bool:
+    parser = ArgumentParser()
+    parser.add_argument(ARGS_RESUME, action='store_true', help=HELP_RESUME, required= False)
+
+    try:
+        args, _ = parser.parse_known_args(sys.argv[sys.argv.index('--') + 1:])
+        resume = args.resume
+
+    except ValueError:
+        resume = False
+
+    return resume
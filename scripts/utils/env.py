@@ -0,0 +1,7 @@
+from importlib.util import find_spec
+
+# bpy can be imported only inside blender. modules without bpy are also usable from plain python.
+BPY_AVAILABLE = find_spec('bpy') is not None
+
+# pillow is optional. the texture stage is skipped without it.
+PIL_AVAILABLE = find_spec('PIL') is not None
@@ -0,0 +1,39 @@
+import os
+
+TEMP_INFIX = '.tmp'
+
+
+def get_temp_path(path: str) -> str:
+    # <name>.tmp.<ext> next to path. the extension is kept for exporters checking it.
+    # two dots, so it is never listed as a clothesId file.
+    stem, ext = os.path.splitext(path)
+    return f'{stem}{TEMP_INFIX}{ext}'
+
+
+def replace_file(temp_path: str, path: str) -> None:
+    # the temp file is flushed to disk, then renamed over path. path is the old or the new file, never a partial one.
+    with open(temp_path, mode='rb+') as f:
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+    _fsync_dir(os.path.dirname(os.path.abspath(path)))
+    return
+
+
+def remove_file(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+    return
+
+
+def _fsync_dir(directory: str) -> None:
+    # makes the rename durable. directories cannot be opened on windows.
+    if os.name == 'nt':
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    return
@@ -0,0 +1,151 @@
+import os, sys, json, math, time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+
+REPORT_SUFFIX = '-stages.jsonl'
+PERCENTILES = (50, 95)
+
+
+def peak_rss_mb() -> float:
+    # peak resident set size of this process
+    if sys.platform == 'win32':
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [
+                ('cb', wintypes.DWORD),
+                ('PageFaultCount', wintypes.DWORD),
+                ('PeakWorkingSetSize', ctypes.c_size_t),
+                ('WorkingSetSize', ctypes.c_size_t),
+                ('QuotaPeakPagedPoolUsage', ctypes.c_size_t),
+                ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t),
+                ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                ('PagefileUsage', ctypes.c_size_t),
+                ('PeakPagefileUsage', ctypes.c_size_t),
+            ]
+
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if not ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return 0.0
+        return counters.PeakWorkingSetSize / 1024 / 1024
+
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kilobytes on linux
+    return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+
+class StageProfiler:
+    def __init__(self) -> None:
+        # returns counts such as {"vertices": int, "faces": int, "materials": int} of the current scene
+        self.counter: Optional[Callable[[], Dict[str, int]]] = None
+        self.item: str = ''
+        self.records: List[Dict[str, any]] = list()
+
+    def begin_item(self, item: str) -> None:
+        self.item = item
+        self.records = list()
+        return
+
+    def end_item(self) -> List[Dict[str, any]]:
+        records = self.records
+        self.item = ''
+        self.records = list()
+        return records
+
+    def _counts(self) -> Dict[str, int]:
+        return self.counter() if self.counter else dict()
+
+    def record(self, name: str, wall: float, cpu: float, **extra: any) -> None:
+        # a stage timed by the caller, e.g. work overlapped on other threads
+        self.records.append({
+            "item": self.item,
+            "stage": name,
+            "wall": wall,
+            "cpu": cpu,
+            "peak_rss_mb": peak_rss_mb(),
+            "before": dict(),
+            "after": dict(),
+            **extra,
+        })
+        return
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[Dict[str, any]]:
+        # the yielded dict is added to the record, e.g. {"bytes": size of the exported file}
+        extra = dict()
+        before = self._counts()
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield extra
+        finally:
+            self.records.append({
+                "item": self.item,
+                "stage": name,
+                "wall": time.perf_counter() - wall,
+                "cpu": time.process_time() - cpu,
+                "peak_rss_mb": peak_rss_mb(),
+                "before": before,
+                "after": self._counts(),
+                **extra,
+            })
+        return
+
+
+_profiler = StageProfiler()
+
+def get_profiler() -> StageProfiler:
+    return _profiler
+
+
+class StageReport:
+    def __init__(self, path: str) -> None:
+        self.path: str = path
+        self.walls: Dict[str, List[float]] = dict()
+        self.cpus: Dict[str, List[float]] = dict()
+        # output file sizes of the export stages
+        self.sizes: Dict[str, List[int]] = dict()
+        self._file = open(path, mode='a')
+
+    def write(self, records: List[Dict[str, any]]) -> None:
+        for record in records:
+            self._file.write(json.dumps(record) + '\n')
+            self.walls.setdefault(record["stage"], list()).append(record["wall"])
+            self.cpus.setdefault(record["stage"], list()).append(record["cpu"])
+            if "bytes" in record:
+                self.sizes.setdefault(record["stage"], list()).append(record["bytes"])
+        self._file.flush()
+        return
+
+    def close(self) -> None:
+        self._file.close()
+        return
+
+    def summary(self) -> List[str]:
+        header = f'{"stage":<20} {"count":>6} {"total[s]":>10}' + ''.join(f' {f"wall p{p}[s]":>12}' for p in PERCENTILES) + f' {"cpu p50[s]":>12} {"size p50[MB]":>13}'
+        lines = [header]
+        for stage, walls in self.walls.items():
+            line = f'{stage:<20} {len(walls):>6} {sum(walls):>10.2f}'
+            line += ''.join(f' {percentile(walls, p):>12.3f}' for p in PERCENTILES)
+            line += f' {percentile(self.cpus[stage], 50):>12.3f}'
+            line += f' {percentile(self.sizes[stage], 50) / 1024 / 1024:>13.2f}' if stage in self.sizes else f' {"-":>13}'
+            lines.append(line)
+        return lines
+
+
+def percentile(values: List[float], p: float) -> float:
+    # nearest rank
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(p / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def get_report_path(log_path: str) -> str:
+    return os.path.splitext(log_path)[0] + REPORT_SUFFIX
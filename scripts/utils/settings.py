@@ -0,0 +1,10 @@
+import json
+from typing import Dict
+
+SETTINGS_FILE_PATH = '../settings/settings.json'
+
+def load_settings(settings_path: str = SETTINGS_FILE_PATH) -> Dict[str, any]:
+    with open(settings_path, mode='r') as f :
+        settings = json.load(f)
+
+    return settings